@@ -0,0 +1,164 @@
+import argparse
+import json
+import multiprocessing
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from olive_engine.transport import REVIEW_API_PATH, TRANSPORT_BACKENDS, make_transport
+
+# 실제 API 응답과 비슷한 크기의 가짜 리뷰 10개
+FAKE_REVIEW = {
+    'gdasSeq': 0, 'mbrNickNm': '테스트', 'mbrId': 'tester', 'gdasScrVal': 10, 'dispRegDate': '2024.01.01',
+    'gdasCont': '촉촉하고 좋아요<br/>재구매 의사 있어요. ' * 8, 'itemNm': '기본 옵션', 'photoList': [],
+    'recommCnt': 3, 'topRvrRnk': 0, 'addInfoNm': [{'mrkNm': '건성'}], 'firstGdasYn': 'Y',
+    'renewUsed1mmGdasYn': 'N', 'ordNo': 'Y123',
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """리뷰 API를 흉내 내는 로컬 핸들러. keep-alive를 위해 HTTP/1.1로 응답한다.
+
+    헤더와 본문을 따로 보내면 keep-alive 연결에서 Nagle/지연 ACK에 걸려 요청마다 ~40ms가 더해지고
+    백엔드 차이가 가려진다. 응답을 버퍼에 모아 한 번에 보내고 TCP_NODELAY도 켠다.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    wbufsize = -1                  # 응답 전체를 버퍼링하고 handle_one_request 끝에서 한 번에 flush
+    disable_nagle_algorithm = True
+    latency = 0.0
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path != REVIEW_API_PATH:
+            self.send_error(404)
+            return
+        page = int(parse_qs(parsed.query).get('pageIdx', ['1'])[0])
+        reviews = [{**FAKE_REVIEW, 'gdasSeq': page * 10 + i} for i in range(10)]
+        body = json.dumps({'gdasList': reviews}, ensure_ascii=False).encode('utf-8')
+        if self.latency:
+            time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve(port_queue, latency):
+    StandInHandler.latency = latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_stand_in_server(latency: float):
+    """서버를 별도 프로세스로 띄워 클라이언트 CPU 측정에 서버 부하가 섞이지 않게 한다."""
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(port_queue, latency), daemon=True)
+    process.start()
+    return process, port_queue.get(timeout=10)
+
+
+def bench_backend(backend: str, base_url: str, requests_count: int, concurrency: int) -> dict:
+    transport = make_transport(backend, base_url=base_url, pool_maxsize=max(concurrency, 1))
+    latencies = []
+    lock = threading.Lock()
+
+    def one(page):
+        started = time.perf_counter()
+        response = transport.get_review_page('A000000000000', page)
+        response.json()
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        with lock:
+            latencies.append(elapsed)
+
+    try:
+        one(1)  # 연결 수립/임포트 비용은 측정에서 제외
+        latencies.clear()
+        cpu_started = time.process_time()
+        wall_started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(one, range(1, requests_count + 1)))
+        wall = time.perf_counter() - wall_started
+        cpu = time.process_time() - cpu_started
+    finally:
+        transport.close()
+
+    latencies.sort()
+    return {
+        'backend': backend,
+        'requests': requests_count,
+        'concurrency': concurrency,
+        'req_per_sec': requests_count / wall,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000,
+        'p99_ms': latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000,
+        'cpu_ms_per_req': cpu / requests_count * 1000,
+    }
+
+
+def check_backends(backends: list[str]) -> bool:
+    """백엔드마다 전송 계층을 만들고 닫아 본다. 패키지가 없는 백엔드는 건너뛰고, 그 외 오류가 있으면 False."""
+    ok = True
+    for backend in backends:
+        try:
+            make_transport(backend).close()
+        except ImportError as e:
+            print(f"{backend:<10} 건너뜀 - 패키지 없음 ({e})")
+            continue
+        except Exception as e:
+            print(f"{backend:<10} 실패 - {type(e).__name__}: {e}")
+            ok = False
+            continue
+        print(f"{backend:<10} ok")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare review API transport backends against a local stand-in server")
+    parser.add_argument('--backends', default=','.join(TRANSPORT_BACKENDS), help='comma separated backend names')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0.0, help='artificial server latency per request (seconds)')
+    parser.add_argument('--check', action='store_true', help='only build and close each backend (smoke test), exit 1 on errors')
+    args = parser.parse_args()
+    backends = [b.strip() for b in args.backends.split(',') if b.strip()]
+
+    if args.check:
+        sys.exit(0 if check_backends(backends) else 1)
+
+    process, port = start_stand_in_server(args.latency)
+    base_url = f"http://127.0.0.1:{port}"
+    print(f"stand-in server: {base_url}  (pid {process.pid}, latency {args.latency}s)")
+    print(f"{'backend':<10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'CPU ms/req':>11}")
+    try:
+        for backend in backends:
+            try:
+                result = bench_backend(backend, base_url, args.requests, args.concurrency)
+            except ImportError as e:
+                print(f"{backend:<10} 건너뜀 - 패키지 없음 ({e})")
+                continue
+            except Exception as e:
+                print(f"{backend:<10} 실패 - {type(e).__name__}: {e}")
+                continue
+            print(f"{result['backend']:<10} {result['req_per_sec']:>9.1f} {result['p50_ms']:>9.2f} "
+                  f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['cpu_ms_per_req']:>11.3f}")
+    finally:
+        process.terminate()
+    # 로컬 서버는 평문 HTTP라 httpx도 HTTP/1.1로 동작한다. HTTP/2 효과는 실제 HTTPS 환경에서만 나타난다.
+    print("note: the stand-in server is plain HTTP, so every backend speaks HTTP/1.1 here.", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
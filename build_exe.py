@@ -27,6 +27,17 @@ def build_exe():
         "--name", "올리브영_리뷰_수집기_GUI",
         "olive_gui.py",
         "--add-data", "olive_scraper.py;.",
+        "--add-data", "olive_results.py;.",
+        "--add-data", "olive_transport.py;.",
+        "--add-data", "olive_search.py;.",
+        "--add-data", "olive_aggregates.py;.",
+        "--add-data", "olive_dedupe.py;.",
+        "--add-data", "olive_reviewers.py;.",
+        "--add-data", "olive_history.py;.",
+        "--add-data", "olive_keywords.py;.",
+        "--add-data", "olive_batch.py;.",
+        "--add-data", "olive_async.py;.",
+        "--add-data", "olive_engine;olive_engine",
         "--add-data", "hooks;hooks",
         "--hidden-import", "pandas._libs.tslibs.np_datetime",
         "--hidden-import", "pandas._libs.tslibs.nattype",
@@ -0,0 +1,204 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from olive_engine.sinks import export_rows, find_raw_result_files, product_id_from_result_file
+from olive_engine.transform import parse_review_date, review_flags, review_key
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+AGGREGATES_FILENAME = 'review_aggregates.sqlite'
+UNKNOWN_DAY = ''                 # 작성일을 해석할 수 없는 리뷰가 모이는 날짜 키
+RATING_STARS = (1, 2, 3, 4, 5)
+
+# review_flags 지표 -> daily 테이블 열
+FLAG_COLUMNS = {'재구매': 'repurchase', '한달이상사용': 'long_use', '오프라인구매': 'offline', '사진여부': 'photo'}
+COUNT_COLUMNS = ['reviews', 'rating_sum'] + [f'star{star}' for star in RATING_STARS] + list(FLAG_COLUMNS.values())
+
+EXPORT_DAILY = 'daily'
+EXPORT_MONTHLY = 'monthly'
+EXPORT_SUMMARY = 'summary'
+EXPORT_SKIN = 'skin'
+
+
+class ReviewAggregates:
+    """상품 x 작성일 단위로 미리 합산해 둔 리뷰 통계(SQLite).
+
+    새 리뷰가 들어올 때 해당 (상품, 날짜) 행의 합계만 더하므로, 리포트는 원본 전체가 아니라
+    상품별 날짜 수만큼의 행만 읽는다. 이미 반영한 리뷰는 (상품, 리뷰 키)로 기억해 두어 같은 리뷰를
+    다시 넣어도 두 번 세지 않는다. ResultPipeline sink로 쓸 수 있고, 모든 메서드는 스레드 안전하다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS seen_reviews (
+            product_id TEXT NOT NULL, review_id TEXT NOT NULL, PRIMARY KEY (product_id, review_id)) WITHOUT ROWID""")
+        counts = ', '.join(f"{column} {'REAL' if column == 'rating_sum' else 'INTEGER'} NOT NULL DEFAULT 0" for column in COUNT_COLUMNS)
+        self.conn.execute(f"""CREATE TABLE IF NOT EXISTS daily (
+            product_id TEXT NOT NULL, day TEXT NOT NULL, {counts}, PRIMARY KEY (product_id, day)) WITHOUT ROWID""")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS daily_skin (
+            product_id TEXT NOT NULL, day TEXT NOT NULL, skin TEXT NOT NULL, reviews INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (product_id, day, skin)) WITHOUT ROWID""")
+        self.conn.commit()
+
+    def add_reviews(self, product_id: str, reviews: list) -> int:
+        """처음 보는 리뷰만 날짜별 합계에 더하고 더한 리뷰 수를 반환합니다."""
+        daily: dict[str, dict[str, float]] = {}
+        skins: dict[tuple[str, str], int] = {}
+        with self.lock:
+            with self.conn:
+                for review in reviews:
+                    cursor = self.conn.execute("INSERT OR IGNORE INTO seen_reviews VALUES (?, ?)", (product_id, review_key(review)))
+                    if not cursor.rowcount:
+                        continue
+                    review_date = parse_review_date(review)
+                    day = review_date.isoformat() if review_date else UNKNOWN_DAY
+                    flags = review_flags(review)
+                    row = daily.setdefault(day, dict.fromkeys(COUNT_COLUMNS, 0))
+                    row['reviews'] += 1
+                    row['rating_sum'] += flags['평점']
+                    star = round(flags['평점'])
+                    if star in RATING_STARS:
+                        row[f'star{star}'] += 1
+                    for name, column in FLAG_COLUMNS.items():
+                        row[column] += int(flags[name])
+                    for info in review.get('addInfoNm', []) or []:
+                        skin = (info.get('mrkNm') or '').strip()
+                        if skin:
+                            skins[(day, skin)] = skins.get((day, skin), 0) + 1
+
+                # 리뷰마다가 아니라 (상품, 날짜)마다 한 번씩 누적한다
+                columns = ', '.join(COUNT_COLUMNS)
+                updates = ', '.join(f"{column} = {column} + excluded.{column}" for column in COUNT_COLUMNS)
+                self.conn.executemany(
+                    f"INSERT INTO daily (product_id, day, {columns}) VALUES (?, ?, {', '.join('?' * len(COUNT_COLUMNS))}) "
+                    f"ON CONFLICT (product_id, day) DO UPDATE SET {updates}",
+                    [(product_id, day, *(row[column] for column in COUNT_COLUMNS)) for day, row in daily.items()])
+                self.conn.executemany(
+                    "INSERT INTO daily_skin VALUES (?, ?, ?, ?) ON CONFLICT (product_id, day, skin) DO UPDATE SET reviews = reviews + excluded.reviews",
+                    [(product_id, day, skin, count) for (day, skin), count in skins.items()])
+        return sum(int(row['reviews']) for row in daily.values())
+
+    def write(self, product_id: str, reviews: list, df=None) -> None:
+        """ResultPipeline sink 인터페이스."""
+        added = self.add_reviews(product_id, reviews)
+        logging.info(f"집계 반영: 상품 {product_id} 새 리뷰 {added}개")
+
+    @staticmethod
+    def _where(product_ids, date_from, date_to) -> tuple[str, list]:
+        clauses, params = [], []
+        if product_ids:
+            clauses.append(f"product_id IN ({', '.join('?' * len(product_ids))})")
+            params.extend(product_ids)
+        if date_from:
+            clauses.append("day >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("day <= ? AND day != ''")
+            params.append(date_to)
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ''), params
+
+    @staticmethod
+    def _rates(row: dict) -> dict:
+        reviews = row['reviews']
+        result = {'reviews': reviews, '평균평점': round(row['rating_sum'] / reviews, 3) if reviews else None}
+        for star in RATING_STARS:
+            result[f'별점{star}'] = row[f'star{star}']
+        for name, column in FLAG_COLUMNS.items():
+            result[f'{name}_비율'] = round(row[column] / reviews, 4) if reviews else None
+        return result
+
+    def _grouped(self, key: str, product_ids=None, date_from=None, date_to=None) -> list[dict]:
+        where, params = self._where(product_ids, date_from, date_to)
+        sums = ', '.join(f"SUM({column}) AS {column}" for column in COUNT_COLUMNS)
+        sql = f"SELECT product_id, {key} AS period, {sums} FROM daily {where} GROUP BY product_id, period ORDER BY product_id, period"
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [{'product_id': row['product_id'], 'period': row['period'], **self._rates(dict(row))} for row in rows]
+
+    def daily(self, product_ids: list[str] | None = None, date_from: str | None = None, date_to: str | None = None) -> list[dict]:
+        return self._grouped('day', product_ids, date_from, date_to)
+
+    def monthly(self, product_ids: list[str] | None = None, date_from: str | None = None, date_to: str | None = None) -> list[dict]:
+        """월별 리뷰 수/평균 평점/지표 비율. period는 'YYYY-MM' (작성일 불명은 '')."""
+        return self._grouped('substr(day, 1, 7)', product_ids, date_from, date_to)
+
+    def summary(self, product_ids: list[str] | None = None, date_from: str | None = None, date_to: str | None = None) -> list[dict]:
+        """상품별 전체 합계: 리뷰 수, 평균 평점, 별점 분포, 재구매/한달이상사용/오프라인구매/사진 비율, 첫/마지막 작성일."""
+        where, params = self._where(product_ids, date_from, date_to)
+        sums = ', '.join(f"SUM({column}) AS {column}" for column in COUNT_COLUMNS)
+        sql = (f"SELECT product_id, MIN(NULLIF(day, '')) AS first_day, MAX(day) AS last_day, {sums} "
+               f"FROM daily {where} GROUP BY product_id ORDER BY product_id")
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [{'product_id': row['product_id'], **self._rates(dict(row)), '첫작성일': row['first_day'] or '', '최신작성일': row['last_day'] or ''}
+                for row in rows]
+
+    def skin_breakdown(self, product_ids: list[str] | None = None, date_from: str | None = None, date_to: str | None = None) -> list[dict]:
+        """상품별 피부 정보(addInfoNm) 항목별 리뷰 수. 많은 순."""
+        where, params = self._where(product_ids, date_from, date_to)
+        sql = f"SELECT product_id, skin, SUM(reviews) AS reviews FROM daily_skin {where} GROUP BY product_id, skin ORDER BY product_id, reviews DESC"
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def ingest_files(self, paths: list[str], log_callback=None) -> int:
+        """이미 저장된 원본 리뷰 JSON을 집계에 반영합니다. 이미 반영한 리뷰는 건너뛴다."""
+        added = 0
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                reviews = json.load(f)
+            added += self.add_reviews(product_id_from_result_file(path), reviews)
+            if log_callback:
+                log_callback(f"집계: {os.path.basename(path)} ({len(reviews)}개)")
+        return added
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OliveYoung review crawler - per-product/day review aggregates")
+    parser.add_argument('--db', required=True, help=f'aggregates file (e.g. <out_dir>/{AGGREGATES_FILENAME})')
+    parser.add_argument('--ingest', nargs='*', default=None, help='raw review JSON files or folders to add first (already counted reviews are skipped)')
+    parser.add_argument('--report', default=EXPORT_SUMMARY, choices=[EXPORT_SUMMARY, EXPORT_MONTHLY, EXPORT_DAILY, EXPORT_SKIN])
+    parser.add_argument('--product', nargs='*', default=None)
+    parser.add_argument('--from', dest='date_from', default=None, help='YYYY-MM-DD')
+    parser.add_argument('--to', dest='date_to', default=None, help='YYYY-MM-DD')
+    parser.add_argument('--export', default=None, help='write the report to .csv or .jsonl instead of printing it')
+    args = parser.parse_args()
+
+    aggregates = ReviewAggregates(args.db)
+    try:
+        if args.ingest is not None:
+            started = time.monotonic()
+            added = aggregates.ingest_files(find_raw_result_files(args.ingest), log_callback=logging.info)
+            logging.info(f"집계 반영 완료: 새 리뷰 {added}개 ({time.monotonic() - started:.1f}초)")
+        report = {EXPORT_SUMMARY: aggregates.summary, EXPORT_MONTHLY: aggregates.monthly,
+                  EXPORT_DAILY: aggregates.daily, EXPORT_SKIN: aggregates.skin_breakdown}[args.report]
+        started = time.perf_counter()
+        rows = report(args.product, args.date_from, args.date_to)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if args.export:
+            export_rows(args.export, rows)
+            logging.info(f"{args.report} {len(rows)}행 저장: {args.export} ({elapsed_ms:.1f}ms)")
+        else:
+            for row in rows:
+                print(json.dumps(row, ensure_ascii=False))
+            logging.info(f"{args.report} {len(rows)}행 ({elapsed_ms:.1f}ms)")
+    finally:
+        aggregates.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,339 @@
+import argparse
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from olive_aggregates import AGGREGATES_FILENAME, ReviewAggregates
+from olive_history import HISTORY_FILENAME, TRACKED_FIELDS, ReviewHistory
+from olive_keywords import BAND_LOW, BANDS, KEYWORDS_FILENAME, KIND_WORD, KINDS, KeywordIndex
+from olive_reviewers import ORDER_PRODUCTS, ORDER_RANK, ORDER_RECENT, ORDER_REVIEWS, REVIEWERS_FILENAME, ReviewerIndex
+from olive_search import ORDER_BY, ORDER_LATEST, ORDER_RELEVANCE, SEARCH_INDEX_FILENAME, ReviewSearchIndex
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_PORT = 8765
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 50000
+CACHE_ENTRIES = 256
+CACHE_MAX_BYTES = 1024 * 1024   # 이보다 큰 응답은 캐시하지 않고 나눠 보낸다
+STREAM_ROWS = 500               # 큰 응답을 보낼 때 한 조각에 담는 행 수
+
+# 저장 폴더의 색인 파일 -> 여는 클래스. 파일이 있는 것만 연다 (API가 빈 색인을 만들지 않도록)
+STORES = {
+    'search': (SEARCH_INDEX_FILENAME, ReviewSearchIndex),
+    'aggregates': (AGGREGATES_FILENAME, ReviewAggregates),
+    'reviewers': (REVIEWERS_FILENAME, ReviewerIndex),
+    'history': (HISTORY_FILENAME, ReviewHistory),
+    'keywords': (KEYWORDS_FILENAME, KeywordIndex),
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ResponseCache:
+    """응답 본문(bytes)을 최근 사용 순으로 CACHE_ENTRIES개까지 들고 있는 LRU 캐시.
+
+    키에 색인 세대(generation)를 넣어 두고, 세대가 바뀌면(다른 프로세스가 새 리뷰를 넣으면) 통째로 비운다.
+    """
+
+    def __init__(self, max_entries: int = CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries: OrderedDict = OrderedDict()
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, generation, key) -> bytes | None:
+        with self.lock:
+            if generation != self.generation:
+                self.entries.clear()
+                self.generation = generation
+            body = self.entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, generation, key, body: bytes) -> None:
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.entries[key] = body
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+def _list_param(query: dict, name: str) -> list[str] | None:
+    values = [item for value in query.get(name, []) for item in value.split(',') if item]
+    return values or None
+
+
+def _param(query: dict, name: str, default=None, cast=str):
+    values = query.get(name)
+    if not values or values[0] == '':
+        return default
+    try:
+        return cast(values[0])
+    except ValueError:
+        raise ApiError(400, f"잘못된 값: {name}={values[0]}")
+
+
+def _limit(query: dict) -> int:
+    """limit 파라미터를 1..MAX_PAGE_SIZE로 맞춥니다. 음수를 그대로 넘기면 SQLite LIMIT -1(전체)이 된다."""
+    return max(1, min(_param(query, 'limit', DEFAULT_PAGE_SIZE, int), MAX_PAGE_SIZE))
+
+
+def _offset(query: dict) -> int:
+    offset = _param(query, 'offset', 0, int)
+    if offset < 0:
+        raise ApiError(400, f"offset은 0 이상이어야 합니다: {offset}")
+    return offset
+
+
+def _choice(query: dict, name: str, choices, default):
+    value = _param(query, name, default)
+    if value not in choices:
+        raise ApiError(400, f"{name}는 {', '.join(choices)} 중 하나여야 합니다")
+    return value
+
+
+class ReviewApi:
+    """저장 폴더의 색인들(검색/집계/작성자/변화 이력/키워드)을 읽기 전용 JSON으로 내주는 질의 계층.
+
+    HTTP와 떼어 두어 다른 곳에서도 handle()만 불러 쓸 수 있다. 결과는 ResponseCache에 담고,
+    각 색인 연결의 PRAGMA data_version(다른 연결이 커밋하면 바뀌는 값)을 세대로 삼아 새로 수집된 리뷰가
+    들어오면 캐시를 비운다.
+    """
+
+    def __init__(self, out_dir: str, cache_entries: int = CACHE_ENTRIES):
+        self.out_dir = out_dir
+        self.stores = {}
+        for name, (filename, store_class) in STORES.items():
+            path = os.path.join(out_dir, filename)
+            if os.path.exists(path):
+                self.stores[name] = store_class(path)
+        self.cache = ResponseCache(cache_entries)
+        self.routes = {
+            'health': self.health,
+            'reviews': self.reviews,
+            'products': self.products,
+            'aggregates': self.aggregates,
+            'reviewers': self.reviewers,
+            'history': self.history,
+            'keywords': self.keywords,
+        }
+
+    def generation(self) -> tuple:
+        versions = []
+        for name, store in sorted(self.stores.items()):
+            with store.lock:
+                versions.append(store.conn.execute("PRAGMA data_version").fetchone()[0])
+        return tuple(versions)
+
+    def _store(self, name: str):
+        store = self.stores.get(name)
+        if store is None:
+            raise ApiError(404, f"{STORES[name][0]} 파일이 저장 폴더에 없습니다")
+        return store
+
+    def handle(self, path: str, query: dict):
+        """(경로, 쿼리)를 처리해 응답 객체를 반환합니다. 목록 응답은 {'items': [...], ...} 형태."""
+        parts = [unquote(part) for part in path.strip('/').split('/') if part]
+        route = self.routes.get(parts[0] if parts else 'health')
+        if route is None:
+            raise ApiError(404, f"알 수 없는 경로입니다: {path}")
+        return route(parts[1:], query)
+
+    def health(self, args, query):
+        return {'status': 'ok', 'out_dir': self.out_dir, 'stores': sorted(self.stores),
+                'cache': {'entries': len(self.cache.entries), 'hits': self.cache.hits, 'misses': self.cache.misses}}
+
+    def reviews(self, args, query):
+        limit = _limit(query)
+        offset = _offset(query)
+        items = self._store('search').search(
+            _param(query, 'q', ''), product_ids=_list_param(query, 'product'),
+            min_rating=_param(query, 'min_rating', None, float), max_rating=_param(query, 'max_rating', None, float),
+            date_from=_param(query, 'from'), date_to=_param(query, 'to'), limit=limit, offset=offset,
+            order=_choice(query, 'order', [*ORDER_BY, ORDER_RELEVANCE], ORDER_LATEST))
+        return {'offset': offset, 'limit': limit, 'count': len(items),
+                'next_offset': offset + len(items) if len(items) == limit else None, 'items': items}
+
+    def products(self, args, query):
+        return {'items': self._store('aggregates').summary(_list_param(query, 'product'), _param(query, 'from'), _param(query, 'to'))}
+
+    def aggregates(self, args, query):
+        store = self._store('aggregates')
+        reports = {'summary': store.summary, 'monthly': store.monthly, 'daily': store.daily, 'skin': store.skin_breakdown}
+        report = reports.get(args[0] if args else 'summary')
+        if report is None:
+            raise ApiError(404, f"집계 종류는 {', '.join(reports)} 중 하나입니다")
+        return {'items': report(_list_param(query, 'product'), _param(query, 'from'), _param(query, 'to'))}
+
+    def reviewers(self, args, query):
+        store = self._store('reviewers')
+        if args:
+            profile = store.reviewer(args[0])
+            if profile is None:
+                raise ApiError(404, f"색인에 없는 작성자입니다: {args[0]}")
+            return {**profile, 'items': store.products_of(args[0])}
+        limit = _limit(query)
+        nickname = _param(query, 'nickname')
+        if nickname:
+            return {'items': store.find_nickname(nickname, limit)}
+        return {'items': store.top_reviewers(_param(query, 'ranked', False, lambda v: v.lower() in ('1', 'true', 'yes')),
+                                             _param(query, 'min_products', 1, int), _list_param(query, 'product'),
+                                             _choice(query, 'order', [ORDER_REVIEWS, ORDER_PRODUCTS, ORDER_RANK, ORDER_RECENT], ORDER_REVIEWS), limit)}
+
+    def history(self, args, query):
+        store = self._store('history')
+        product_id = _param(query, 'product')
+        if not product_id:
+            return store.stats()
+        field = _choice(query, 'field', list(TRACKED_FIELDS), 'recommCnt')
+        review_id = _param(query, 'review')
+        if review_id:
+            return {'items': store.history(product_id, review_id)}
+        date_to = _param(query, 'to')
+        date_to = f"{date_to}T23:59:59" if date_to and 'T' not in date_to else date_to
+        if _param(query, 'deltas'):
+            return {'items': store.deltas(product_id, field, _param(query, 'from'), date_to)}
+        return {'items': store.top_movers(product_id, field, _param(query, 'from'), date_to,
+                                          _limit(query))}
+
+    def keywords(self, args, query):
+        store = self._store('keywords')
+        kind = _choice(query, 'kind', list(KINDS), KIND_WORD)
+        limit = _limit(query)
+        if _param(query, 'contrast'):
+            band = _choice(query, 'band', list(BANDS), BAND_LOW)
+            return {'items': store.contrast(_list_param(query, 'product'), kind, band, limit, _param(query, 'min_docs', 3, int))}
+        band = _param(query, 'band')
+        if band is not None and band not in BANDS:
+            raise ApiError(400, f"band는 {', '.join(BANDS)} 중 하나여야 합니다")
+        return {'items': store.top_terms(_list_param(query, 'product'), kind, band, limit, _param(query, 'min_docs', 2, int))}
+
+    def close(self) -> None:
+        for store in self.stores.values():
+            store.close()
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # 큰 응답을 chunked로 보내기 위해 필요
+    server_version = 'OliveReviewApi/1.0'
+
+    def log_message(self, format, *args):
+        logging.info(f"{self.address_string()} {format % args}")
+
+    def do_GET(self):
+        api: ReviewApi = self.server.api
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        key = (url.path.rstrip('/'), tuple(sorted((name, tuple(values)) for name, values in query.items())))
+        try:
+            generation = api.generation()
+            body = api.cache.get(generation, key)
+            if body is not None:
+                self._send_body(200, body, cached=True)
+                return
+            result = api.handle(url.path, query)
+        except ApiError as e:
+            self._send_body(e.status, self._encode({'error': str(e)}))
+            return
+        except Exception as e:
+            logging.exception("API 처리 오류")
+            self._send_body(500, self._encode({'error': str(e)}))
+            return
+
+        items = result.get('items') if isinstance(result, dict) else None
+        if items is not None and len(items) > STREAM_ROWS:
+            self._send_stream(result, items, generation, key)
+            return
+        body = self._encode(result)
+        if len(body) <= CACHE_MAX_BYTES:
+            api.cache.put(generation, key, body)
+        self._send_body(200, body)
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+    def _send_body(self, status: int, body: bytes, cached: bool = False) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Cache', 'HIT' if cached else 'MISS')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, result: dict, items: list, generation, key) -> None:
+        """행이 많은 응답은 전체를 한 번에 직렬화하지 않고 STREAM_ROWS행씩 chunked로 보냅니다.
+
+        보내면서 모은 본문이 CACHE_MAX_BYTES 이하로 끝나면 캐시에도 넣는다.
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('X-Cache', 'MISS')
+        self.end_headers()
+        head = self._encode({name: value for name, value in result.items() if name != 'items'})
+        pieces = [head[:-1] + (b', "items": [' if len(head) > 2 else b'"items": [')]
+        size = len(pieces[0])
+        self._write_chunk(pieces[0])
+        for start in range(0, len(items), STREAM_ROWS):
+            rows = b', '.join(self._encode(row) for row in items[start:start + STREAM_ROWS])
+            piece = (b', ' if start else b'') + rows
+            self._write_chunk(piece)
+            if size <= CACHE_MAX_BYTES:
+                pieces.append(piece)
+                size += len(piece)
+        self._write_chunk(b']}')
+        self.wfile.write(b'0\r\n\r\n')
+        if size + 2 <= CACHE_MAX_BYTES:
+            self.server.api.cache.put(generation, key, b''.join(pieces) + b']}')
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+
+
+def serve(out_dir: str, host: str = '127.0.0.1', port: int = DEFAULT_PORT, cache_entries: int = CACHE_ENTRIES) -> ThreadingHTTPServer:
+    """API 서버를 만들어 반환합니다. serve_forever()로 실행하고 shutdown() 후 server.api.close()로 정리한다."""
+    server = ThreadingHTTPServer((host, port), ApiRequestHandler)
+    server.daemon_threads = True
+    server.api = ReviewApi(out_dir, cache_entries)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OliveYoung review crawler - local read-only HTTP API over collected reviews")
+    parser.add_argument('--out_dir', required=True, help='output folder holding the review_*.sqlite indexes')
+    parser.add_argument('--host', default='127.0.0.1', help='bind address (default: localhost only)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--cache', type=int, default=CACHE_ENTRIES, help='number of responses kept in the LRU cache')
+    args = parser.parse_args()
+
+    server = serve(args.out_dir, args.host, args.port, args.cache)
+    logging.info(f"리뷰 API 시작: http://{args.host}:{args.port}/ (색인: {', '.join(sorted(server.api.stores)) or '없음'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.api.close()
+
+
+if __name__ == '__main__':
+    main()
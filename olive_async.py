@@ -0,0 +1,375 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import date
+
+from olive_engine.auth import connect_driver, ensure_chrome_debug, wait_for_page_load_and_handle_cloudflare
+from olive_engine.batch import CHROME_MAIN_PATH, PARTITION_NONE, STATUS_CANCELLED, STATUS_FAILED, BatchRunner
+from olive_engine.fetch import (PAGE_ABORT, PAGE_END, PAGE_RETRY, PARTITION_DEFAULT_RATE, DeferredRetryQueue, apply_since, build_partitions,
+                                classify_review_response, merge_partition_reviews, partition_label, since_params, throttle_delay)
+from olive_engine.runtime import CANCEL_POLL_SECONDS, CancelToken, ScrapeCancelled, ScrapeStats
+from olive_engine.sinks import ResultPipeline
+from olive_engine.transport import AsyncHttpxTransport
+
+DEFAULT_PAGE_CONCURRENCY = 4   # 상품 하나에서 동시에 요청 중인 페이지 수
+
+
+async def async_sleep(seconds: float, cancel_token: CancelToken | None = None) -> None:
+    """이벤트 루프를 막지 않고 기다리되 중지 요청이 오면 CANCEL_POLL_SECONDS 안에 ScrapeCancelled를 던집니다."""
+    deadline = time.monotonic() + seconds
+    while True:
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        remaining = deadline - time.monotonic()
+        await asyncio.sleep(min(max(remaining, 0), CANCEL_POLL_SECONDS))
+        if remaining <= CANCEL_POLL_SECONDS:
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            return
+
+
+async def run_cancellable(awaitable, cancel_token: CancelToken):
+    """코루틴(HTTP 요청 등)을 기다리다 중지 요청이 오면 취소하고 ScrapeCancelled를 던집니다."""
+    cancel_token.raise_if_cancelled()
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=CANCEL_POLL_SECONDS)
+            if done:
+                return task.result()
+            cancel_token.raise_if_cancelled()
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+async def _sleep_with_backoff_async(seconds: float, reason: str, stats: ScrapeStats | None, cancel_token: CancelToken) -> None:
+    if stats:
+        stats.set_backoff(seconds, reason)
+    try:
+        await async_sleep(seconds, cancel_token)
+    finally:
+        if stats:
+            stats.clear_backoff()
+
+
+class AsyncRateLimiter:
+    """이벤트 루프 하나의 모든 코루틴이 함께 쓰는 토큰 버킷 방식의 전역 요청 속도 제한기."""
+
+    def __init__(self, rate_per_sec: float, burst: int = 1):
+        self.rate_per_sec = rate_per_sec
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+
+    async def acquire(self, cancel_token: CancelToken | None = None) -> None:
+        """요청 하나를 보낼 수 있을 때까지 기다립니다."""
+        while True:
+            # 단일 스레드 이벤트 루프라 await 사이에는 잠금이 필요 없다
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate_per_sec)
+            self._updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await async_sleep((1 - self._tokens) / self.rate_per_sec, cancel_token)
+
+
+async def _fetch_review_page_async(transport: AsyncHttpxTransport, product_id: str, page: int, token: CancelToken, log_callback=None, stats: ScrapeStats | None = None, rate_limiter: AsyncRateLimiter | None = None, extra_params: dict | None = None) -> tuple[str, object]:
+    """리뷰 API 한 페이지를 한 번 요청하고 (상태, 리뷰 목록 또는 실패 사유)를 반환합니다."""
+    if log_callback and page == 1:
+        log_callback(f"API 요청 시작: {transport.api_url} ({transport.backend_name}, timeout={transport.timeout}초)")
+    logging.debug(f"페이지 {page} API 요청: {transport.api_url}")
+
+    if rate_limiter:
+        await rate_limiter.acquire(token)
+    try:
+        response = await run_cancellable(transport.get_review_page(product_id, page, extra_params), token)
+    except ScrapeCancelled:
+        raise
+    except Exception as e:
+        error_msg = f"페이지 {page} 요청 오류: {type(e).__name__}: {e}"
+        if log_callback:
+            log_callback(error_msg)
+        logging.error(error_msg, exc_info=True)
+        return PAGE_RETRY, type(e).__name__
+    finally:
+        # 같은 레인의 요청 간 최소 간격 유지 (다른 레인은 그동안 계속 진행)
+        await async_sleep(random.uniform(1.2, 2.0), token)
+
+    if log_callback and page == 1:
+        log_callback(f"응답 받음: 상태 코드 {response.status_code}")
+    logging.debug(f"페이지 {page} 응답: {response.status_code}")
+
+    result = classify_review_response(response, page, log_callback)
+    throttle = throttle_delay(response.status_code)
+    if throttle:
+        wait_time, reason = throttle
+        if log_callback:
+            log_callback(f"{response.status_code}: {wait_time:.1f}초 대기")
+        await _sleep_with_backoff_async(wait_time, reason, stats, token)
+    return result
+
+
+async def fetch_reviews_async(transport: AsyncHttpxTransport, product_id: str, total_pages: int, log_callback=None, stats: ScrapeStats | None = None, cancel_token: CancelToken | None = None, rate_limiter: AsyncRateLimiter | None = None, page_concurrency: int = DEFAULT_PAGE_CONCURRENCY, extra_params: dict | None = None, since: date | None = None) -> list:
+    """fetch_reviews의 비동기판. page_concurrency개의 레인이 페이지를 나눠 가져가 동시에 요청합니다.
+
+    재시도/마지막 페이지 판정/실패 페이지 기록은 fetch_reviews와 같고, 결과는 페이지 순서대로 반환합니다.
+    """
+    token = cancel_token or CancelToken()
+    reviews, failed_pages, aborted = await _fetch_review_sequence_async(transport, product_id, total_pages, token, log_callback, stats,
+                                                                        rate_limiter, page_concurrency, extra_params, since)
+    if stats and not aborted:
+        stats.record_failed_pages(product_id, failed_pages)
+    return reviews
+
+
+async def _fetch_review_sequence_async(transport: AsyncHttpxTransport, product_id: str, total_pages: int, token: CancelToken, log_callback=None, stats: ScrapeStats | None = None, rate_limiter: AsyncRateLimiter | None = None, page_concurrency: int = DEFAULT_PAGE_CONCURRENCY, extra_params: dict | None = None, since: date | None = None) -> tuple[list, list[int], bool]:
+    """한 쿼리의 페이지를 여러 레인으로 수집해 (리뷰, 끝내 실패한 페이지, 중단 여부)를 반환합니다."""
+    extra_params = since_params(extra_params, since)
+    page_reviews: dict[int, list] = {}
+    retry_queue = DeferredRetryQueue()
+    state = {'next_page': 1, 'last_page': total_pages, 'in_flight': 0, 'aborted': False}
+    progress_interval = max(1, total_pages // 20)
+    start_time = time.time()
+
+    if log_callback:
+        log_callback(f"fetch_reviews_async 시작: 총 {total_pages}페이지 수집 예정 (동시 {page_concurrency}페이지)")
+    logging.info(f"fetch_reviews_async 시작: product_id={product_id}, total_pages={total_pages}")
+
+    async def lane():
+        while not state['aborted']:
+            token.raise_if_cancelled()
+            page = retry_queue.pop_ready()
+            if page is None:
+                if state['next_page'] <= state['last_page']:
+                    page = state['next_page']
+                    state['next_page'] += 1
+                elif len(retry_queue) or state['in_flight']:
+                    # 다른 레인의 요청 결과에 따라 재시도할 페이지가 생길 수 있으므로 잠시 기다린다
+                    await async_sleep(min(retry_queue.seconds_until_ready() or CANCEL_POLL_SECONDS, CANCEL_POLL_SECONDS), token)
+                    continue
+                else:
+                    return
+            elif page > state['last_page']:
+                continue
+            elif log_callback:
+                log_callback(f"페이지 {page} 재시도 ({retry_queue.attempts.get(page, 0) + 1}/{retry_queue.max_attempts})")
+
+            state['in_flight'] += 1
+            try:
+                status, payload = await _fetch_review_page_async(transport, product_id, page, token, log_callback, stats, rate_limiter, extra_params)
+            finally:
+                state['in_flight'] -= 1
+
+            if status == PAGE_ABORT:
+                state['aborted'] = True
+                return
+            if status == PAGE_END:
+                state['last_page'] = min(state['last_page'], page - 1)
+                retry_queue.discard_after(state['last_page'])
+                continue
+            if status == PAGE_RETRY:
+                if stats:
+                    stats.record_retry(product_id)
+                if retry_queue.defer(page, payload):
+                    if log_callback:
+                        log_callback(f"페이지 {page} 실패({payload}) - 나중에 다시 시도합니다")
+                elif log_callback:
+                    log_callback(f"페이지 {page} 최대 재시도 초과({payload}) - 건너뜁니다")
+                continue
+
+            payload, reached_since = apply_since(payload, since)
+            if reached_since and page < state['last_page']:
+                # 최신순이므로 이후 페이지는 모두 기준일 이전이다 (이미 요청 중인 페이지 결과는 버린다)
+                state['last_page'] = page
+                retry_queue.discard_after(page)
+                if log_callback:
+                    log_callback(f"페이지 {page}에서 기준일({since}) 이전 리뷰 도달 - 이후 페이지는 요청하지 않습니다")
+            page_reviews[page] = payload
+            if stats:
+                stats.record_page(product_id, len(payload))
+            done = len(page_reviews)
+            if log_callback and done % progress_interval == 0:
+                log_callback(f"진행률: {done/total_pages*100:.1f}% ({done}/{total_pages}), 경과 {time.time() - start_time:.1f}s")
+
+    lanes = [asyncio.ensure_future(lane()) for _ in range(max(1, page_concurrency))]
+    try:
+        await asyncio.gather(*lanes)
+    except ScrapeCancelled:
+        if log_callback:
+            log_callback(f"수집 중지 요청 감지. 리뷰 수집을 중단합니다. (지금까지 {sum(len(r) for r in page_reviews.values())}개)")
+        logging.info(f"fetch_reviews_async 중지: product_id={product_id}")
+    finally:
+        for task in lanes:
+            task.cancel()
+        await asyncio.gather(*lanes, return_exceptions=True)
+
+    if state['aborted']:
+        return [], [], True
+
+    last_page = state['last_page']
+    failed_pages = sorted(p for p in retry_queue.given_up if p <= last_page)
+    if failed_pages:
+        message = f"끝내 수집하지 못한 페이지 {len(failed_pages)}개: {failed_pages}"
+        if log_callback:
+            log_callback(message)
+        logging.warning(f"상품 {product_id}: {message}")
+
+    all_reviews: list = []
+    for page in sorted(p for p in page_reviews if p <= last_page):
+        all_reviews.extend(page_reviews[page])
+    return all_reviews, failed_pages, False
+
+
+async def fetch_reviews_partitioned_async(transport: AsyncHttpxTransport, product_id: str, max_pages: int, partitions: list[dict] | None = None, log_callback=None, stats: ScrapeStats | None = None, cancel_token: CancelToken | None = None, rate_limiter: AsyncRateLimiter | None = None, page_concurrency: int = DEFAULT_PAGE_CONCURRENCY, since: date | None = None) -> list:
+    """fetch_reviews_partitioned의 비동기판. 모든 샤드를 동시에 수집하고, 실패한 샤드는 다른 샤드에 영향을 주지 않습니다."""
+    token = cancel_token or CancelToken()
+    partitions = partitions or build_partitions()
+    rate_limiter = rate_limiter or AsyncRateLimiter(PARTITION_DEFAULT_RATE, burst=len(partitions))
+    if log_callback:
+        log_callback(f"분할 수집 시작: 샤드 {len(partitions)}개 ({', '.join(partition_label(p) for p in partitions)})")
+
+    async def fetch_shard(extra_params):
+        label = partition_label(extra_params)
+        shard_log = (lambda msg: log_callback(f"[{label}] {msg}")) if log_callback else None
+        reviews, failed, aborted = await _fetch_review_sequence_async(transport, product_id, max_pages, token, shard_log, stats,
+                                                                      rate_limiter, page_concurrency, extra_params, since)
+        if aborted:
+            raise RuntimeError("인증 문제로 샤드 수집 중단")
+        return reviews, [f"{label}:{page}" for page in failed]
+
+    outcomes = await asyncio.gather(*(fetch_shard(p) for p in partitions), return_exceptions=True)
+    shard_reviews, failed_pages = [], []
+    for extra_params, outcome in zip(partitions, outcomes):
+        label = partition_label(extra_params)
+        if isinstance(outcome, BaseException):
+            shard_reviews.append([])
+            failed_pages.append(f"{label}:전체")
+            if log_callback:
+                log_callback(f"샤드 {label} 실패: {type(outcome).__name__}: {outcome}")
+            logging.error(f"상품 {product_id} 샤드 {label} 수집 실패: {outcome}")
+            continue
+        shard_reviews.append(outcome[0])
+        failed_pages.extend(outcome[1])
+
+    merged = merge_partition_reviews(shard_reviews)
+    if stats:
+        stats.record_failed_pages(product_id, failed_pages)
+    if log_callback:
+        log_callback(f"분할 수집 완료: {len(merged)}개 (중복 제거 {sum(len(r) for r in shard_reviews) - len(merged)}개, 실패 {len(failed_pages)}건)")
+    return merged
+
+
+async def submit_async(pipeline: ResultPipeline, product_id: str, reviews: list, out_dir: str | None = None):
+    """ResultPipeline.submit을 이벤트 루프를 막지 않고 호출합니다 (대기열이 차면 submit이 블로킹되므로).
+
+    저장 완료를 알리는 concurrent.futures.Future를 그대로 반환하며, asyncio.wrap_future로 기다릴 수 있다.
+    """
+    return await asyncio.to_thread(pipeline.submit, product_id, reviews, out_dir)
+
+
+class AsyncBatchRunner(BatchRunner):
+    """BatchRunner의 asyncio 버전. 스레드 대신 코루틴으로 상품 workers개 x 페이지 page_concurrency개를 동시에 요청한다.
+
+    드라이버 호출과 결과 저장 같은 블로킹 작업만 asyncio.to_thread로 넘긴다.
+    run()은 자체 이벤트 루프를 만들고, 이미 루프가 돌고 있으면(qasync GUI) run_async()를 await 한다.
+    """
+
+    def __init__(self, out_dir: str, port: int, user_data_dir: str, workers: int = 4, rate: float = 2.0, cancel_token: CancelToken | None = None,
+                 page_concurrency: int = DEFAULT_PAGE_CONCURRENCY, stats: ScrapeStats | None = None, log_callback=None, partition: str = PARTITION_NONE, since: date | None = None,
+                 sinks: list | None = None):
+        self.page_concurrency = max(1, page_concurrency)
+        super().__init__(out_dir, port, user_data_dir, workers=workers, rate=rate, cancel_token=cancel_token, partition=partition, since=since, sinks=sinks)
+        self.rate_limiter = AsyncRateLimiter(rate, burst=self.workers)
+        self.stats = stats or self.stats
+        self.log_callback = log_callback
+        self._driver_lock = None
+
+    def _create_transport(self, transport_backend: str):
+        # 비동기 엔진은 httpx.AsyncClient만 지원한다
+        return AsyncHttpxTransport(pool_maxsize=max(self.workers * self.page_concurrency, 10))
+
+    def run(self, products: list[dict]) -> list[dict]:
+        return asyncio.run(self.run_async(products))
+
+    async def run_async(self, products: list[dict]) -> list[dict]:
+        self.stats.reset(batch_total=len(products))
+        self._driver_lock = asyncio.Lock()
+        results = []
+        try:
+            await asyncio.to_thread(ensure_chrome_debug, self.port, self.user_data_dir, cancel_token=self.cancel_token)
+            self.driver = await asyncio.to_thread(connect_driver, self.port, chrome_main_path=CHROME_MAIN_PATH, user_data_dir=self.user_data_dir)
+            self.pipeline = ResultPipeline(self.out_dir, log_callback=self.log_callback or logging.info, max_pending=self.workers, sinks=self.sinks)
+            semaphore = asyncio.Semaphore(self.workers)
+
+            async def limited(product):
+                async with semaphore:
+                    return await self.scrape_product_async(product)
+
+            for i, next_result in enumerate(asyncio.as_completed([limited(p) for p in products]), 1):
+                result = await next_result
+                results.append(result)
+                logging.info(f"[{i}/{len(products)}] {result['product_id']}: {result['status']} "
+                             f"(페이지 {result['pages']}, {result['duration_sec']}초)")
+        finally:
+            if self.pipeline is not None:
+                await asyncio.to_thread(self.pipeline.close)
+            await self.transport.aclose()
+            if self.driver is not None:
+                try:
+                    await asyncio.to_thread(self.driver.quit)
+                except Exception as e:
+                    logging.warning(f"Chrome 드라이버 종료 중 오류 발생: {e}")
+        for result in results:
+            self._resolve_saved_rows(result)
+        order = {p['product_id']: i for i, p in enumerate(products)}
+        return sorted(results, key=lambda r: order.get(r['product_id'], len(order)))
+
+    async def _refresh_session_async(self, product_id: str) -> bool:
+        """상품 페이지를 열어 인증을 통과시키고 최신 쿠키를 공유 클라이언트에 반영합니다."""
+        async with self._driver_lock:
+            loaded = await asyncio.to_thread(wait_for_page_load_and_handle_cloudflare, self.driver, product_id, 60,
+                                             self.log_callback, None, self.cancel_token)
+            if not loaded:
+                return False
+            cookies, user_agent = await asyncio.to_thread(self.transport.read_driver_state, self.driver)
+        # AsyncClient의 쿠키/헤더는 이벤트 루프 스레드에서만 바꾼다
+        self.transport.apply_driver_state(cookies, user_agent)
+        return True
+
+    async def scrape_product_async(self, product: dict) -> dict:
+        product_id = product['product_id']
+        result = self._new_result(product)
+        started = time.monotonic()
+        self.stats.start_product(product_id, product['max_pages'])
+        try:
+            if self.cancel_token.is_cancelled():
+                result['status'] = STATUS_CANCELLED
+                return result
+            if not await self._refresh_session_async(product_id):
+                result['status'] = STATUS_CANCELLED if self.cancel_token.is_cancelled() else STATUS_FAILED
+                result['error'] = '페이지 로드/인증 실패'
+                return result
+
+            partitions = self._partitions_for(product)
+            if partitions:
+                reviews = await fetch_reviews_partitioned_async(self.transport, product_id, product['max_pages'], partitions,
+                                                                log_callback=self.log_callback, stats=self.stats, cancel_token=self.cancel_token,
+                                                                rate_limiter=self.rate_limiter, page_concurrency=self.page_concurrency, since=self.since)
+            else:
+                reviews = await fetch_reviews_async(self.transport, product_id, product['max_pages'], log_callback=self.log_callback,
+                                                    stats=self.stats, cancel_token=self.cancel_token, rate_limiter=self.rate_limiter,
+                                                    page_concurrency=self.page_concurrency, since=self.since)
+            save_future = await submit_async(self.pipeline, product_id, reviews) if reviews else None
+            self._record_outcome(result, reviews, save_future)
+        except ScrapeCancelled:
+            result['status'] = STATUS_CANCELLED
+        except Exception as e:
+            logging.error(f"상품 {product_id} 수집 실패: {e}", exc_info=True)
+            result['error'] = f"{type(e).__name__}: {e}"
+        finally:
+            result['duration_sec'] = round(time.monotonic() - started, 1)
+            self.stats.finish_product(product_id, result['status'])
+        return result
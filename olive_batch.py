@@ -0,0 +1,110 @@
+import argparse
+import logging
+import os
+import signal
+import sys
+from datetime import datetime
+
+from olive_engine.batch import (DEFAULT_FIRST_PAGES, DEFAULT_ROUND_PAGES, PARTITION_NONE, PARTITION_RATING, SCHEDULE_BREADTH, SCHEDULE_DEPTH,
+                                STATUS_UNCHANGED, SUCCESS_STATUSES, BatchRunner, read_manifest, write_result_manifest)
+from olive_engine.fetch import parse_since
+from olive_engine.runtime import CancelToken
+from olive_engine.transport import DEFAULT_BACKEND, TRANSPORT_BACKENDS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OliveYoung review crawler - batch mode (manifest input, worker pool)")
+    parser.add_argument('--manifest', required=True, help='CSV or JSONL file of product IDs or URLs')
+    parser.add_argument('--max_pages', type=int, default=100, help='default max pages when the manifest has no max_pages')
+    parser.add_argument('--out_dir', default=os.getcwd())
+    parser.add_argument('--result_manifest', default=None, help='result manifest path (.csv or .jsonl). default: <out_dir>/batch_result_<timestamp>.csv')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--rate', type=float, default=1.0, help='global request rate limit (requests/sec)')
+    parser.add_argument('--transport', default=DEFAULT_BACKEND, choices=sorted(TRANSPORT_BACKENDS), help='HTTP client backend (thread engine)')
+    parser.add_argument('--engine', default='thread', choices=['thread', 'async'], help='thread: worker threads, async: asyncio + httpx.AsyncClient')
+    parser.add_argument('--page_concurrency', type=int, default=4, help='pages in flight per product (async engine)')
+    parser.add_argument('--partition', default=PARTITION_NONE, choices=[PARTITION_NONE, PARTITION_RATING],
+                        help='rating: split each product into per-star shards crawled in parallel (max_pages applies per shard)')
+    parser.add_argument('--schedule', default=SCHEDULE_DEPTH, choices=[SCHEDULE_DEPTH, SCHEDULE_BREADTH],
+                        help='breadth: first pages of every product first (with a preview summary), then deepen round-robin')
+    parser.add_argument('--first_pages', type=int, default=DEFAULT_FIRST_PAGES, help='pages per product in the first breadth round')
+    parser.add_argument('--round_pages', type=int, default=DEFAULT_ROUND_PAGES, help='pages per product in later breadth rounds')
+    parser.add_argument('--since', default=None, help='only reviews on/after this date: YYYY-MM-DD or e.g. 30d (sorts by latest and stops early)')
+    parser.add_argument('--detect_changes', action='store_true',
+                        help='check the latest first page against the last snapshot; skip unchanged products and fetch only new reviews for changed ones')
+    parser.add_argument('--snapshot', default=None, help='snapshot file for --detect_changes. default: <out_dir>/batch_snapshots.json')
+    parser.add_argument('--search_index', default=None, help='also add saved reviews to this full-text search index (see olive_search.py)')
+    parser.add_argument('--aggregates', default=None, help='also add saved reviews to this per-product/day aggregates file (see olive_aggregates.py)')
+    parser.add_argument('--dedupe', default=None, help='also mark near-duplicate review texts using this MinHash index file (see olive_dedupe.py)')
+    parser.add_argument('--reviewers', default=None, help='also add saved reviews to this cross-product reviewer index (see olive_reviewers.py)')
+    parser.add_argument('--history', default=None, help='also record helpful-count/rank changes in this history file (see olive_history.py)')
+    parser.add_argument('--keywords', default=None, help='also count keywords/n-grams of saved reviews into this cache (see olive_keywords.py)')
+    parser.add_argument('--port', type=int, default=9222)
+    parser.add_argument('--user_data_dir', default=r"E:\brwProf\User Data")
+    args = parser.parse_args()
+
+    try:
+        since = parse_since(args.since)
+    except ValueError:
+        parser.error(f"--since must be YYYY-MM-DD or <N>d: {args.since!r}")
+    if args.schedule == SCHEDULE_BREADTH and args.engine == 'async':
+        parser.error("--schedule breadth is only supported with --engine thread")
+    if args.detect_changes and (args.engine == 'async' or args.schedule == SCHEDULE_BREADTH):
+        parser.error("--detect_changes is only supported with --engine thread --schedule depth")
+    snapshot_path = (args.snapshot or os.path.join(args.out_dir, 'batch_snapshots.json')) if args.detect_changes else None
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    products, invalid = read_manifest(args.manifest, args.max_pages)
+    for item in invalid:
+        logging.warning(f"매니페스트 항목 해석 실패: {item['input']!r}")
+    logging.info(f"수집 대상 상품 {len(products)}개 (해석 실패 {len(invalid)}개), 워커 {args.workers}개, 전역 속도 {args.rate}/초")
+
+    sinks = []
+    if args.search_index:
+        from olive_search import ReviewSearchIndex
+        sinks.append(ReviewSearchIndex(args.search_index))
+    if args.aggregates:
+        from olive_aggregates import ReviewAggregates
+        sinks.append(ReviewAggregates(args.aggregates))
+    if args.dedupe:
+        from olive_dedupe import ReviewDedupeIndex
+        sinks.append(ReviewDedupeIndex(args.dedupe))
+    if args.reviewers:
+        from olive_reviewers import ReviewerIndex
+        sinks.append(ReviewerIndex(args.reviewers))
+    if args.history:
+        from olive_history import ReviewHistory
+        sinks.append(ReviewHistory(args.history))
+    if args.keywords:
+        from olive_keywords import KeywordIndex
+        sinks.append(KeywordIndex(args.keywords))
+
+    cancel_token = CancelToken()
+    # Ctrl+C는 진행 중인 상품까지의 부분 결과를 저장하고 결과 매니페스트를 남긴 뒤 종료
+    signal.signal(signal.SIGINT, lambda signum, frame: cancel_token.cancel())
+
+    if args.engine == 'async':
+        from olive_async import AsyncBatchRunner  # httpx가 필요한 경우에만 불러온다
+        runner = AsyncBatchRunner(args.out_dir, args.port, args.user_data_dir, workers=args.workers, rate=args.rate, cancel_token=cancel_token,
+                                  page_concurrency=args.page_concurrency, partition=args.partition, since=since, sinks=sinks)
+    else:
+        runner = BatchRunner(args.out_dir, args.port, args.user_data_dir, workers=args.workers, rate=args.rate, cancel_token=cancel_token,
+                             transport_backend=args.transport, partition=args.partition, since=since, schedule=args.schedule,
+                             first_pages=args.first_pages, round_pages=args.round_pages,
+                             preview_path=os.path.join(args.out_dir, f"batch_preview_{timestamp}.jsonl"), snapshot_path=snapshot_path, sinks=sinks)
+    results = runner.run(products) if products else []
+    results = invalid + results
+
+    result_path = args.result_manifest or os.path.join(args.out_dir, f"batch_result_{timestamp}.csv")
+    write_result_manifest(result_path, results)
+    failed = [r for r in results if r['status'] not in SUCCESS_STATUSES]
+    unchanged = sum(1 for r in results if r['status'] == STATUS_UNCHANGED)
+    logging.info(f"결과 매니페스트 저장: {result_path} (성공 {len(results) - len(failed)}개, 실패 {len(failed)}개"
+                 + (f", 변경 없음 {unchanged}개)" if snapshot_path else ")"))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from olive_engine.sinks import export_rows, find_raw_result_files, product_id_from_result_file
+from olive_engine.transform import REVIEW_KEYS_ATTR, fold_text, review_key, review_text
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEDUPE_FILENAME = 'review_dedupe.sqlite'
+CLUSTER_COLUMN = '중복그룹'
+SHINGLE_SIZE = 3              # 글자 3-gram (띄어쓰기/문장부호는 지우고 만든다)
+NUM_PERM = 128
+BANDS = 16                    # 16밴드 x 8행: 자카드 유사도 약 0.7 이상이면 후보가 될 확률이 높다
+ROWS = NUM_PERM // BANDS
+DEFAULT_THRESHOLD = 0.8       # 후보 중 추정 자카드 유사도가 이 이상이면 같은 묶음
+MIN_TEXT_CHARS = 10           # 이보다 짧은 리뷰("좋아요" 등)는 서로 겹치는 게 당연하므로 제외
+BATCH_SIZE = 256              # 시그니처를 한 번에 계산하는 리뷰 수 (메모리 ~ BATCH_SIZE x 글자 수 x NUM_PERM x 8바이트)
+PRIME = (1 << 31) - 1
+SEED = 20240501
+PREVIEW_CHARS = 80
+
+NON_TEXT_RE = re.compile(r"[\W_]+")
+
+
+def normalize_text(text: str) -> str:
+    return NON_TEXT_RE.sub('', fold_text(text))
+
+
+def shingle_hashes(text: str) -> list[int]:
+    """정규화한 본문의 글자 k-gram 해시(중복 제거). 너무 짧으면 빈 목록."""
+    normalized = normalize_text(text)
+    if len(normalized) < MIN_TEXT_CHARS:
+        return []
+    grams = {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+    return [zlib.crc32(gram.encode('utf-8')) % PRIME for gram in grams]
+
+
+def minhash_batch(shingle_lists: list[list[int]], a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """여러 리뷰의 MinHash 시그니처를 한 번에 계산합니다. 반환: (리뷰 수, NUM_PERM) uint32.
+
+    모든 리뷰의 조각 해시를 이어 붙여 (a*x + b) mod p를 한 번에 계산하고, 리뷰 경계마다 최솟값을 구한다.
+    """
+    lengths = [len(s) for s in shingle_lists]
+    values = np.fromiter((h for s in shingle_lists for h in s), dtype=np.uint64, count=sum(lengths))
+    hashed = (a[:, None] * values[None, :] + b[:, None]) % PRIME
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return np.minimum.reduceat(hashed, offsets, axis=1).T.astype(np.uint32)
+
+
+def band_keys(signature: np.ndarray) -> list[int]:
+    """밴드별 버킷 키. 밴드 안의 ROWS개 값이 모두 같은 시그니처끼리만 같은 키가 된다."""
+    keys = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(signature[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+class ReviewDedupeIndex:
+    """리뷰 본문의 MinHash 시그니처와 LSH 밴드 버킷을 SQLite에 두고, 새 리뷰를 기존 리뷰와 비교해 묶음 번호를 붙입니다.
+
+    모든 쌍을 비교하지 않고 밴드 버킷이 겹치는 후보만 시그니처로 유사도를 확인한다. 상품을 가리지 않고 비교하므로
+    여러 상품에 붙여 넣은 같은 리뷰도 한 묶음이 된다. 묶음 번호는 묶음에서 가장 먼저 색인된 리뷰의 번호이며,
+    두 묶음을 잇는 리뷰가 들어오면 작은 번호로 합친다. ResultPipeline sink로 넘기면 가공 데이터에 중복그룹 열을 더한다.
+    """
+
+    def __init__(self, path: str, threshold: float = DEFAULT_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS signatures (
+            id INTEGER PRIMARY KEY, product_id TEXT NOT NULL, review_id TEXT NOT NULL, cluster_id INTEGER NOT NULL,
+            signature BLOB NOT NULL, preview TEXT, UNIQUE(product_id, review_id))""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS signatures_cluster ON signatures(cluster_id)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS bands (band INTEGER NOT NULL, bucket INTEGER NOT NULL, id INTEGER NOT NULL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS bands_lookup ON bands(band, bucket)")
+        self.a, self.b = self._load_permutations()
+        self.conn.commit()
+
+    def _load_permutations(self) -> tuple[np.ndarray, np.ndarray]:
+        """해시 계수는 처음 만들 때 저장해 두고 이후에도 같은 값을 쓴다 (바뀌면 기존 시그니처와 비교할 수 없다)."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'permutations'").fetchone()
+        if row:
+            a, b = json.loads(row[0])
+        else:
+            rng = np.random.default_rng(SEED)
+            a = rng.integers(1, PRIME, NUM_PERM).tolist()
+            b = rng.integers(0, PRIME, NUM_PERM).tolist()
+            self.conn.execute("INSERT INTO meta VALUES ('permutations', ?)", (json.dumps([a, b]),))
+        return np.array(a, dtype=np.uint64), np.array(b, dtype=np.uint64)
+
+    def add_reviews(self, product_id: str, reviews: list) -> dict[str, int]:
+        """리뷰를 색인하고 {리뷰 키: 묶음 번호}를 반환합니다. 다른 리뷰와 겹치지 않는 리뷰와 너무 짧은 리뷰는 빠진다.
+
+        이미 색인된 리뷰도 현재 묶음 번호를 돌려준다.
+        """
+        entries = []
+        for review in reviews:
+            text = review_text(review)
+            shingles = shingle_hashes(text)
+            if shingles:
+                entries.append((review_key(review), shingles, text[:PREVIEW_CHARS]))
+        clusters: dict[str, int] = {}
+        with self.lock:
+            with self.conn:
+                for start in range(0, len(entries), BATCH_SIZE):
+                    batch = entries[start:start + BATCH_SIZE]
+                    signatures = minhash_batch([shingles for _, shingles, _ in batch], self.a, self.b)
+                    for (key, _, preview), signature in zip(batch, signatures):
+                        self._add_one(product_id, key, signature, preview)
+                # 뒤에 들어온 리뷰가 묶음을 합쳤을 수 있으므로 번호는 마지막에 다시 읽는다
+                keys = [key for key, _, _ in entries]
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    clusters.update(self.conn.execute(
+                        f"SELECT review_id, cluster_id FROM signatures WHERE product_id = ? AND review_id IN ({', '.join('?' * len(chunk))})",
+                        (product_id, *chunk)).fetchall())
+                sizes = self._cluster_sizes(set(clusters.values()))
+        return {key: cluster for key, cluster in clusters.items() if sizes.get(cluster, 1) > 1}
+
+    def _add_one(self, product_id: str, key: str, signature: np.ndarray, preview: str) -> int:
+        row = self.conn.execute("SELECT cluster_id FROM signatures WHERE product_id = ? AND review_id = ?", (product_id, key)).fetchone()
+        if row:
+            return row[0]
+        keys = band_keys(signature)
+        candidates = set()
+        for band, bucket in enumerate(keys):
+            candidates.update(r[0] for r in self.conn.execute("SELECT id FROM bands WHERE band = ? AND bucket = ?", (band, bucket)))
+        matched_clusters = set()
+        for candidate_id in candidates:
+            cluster_id, blob = self.conn.execute("SELECT cluster_id, signature FROM signatures WHERE id = ?", (candidate_id,)).fetchone()
+            similarity = float(np.mean(np.frombuffer(blob, dtype=np.uint32) == signature))
+            if similarity >= self.threshold:
+                matched_clusters.add(cluster_id)
+
+        cursor = self.conn.execute("INSERT INTO signatures (product_id, review_id, cluster_id, signature, preview) VALUES (?, ?, 0, ?, ?)",
+                                   (product_id, key, signature.tobytes(), preview))
+        review_row = cursor.lastrowid
+        cluster_id = min(matched_clusters) if matched_clusters else review_row
+        self.conn.execute("UPDATE signatures SET cluster_id = ? WHERE id = ?", (cluster_id, review_row))
+        others = matched_clusters - {cluster_id}
+        if others:
+            # 새 리뷰가 두 묶음을 이었으면 하나로 합친다
+            self.conn.execute(f"UPDATE signatures SET cluster_id = ? WHERE cluster_id IN ({', '.join('?' * len(others))})", (cluster_id, *others))
+        self.conn.executemany("INSERT INTO bands VALUES (?, ?, ?)", [(band, bucket, review_row) for band, bucket in enumerate(keys)])
+        return cluster_id
+
+    def _cluster_sizes(self, cluster_ids: set[int]) -> dict[int, int]:
+        if not cluster_ids:
+            return {}
+        ids = list(cluster_ids)
+        rows = self.conn.execute(f"SELECT cluster_id, COUNT(*) FROM signatures WHERE cluster_id IN ({', '.join('?' * len(ids))}) GROUP BY cluster_id", ids)
+        return dict(rows.fetchall())
+
+    def annotate(self, product_id: str, reviews: list, df) -> None:
+        """ResultPipeline sink 인터페이스: 저장 전 가공 데이터에 중복그룹 열을 더한다 (중복이 없으면 빈 값)."""
+        clusters = self.add_reviews(product_id, reviews)
+        if df is not None and not df.empty:
+            # 리뷰번호(gdasSeq)가 없는 리뷰는 해시 키로 저장되므로 process_reviews가 남긴 행별 review_key로 맞춘다
+            keys = df.attrs.get(REVIEW_KEYS_ATTR) or [review_key(r) for r in reviews]
+            df[CLUSTER_COLUMN] = [str(clusters[key]) if key in clusters else '' for key in keys]
+        if clusters:
+            logging.info(f"중복 리뷰: 상품 {product_id} {len(clusters)}개가 {len(set(clusters.values()))}개 묶음에 속함")
+
+    def clusters(self, min_size: int = 2, product_ids: list[str] | None = None) -> list[dict]:
+        """크기가 min_size 이상인 묶음의 리뷰 목록. product_ids를 주면 그 상품 리뷰가 포함된 묶음만."""
+        with self.lock:
+            sql = "SELECT cluster_id FROM signatures GROUP BY cluster_id HAVING COUNT(*) >= ?"
+            cluster_ids = [row[0] for row in self.conn.execute(sql, (min_size,))]
+            rows = []
+            for cluster_id in cluster_ids:
+                members = self.conn.execute("SELECT product_id, review_id, preview FROM signatures WHERE cluster_id = ? ORDER BY id", (cluster_id,)).fetchall()
+                if product_ids and not any(m[0] in product_ids for m in members):
+                    continue
+                products = len({m[0] for m in members})
+                rows.extend({'cluster_id': cluster_id, 'size': len(members), 'products': products, 'product_id': m[0], 'review_id': m[1], 'preview': m[2]}
+                            for m in members)
+        return rows
+
+    def ingest_files(self, paths: list[str], log_callback=None) -> int:
+        """이미 저장된 원본 리뷰 JSON을 색인에 채우고, 중복 묶음에 속한 리뷰 수를 반환합니다."""
+        duplicates = 0
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                reviews = json.load(f)
+            duplicates += len(self.add_reviews(product_id_from_result_file(path), reviews))
+            if log_callback:
+                log_callback(f"중복 색인: {os.path.basename(path)} ({len(reviews)}개)")
+        return duplicates
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OliveYoung review crawler - near-duplicate review text clusters (MinHash LSH)")
+    parser.add_argument('--db', required=True, help=f'dedupe index file (e.g. <out_dir>/{DEDUPE_FILENAME})')
+    parser.add_argument('--ingest', nargs='*', default=None, help='raw review JSON files or folders to add first')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='estimated Jaccard similarity for a match (applies to newly added reviews)')
+    parser.add_argument('--min_size', type=int, default=2)
+    parser.add_argument('--product', nargs='*', default=None, help='only clusters containing these products')
+    parser.add_argument('--export', default=None, help='write clusters to .csv or .jsonl')
+    args = parser.parse_args()
+
+    index = ReviewDedupeIndex(args.db, threshold=args.threshold)
+    try:
+        if args.ingest is not None:
+            started = time.monotonic()
+            duplicates = index.ingest_files(find_raw_result_files(args.ingest), log_callback=logging.info)
+            logging.info(f"중복 색인 완료: 묶음에 속한 리뷰 {duplicates}개 ({time.monotonic() - started:.1f}초)")
+        rows = index.clusters(args.min_size, args.product)
+        cross = len({r['cluster_id'] for r in rows if r['products'] > 1})
+        logging.info(f"중복 묶음 {len({r['cluster_id'] for r in rows})}개 (여러 상품에 걸친 묶음 {cross}개), 리뷰 {len(rows)}개")
+        if args.export:
+            export_rows(args.export, rows, fieldnames=['cluster_id', 'size', 'products', 'product_id', 'review_id', 'preview'])
+            logging.info(f"중복 묶음 저장: {args.export}")
+    finally:
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
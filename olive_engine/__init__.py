@@ -0,0 +1,16 @@
+"""올리브영 리뷰 수집 엔진.
+
+GUI, 배치/비동기 수집기, news.py/test.py 같은 CLI가 같은 코드를 쓰도록 수집 과정을 단계별 모듈로 나눈다.
+
+- auth: 브라우저(Chrome 디버그 포트, undetected_chromedriver, SeleniumBase)로 Cloudflare를 통과하고 쿠키/User-Agent를 얻는다
+- transport: 쿠키/User-Agent를 받은 ReviewTransport가 리뷰 API 한 페이지를 요청한다 (requests/curl_cffi/httpx)
+- fetch: 페이지 순서, 지연 재시도, 기준일/증분/분할 수집으로 상품 하나의 원본 리뷰 목록을 만든다
+- transform: 원본 리뷰를 지표(review_flags)와 가공 DataFrame(process_reviews)으로 바꾼다
+- sinks: 원본/가공 결과를 파일로 저장하고(save_results, ResultPipeline) 색인 sink에 넘긴다
+- runtime: 단계들이 함께 쓰는 중지 토큰, 속도 제한기, 계측(ScrapeStats)
+- scrape: 위 단계를 이어 상품 하나를 수집하는 scrape_reviews
+- batch: 매니페스트/결과 기록, 변경 감지 스냅샷, 여러 상품을 워커로 수집하는 BatchRunner (olive_batch/olive_async/olive_sampling 공용)
+
+각 단계는 필요한 모듈에서 직접 가져다 쓴다 (예: from olive_engine.fetch import fetch_reviews).
+로깅 설정(logging.basicConfig)은 라이브러리가 아니라 실행 스크립트가 한다.
+"""
\ No newline at end of file
@@ -0,0 +1,234 @@
+import logging
+import os
+import random
+import socket
+
+import requests
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.common.by import By
+import undetected_chromedriver as uc # undetected_chromedriver 임포트 # type: ignore
+
+from olive_engine.runtime import CANCEL_POLL_SECONDS, CancelToken, ScrapeCancelled, resolve_cancel_token
+from olive_engine.transport import PRODUCT_URL_TEMPLATE
+
+try:
+    import psutil  # 메모리 사용량 표시용 (선택)
+except ImportError:
+    psutil = None
+
+
+_debug_browser_roots: dict[int, 'psutil.Process'] = {}   # 포트 -> 디버그 포트로 띄운 Chrome 본체 프로세스
+
+
+def _is_debug_browser(proc, debug_flag: str) -> bool:
+    return 'chrome' in (proc.name() or '').lower() and debug_flag in ' '.join(proc.cmdline() or [])
+
+
+def _find_debug_browser_root(port: int):
+    """디버그 포트 플래그를 가진 Chrome 중 부모가 같은 플래그를 갖지 않는 본체 프로세스를 찾습니다.
+
+    전체 프로세스를 훑으므로 비싸다. 찾은 결과는 _debug_browser_roots에 캐시하고 본체가 살아 있는 동안 재사용한다.
+    """
+    cached = _debug_browser_roots.get(port)
+    if cached is not None:
+        try:
+            if cached.is_running():
+                return cached
+        except psutil.Error:
+            pass
+        _debug_browser_roots.pop(port, None)
+    debug_flag = f"--remote-debugging-port={port}"
+    for proc in psutil.process_iter(['name']):
+        try:
+            if 'chrome' not in (proc.info.get('name') or '').lower() or not _is_debug_browser(proc, debug_flag):
+                continue
+            parent = proc.parent()
+            if parent is not None and _is_debug_browser(parent, debug_flag):
+                continue
+            _debug_browser_roots[port] = proc
+            return proc
+        except (psutil.NoSuchProcess, psutil.AccessDenied, TypeError):
+            continue
+    return None
+
+
+def collect_memory_usage(port: int) -> dict:
+    """현재 프로세스와 디버그 포트로 연결된 Chrome의 메모리 사용량(MB)을 반환합니다. psutil이 없으면 None.
+
+    Chrome은 본체 프로세스와 그 자식(렌더러 등)만 합산한다. 느릴 수 있으니 GUI 스레드가 아닌 곳에서 호출한다.
+    """
+    if psutil is None:
+        return {'process_mb': None, 'chrome_mb': None}
+    process_mb = psutil.Process().memory_info().rss / (1024 * 1024)
+    root = _find_debug_browser_root(port)
+    if root is None:
+        return {'process_mb': process_mb, 'chrome_mb': 0.0}
+    chrome_mb = 0.0
+    try:
+        procs = [root] + root.children(recursive=True)
+    except psutil.NoSuchProcess:
+        _debug_browser_roots.pop(port, None)
+        return {'process_mb': process_mb, 'chrome_mb': 0.0}
+    except psutil.AccessDenied:
+        procs = [root]
+    for proc in procs:
+        try:
+            chrome_mb += proc.memory_info().rss / (1024 * 1024)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return {'process_mb': process_mb, 'chrome_mb': chrome_mb}
+
+
+def is_port_in_use(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        return s.connect_ex(('localhost', port)) == 0
+
+
+def ensure_chrome_debug(port: int, user_data_dir: str, cancel_token: CancelToken | None = None):
+    if not is_port_in_use(port):
+        chrome_path = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
+        if not os.path.exists(chrome_path):
+            raise FileNotFoundError(f"Chrome 실행 파일을 찾을 수 없습니다: {chrome_path}")
+        cmd = f'"{chrome_path}" --remote-debugging-port={port} --user-data-dir="{user_data_dir}"'
+        import subprocess
+        process = subprocess.Popen(cmd, shell=True)
+        resolve_cancel_token(cancel_token).sleep(4)
+        return process
+    else:
+        logging.info(f"포트 {port}에서 이미 실행 중인 크롬 브라우저를 사용합니다.")
+        return None
+
+
+def connect_driver(port: int, chrome_main_path: str, user_data_dir: str) -> uc.Chrome:
+    chrome_options = Options()
+    chrome_options.add_experimental_option("debuggerAddress", f"127.0.0.1:{port}")
+    
+    driver = uc.Chrome(
+        options=chrome_options,
+        use_subprocess=True
+    )
+    driver.implicitly_wait(1)
+    return driver
+
+
+def launch_driver(chrome_main_path: str, user_data_dir: str) -> uc.Chrome:
+    """디버그 포트로 띄운 브라우저에 붙지 않고 undetected_chromedriver가 브라우저를 직접 실행합니다."""
+    driver = uc.Chrome(
+        options=Options(),
+        use_subprocess=True,
+        browser_executable_path=chrome_main_path,
+        user_data_dir=user_data_dir
+    )
+    driver.implicitly_wait(1)
+    return driver
+
+
+MANUAL_RETRY_TIMEOUT = 30  # 사용자가 캡차를 푼 뒤 페이지 콘텐츠를 다시 기다리는 시간(초)
+PAGE_LOAD_SLICE = 5        # driver.get이 중지 요청 확인 없이 블로킹하는 최대 시간(초)
+PAGE_READY_SELECTOR = "#gdasContents, .prd_detail_box"
+
+
+def wait_for_page_load_and_handle_cloudflare(driver: uc.Chrome, product_id: str, timeout: int = 60, log_callback=None, stop_check_callback=None, cancel_token: CancelToken | None = None, prompt_callback=None) -> bool:
+    """상품 페이지로 이동하고, Cloudflare 인증에 걸리면 사용자에게 해결을 요청합니다.
+
+    prompt_callback을 넘기면 콘텐츠가 나오지 않을 때 호출하고(CLI에서는 Enter 입력 대기),
+    반환된 뒤 MANUAL_RETRY_TIMEOUT초 동안 한 번 더 기다린다.
+    """
+    token = resolve_cancel_token(cancel_token, stop_check_callback)
+    try:
+        product_url = PRODUCT_URL_TEMPLATE.format(product_id=product_id)
+        _navigate(driver, product_url, token)
+        if log_callback:
+            log_callback(f"상품 페이지 로드 시도: {product_url}")
+
+        try:
+            _wait_for_content(driver, timeout, token)
+        except ScrapeCancelled:
+            raise
+        except Exception:
+            if prompt_callback is None:
+                raise
+            if log_callback:
+                log_callback("페이지 콘텐츠 로드 실패. 브라우저 창에서 캡차를 해결하거나 로그인해 주세요.")
+            prompt_callback()
+            _wait_for_content(driver, MANUAL_RETRY_TIMEOUT, token)
+        if log_callback:
+            log_callback("페이지 콘텐츠 로드 완료. 인간적인 행동 시뮬레이션 중...")
+        
+        for _ in range(random.randint(1, 3)):
+            driver.execute_script(f"window.scrollBy(0, {random.randint(200, 800)});")
+            token.sleep(random.uniform(0.5, 1.5))
+        driver.execute_script("window.scrollTo(0, 0);")
+        token.sleep(random.uniform(1, 2))
+
+        return True
+    except ScrapeCancelled:
+        if log_callback:
+            log_callback("수집 중지 요청 감지. 페이지 로드를 중단합니다.")
+        logging.info("페이지 로드 중 중지 요청 감지")
+        return False
+    except Exception as e:
+        if log_callback:
+            log_callback(f"페이지 로드 실패: {e}")
+            try:
+                log_callback(f"현재 URL: {driver.current_url}")
+            except Exception as url_error:
+                logging.debug(f"URL 가져오기 실패: {url_error}")
+            log_callback("브라우저 창을 확인하여 캡차를 수동으로 해결하거나, 로그인을 시도해주세요.")
+        logging.error(f"페이지 로드 실패: {e}", exc_info=True)
+        return False
+
+
+def _navigate(driver, url: str, token: CancelToken) -> None:
+    """페이지 로드 타임아웃을 PAGE_LOAD_SLICE로 줄여 driver.get을 호출합니다.
+
+    시간 안에 로드가 끝나지 않아도 브라우저는 계속 로드하므로, 나머지는 _wait_for_content가 토큰을 보며 기다린다.
+    """
+    token.raise_if_cancelled()
+    driver.set_page_load_timeout(PAGE_LOAD_SLICE)
+    try:
+        driver.get(url)
+    except TimeoutException:
+        logging.debug(f"페이지 로드가 {PAGE_LOAD_SLICE}초 안에 끝나지 않음 - 콘텐츠 대기로 넘어감")
+    token.raise_if_cancelled()
+
+
+def _wait_for_content(driver, timeout: int, token: CancelToken) -> None:
+    # 중지 요청도 대기 종료 조건에 포함해 최대 timeout초를 기다리지 않도록 한다
+    WebDriverWait(driver, timeout, poll_frequency=CANCEL_POLL_SECONDS).until(
+        lambda d: token.is_cancelled() or d.find_elements(By.CSS_SELECTOR, PAGE_READY_SELECTOR)
+    )
+    token.raise_if_cancelled()
+
+
+def acquire_seleniumbase_auth(product_id: str, timeout: int = 300, log_callback=None) -> tuple[list, str] | None:
+    """SeleniumBase(UC 모드)로 새 브라우저를 띄워 캡차를 통과하고 (쿠키 목록, User-Agent)를 반환합니다.
+
+    디버그 포트 브라우저 없이 쓰는 방식이다. 결과는 ReviewTransport.apply_driver_state에 그대로 넘길 수 있다.
+    실패하면 None.
+    """
+    from seleniumbase import SB
+
+    try:
+        with SB(uc=True, headless=False) as sb:
+            sb.open(PRODUCT_URL_TEMPLATE.format(product_id=product_id))
+            if log_callback:
+                log_callback(f"캡차(CAPTCHA)가 나타나면 {timeout // 60}분 안에 해결해주세요...")
+            sb.wait_for_element_visible("#gdasContents", timeout=timeout)
+            sb.sleep(1)  # 안정성을 위한 짧은 대기
+            return sb.get_cookies(), sb.get_user_agent()
+    except Exception as e:
+        if log_callback:
+            log_callback(f"SeleniumBase 인증 정보 획득 실패: {e}")
+        logging.error(f"SeleniumBase 인증 정보 획득 실패: {e}", exc_info=True)
+        return None
+
+
+def extract_session_from_driver(driver: uc.Chrome) -> tuple[requests.Session, str]:
+    session = requests.Session()
+    for c in driver.get_cookies():
+        session.cookies.set(c.get('name'), c.get('value'))
+    user_agent = driver.execute_script("return navigator.userAgent;")
+    return session, user_agent
@@ -0,0 +1,446 @@
+"""배치 수집 실행기. 매니페스트 읽기/결과 기록, 변경 감지 스냅샷, 스레드 워커로 상품 여러 개를 수집하는 BatchRunner.
+
+olive_batch(CLI), olive_async(AsyncBatchRunner), olive_sampling이 함께 쓴다.
+"""
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from olive_engine.auth import connect_driver, ensure_chrome_debug, wait_for_page_load_and_handle_cloudflare
+from olive_engine.fetch import (PAGE_END, PAGE_OK, apply_known_ids, apply_since, build_partitions, extract_product_id, fetch_review_page,
+                                fetch_review_sequence, fetch_reviews, fetch_reviews_partitioned, parse_since)
+from olive_engine.runtime import CancelToken, RateLimiter, ScrapeStats
+from olive_engine.sinks import ResultPipeline
+from olive_engine.transform import summarize_reviews
+from olive_engine.transport import DEFAULT_BACKEND, SORT_LATEST, make_transport
+
+CHROME_MAIN_PATH = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
+
+# 결과 매니페스트의 상품별 상태
+STATUS_OK = 'ok'
+STATUS_PARTIAL = 'partial'      # 일부 페이지를 끝내 수집하지 못함
+STATUS_EMPTY = 'empty'
+STATUS_FAILED = 'failed'
+STATUS_CANCELLED = 'cancelled'
+STATUS_UNCHANGED = 'unchanged'  # 변경 감지: 지난 스냅샷 이후 새 리뷰가 없어 건너뜀
+SUCCESS_STATUSES = {STATUS_OK, STATUS_EMPTY, STATUS_UNCHANGED}
+
+# 결과 매니페스트의 change 열 (변경 감지를 켰을 때만 채움)
+CHANGE_NEW = 'new'              # 스냅샷이 없어 전체 수집
+CHANGE_UPDATED = 'changed'      # 새 리뷰만 증분 수집
+CHANGE_UNCHANGED = 'unchanged'
+
+PARTITION_NONE = 'none'
+PARTITION_RATING = 'rating'     # 별점(point)별 샤드로 나눠 병렬 수집
+
+SCHEDULE_DEPTH = 'depth'        # 상품 하나를 끝까지 수집한 뒤 다음 상품 (기본)
+SCHEDULE_BREADTH = 'breadth'    # 모든 상품의 앞 페이지를 먼저 받고 라운드 로빈으로 깊이 들어감
+DEFAULT_FIRST_PAGES = 3
+DEFAULT_ROUND_PAGES = 10
+
+RESULT_FIELDS = ['product_id', 'input', 'status', 'change', 'rows', 'pages', 'failed_pages', 'duration_sec', 'error']
+
+
+def read_manifest(path: str, default_max_pages: int) -> tuple[list[dict], list[dict]]:
+    """CSV 또는 JSONL 매니페스트를 읽어 (수집 대상, 해석 실패 항목)을 반환합니다.
+
+    CSV는 product_id/goodsNo/url 중 하나의 열(없으면 첫 번째 열)과 선택적인 max_pages 열을 읽는다.
+    JSONL은 한 줄에 {"product_id" 또는 "url": ..., "max_pages": ...} 객체나 문자열 하나를 받는다.
+    선택적인 options(JSON 목록 [{"itemNo": ..., "optionValue": ...}])가 있으면 옵션별 샤드로 나눠 수집한다.
+    상품 ID는 GUI와 같은 extract_product_id 규칙으로 해석한다.
+    """
+    entries = []
+    if path.lower().endswith(('.jsonl', '.ndjson')):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                item = json.loads(line)
+                if isinstance(item, str):
+                    item = {'product_id': item}
+                entries.append(item)
+    else:
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.reader(f))
+        if rows:
+            header = [h.strip() for h in rows[0]]
+            known = {'product_id', 'goodsNo', 'url', 'max_pages', 'options'}
+            if known & set(header):
+                entries = [dict(zip(header, row)) for row in rows[1:] if any(cell.strip() for cell in row)]
+            else:
+                entries = [{'product_id': row[0]} for row in rows if row and row[0].strip()]
+
+    products, invalid = [], []
+    seen = set()
+    for item in entries:
+        raw = str(item.get('product_id') or item.get('goodsNo') or item.get('url') or '').strip()
+        product_id = extract_product_id(raw) if raw else None
+        if not product_id:
+            invalid.append({'product_id': '', 'input': raw, 'status': STATUS_FAILED, 'rows': 0, 'pages': 0,
+                            'failed_pages': [], 'duration_sec': 0, 'error': '유효하지 않은 상품 ID/URL'})
+            continue
+        if product_id in seen:
+            logging.info(f"중복 상품 건너뜀: {product_id}")
+            continue
+        seen.add(product_id)
+        try:
+            max_pages = int(item.get('max_pages') or default_max_pages)
+        except ValueError:
+            max_pages = default_max_pages
+        options = item.get('options') or []
+        if isinstance(options, str):
+            try:
+                options = json.loads(options)
+            except json.JSONDecodeError:
+                logging.warning(f"상품 {product_id}: options 열을 해석할 수 없어 무시합니다: {options!r}")
+                options = []
+        products.append({'product_id': product_id, 'input': raw, 'max_pages': max_pages, 'options': options})
+    return products, invalid
+
+
+def write_result_manifest(path: str, results: list[dict], fields: list[str] | None = None) -> None:
+    """결과 매니페스트를 CSV 또는 JSONL로 저장합니다. CSV 열은 fields(기본 RESULT_FIELDS)를 따른다."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.lower().endswith(('.jsonl', '.ndjson')):
+        with open(path, 'w', encoding='utf-8') as f:
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False) + '\n')
+    else:
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields or RESULT_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for result in results:
+                writer.writerow({**result, 'failed_pages': ' '.join(map(str, result.get('failed_pages') or []))})
+
+
+class SnapshotStore:
+    """상품별로 마지막 수집 때 본 최신순 1페이지의 리뷰 번호(gdasSeq)를 JSON 파일에 보관합니다.
+
+    다음 배치는 최신순 1페이지 한 번만 요청해 이 번호들과 비교하고, 새 리뷰가 없으면 상품을 건너뛴다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.products: dict[str, dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self.products = json.load(f).get('products', {})
+            except (OSError, ValueError) as e:
+                logging.warning(f"스냅샷 파일을 읽지 못해 새로 시작합니다: {path} ({e})")
+
+    def known_ids(self, product_id: str) -> set[str] | None:
+        """마지막으로 본 리뷰 번호 집합. 스냅샷이 없으면 None."""
+        with self.lock:
+            snapshot = self.products.get(product_id)
+        return None if snapshot is None else set(snapshot['head_ids'])
+
+    def update(self, product_id: str, head: list) -> None:
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            snapshot = self.products.setdefault(product_id, {})
+            snapshot['head_ids'] = [str(r.get('gdasSeq', '')) for r in head]
+            snapshot['latest_date'] = head[0].get('dispRegDate', '') if head else ''
+            snapshot['checked_at'] = now
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self.lock:
+            data = json.dumps({'products': self.products}, ensure_ascii=False)
+        # 저장 중 중단돼도 이전 스냅샷이 남도록 임시 파일에 쓴 뒤 교체한다
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(temp_path, self.path)
+
+
+class BatchRunner:
+    """여러 상품을 워커 풀로 수집합니다.
+
+    Chrome 드라이버는 하나를 공유하므로 페이지 로드/쿠키 추출은 잠금 아래에서 순서대로 하고,
+    API 수집은 워커마다 병렬로 진행하되 RateLimiter로 전체 요청 속도를 제한한다.
+    """
+
+    def __init__(self, out_dir: str, port: int, user_data_dir: str, workers: int = 2, rate: float = 1.0, cancel_token: CancelToken | None = None, transport_backend: str = DEFAULT_BACKEND,
+                 partition: str = PARTITION_NONE, since=None, schedule: str = SCHEDULE_DEPTH, first_pages: int = DEFAULT_FIRST_PAGES,
+                 round_pages: int = DEFAULT_ROUND_PAGES, preview_path: str | None = None, snapshot_path: str | None = None,
+                 sinks: list | None = None):
+        self.out_dir = out_dir
+        self.sinks = sinks
+        self.snapshots = SnapshotStore(snapshot_path) if snapshot_path else None
+        self.schedule = schedule
+        self.first_pages = max(1, first_pages)
+        self.round_pages = max(1, round_pages)
+        self.preview_path = preview_path
+        self.partition = partition
+        self.since = parse_since(since)
+        self.port = port
+        self.user_data_dir = user_data_dir
+        self.workers = max(1, workers)
+        self.rate_limiter = RateLimiter(rate, burst=self.workers)
+        self.cancel_token = cancel_token or CancelToken()
+        self.stats = ScrapeStats()
+        self.driver = None
+        self.driver_lock = threading.Lock()
+        self.pipeline = None
+        self.transport = self._create_transport(transport_backend)
+
+    def _create_transport(self, transport_backend: str):
+        # 모든 워커가 연결 풀 하나를 공유한다 (워커 수보다 풀이 작으면 연결이 버려지고 다시 맺어진다)
+        return make_transport(transport_backend, pool_maxsize=max(self.workers * 2, 10))
+
+    def run(self, products: list[dict]) -> list[dict]:
+        self.stats.reset(batch_total=len(products))
+        results = []
+        try:
+            # 브라우저 연결이나 파이프라인 생성이 실패해도 아래 finally에서 전송 계층을 닫는다
+            ensure_chrome_debug(self.port, self.user_data_dir, cancel_token=self.cancel_token)
+            self.driver = connect_driver(self.port, chrome_main_path=CHROME_MAIN_PATH, user_data_dir=self.user_data_dir)
+            # 수집이 끝난 상품은 저장 스레드로 넘기고 워커는 곧바로 다음 상품을 수집한다
+            self.pipeline = ResultPipeline(self.out_dir, log_callback=logging.info, max_pending=self.workers, sinks=self.sinks)
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='olive-batch') as executor:
+                if self.schedule == SCHEDULE_BREADTH:
+                    results = self._run_breadth_first(executor, products)
+                else:
+                    futures = {executor.submit(self.scrape_product, product): product for product in products}
+                    for i, future in enumerate(as_completed(futures), 1):
+                        result = future.result()
+                        results.append(result)
+                        logging.info(f"[{i}/{len(products)}] {result['product_id']}: {result['status']} "
+                                     f"(페이지 {result['pages']}, {result['duration_sec']}초)")
+        finally:
+            if self.pipeline is not None:
+                self.pipeline.close()
+            self.transport.close()
+            if self.snapshots is not None:
+                self.snapshots.save()
+            if self.driver is not None:
+                try:
+                    self.driver.quit()
+                except Exception as e:
+                    logging.warning(f"Chrome 드라이버 종료 중 오류 발생: {e}")
+        for result in results:
+            self._resolve_saved_rows(result)
+        order = {p['product_id']: i for i, p in enumerate(products)}
+        return sorted(results, key=lambda r: order.get(r['product_id'], len(order)))
+
+    def _run_breadth_first(self, executor, products: list[dict]) -> list[dict]:
+        """모든 상품의 앞 first_pages 페이지를 먼저 수집해 미리보기 요약을 남기고, 이후 round_pages씩 라운드 로빈으로 이어 받습니다."""
+        states = [{'product': p, 'result': self._new_result(p), 'next_page': 1, 'reviews': [], 'failed_pages': [],
+                   'done': False, 'started': time.monotonic()} for p in products]
+        for state in states:
+            self.stats.start_product(state['product']['product_id'], state['product']['max_pages'])
+        if any(self._partitions_for(state['product']) for state in states):
+            logging.warning("breadth 스케줄에서는 분할 수집을 사용하지 않습니다.")
+
+        round_no = 0
+        while not self.cancel_token.is_cancelled():
+            pending = [state for state in states if not state['done']]
+            if not pending:
+                break
+            round_no += 1
+            pages = self.first_pages if round_no == 1 else self.round_pages
+            logging.info(f"라운드 {round_no}: 상품 {len(pending)}개, 상품당 최대 {pages}페이지")
+            futures = {executor.submit(self._crawl_chunk, state, pages): state for state in pending}
+            for future in as_completed(futures):
+                state = futures[future]
+                future.result()
+                if round_no == 1:
+                    self._emit_preview(state)
+
+        results = []
+        for state in states:
+            result = state['result']
+            product_id = result['product_id']
+            self.stats.record_failed_pages(product_id, state['failed_pages'])
+            if state['reviews'] or not result['error']:
+                # 중간 라운드에서 실패했더라도 앞 라운드에서 받은 리뷰는 저장한다
+                save_future = self.pipeline.submit(product_id, state['reviews']) if state['reviews'] else None
+                self._record_outcome(result, state['reviews'], save_future)
+                if result['error'] and result['status'] in SUCCESS_STATUSES:
+                    result['status'] = STATUS_PARTIAL
+            result['duration_sec'] = round(time.monotonic() - state['started'], 1)
+            self.stats.finish_product(product_id, result['status'])
+            results.append(result)
+        return results
+
+    def _crawl_chunk(self, state: dict, pages: int) -> None:
+        """상품 하나의 다음 pages 페이지를 수집해 state에 이어 붙입니다. 예외는 state의 결과로 남긴다."""
+        product = state['product']
+        product_id = product['product_id']
+        start = state['next_page']
+        end = min(start + pages - 1, product['max_pages'])
+        try:
+            if start == 1 and not self._refresh_session(product_id):
+                state['result']['status'] = STATUS_CANCELLED if self.cancel_token.is_cancelled() else STATUS_FAILED
+                state['result']['error'] = '페이지 로드/인증 실패'
+                state['done'] = True
+                return
+            reviews, failed_pages, aborted, reached_end = fetch_review_sequence(
+                self.transport, product_id, end, self.cancel_token, stats=self.stats, rate_limiter=self.rate_limiter,
+                since=self.since, start_page=start)
+            state['reviews'].extend(reviews)
+            state['failed_pages'].extend(failed_pages)
+            state['next_page'] = end + 1
+            if aborted:
+                state['result']['error'] = '인증 문제로 수집 중단'
+            state['done'] = aborted or reached_end or end >= product['max_pages'] or self.cancel_token.is_cancelled()
+        except Exception as e:
+            logging.error(f"상품 {product_id} 수집 실패: {e}", exc_info=True)
+            state['result']['error'] = f"{type(e).__name__}: {e}"
+            state['done'] = True
+
+    def _emit_preview(self, state: dict) -> None:
+        """앞 페이지만으로 계산한 상품별 미리보기 요약을 로그와 미리보기 JSONL에 남깁니다."""
+        product_id = state['product']['product_id']
+        preview = {'product_id': product_id, 'pages': state['next_page'] - 1, 'complete': state['done'],
+                   'error': state['result']['error'], **summarize_reviews(state['reviews'])}
+        logging.info(f"[미리보기] {product_id}: 리뷰 {preview['reviews']}개, 평균 평점 {preview['평균평점']}, "
+                     f"재구매 {preview['재구매_비율']}, 사진 {preview['사진여부_비율']}")
+        if self.preview_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.preview_path)), exist_ok=True)
+            with open(self.preview_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(preview, ensure_ascii=False) + '\n')
+
+    @staticmethod
+    def _resolve_saved_rows(result: dict) -> None:
+        save_future = result.pop('_save_future', None)
+        if save_future is None:
+            return
+        try:
+            result['rows'] = save_future.result()
+        except Exception as e:
+            result['status'] = STATUS_FAILED
+            result['error'] = f"저장 실패: {type(e).__name__}: {e}"
+
+    def _refresh_session(self, product_id: str) -> bool:
+        """상품 페이지를 열어 인증을 통과시키고 최신 쿠키를 공유 세션에 반영합니다."""
+        with self.driver_lock:
+            if not wait_for_page_load_and_handle_cloudflare(self.driver, product_id, timeout=60, cancel_token=self.cancel_token):
+                return False
+            self.transport.update_from_driver(self.driver)
+            return True
+
+    def _partitions_for(self, product: dict) -> list[dict] | None:
+        """상품을 샤드로 나눠 수집해야 하면 샤드 목록(extra_params), 아니면 None."""
+        by_rating = self.partition == PARTITION_RATING
+        if by_rating or product.get('options'):
+            return build_partitions(by_rating=by_rating, options=product.get('options'))
+        return None
+
+    def _fetch_head(self, product_id: str) -> list | None:
+        """변경 확인용으로 최신순 1페이지를 받습니다. 리뷰가 없으면 [], 실패하면 None.
+
+        공유 세션의 쿠키로 먼저 시도하고, 막히면 그때만 상품 페이지를 열어 세션을 새로 받는다.
+        """
+        for attempt in range(2):
+            if attempt and not self._refresh_session(product_id):
+                return None
+            status, payload = fetch_review_page(self.transport, product_id, 1, self.cancel_token, stats=self.stats,
+                                                 rate_limiter=self.rate_limiter, extra_params={'gdasSort': SORT_LATEST})
+            if status == PAGE_OK:
+                self.stats.record_page(product_id, len(payload))
+                return payload
+            if status == PAGE_END:
+                return []
+        return None
+
+    @staticmethod
+    def _classify_change(head: list, known_ids: set[str] | None) -> str:
+        if known_ids is None:
+            return CHANGE_NEW
+        # 맨 위 리뷰가 이미 본 리뷰면 새 리뷰가 없다 (삭제로 순서만 바뀐 경우도 포함)
+        new_reviews, _ = apply_known_ids(head, known_ids)
+        return CHANGE_UPDATED if new_reviews else CHANGE_UNCHANGED
+
+    def _fetch_incremental(self, product: dict, head: list, known_ids: set[str]) -> list:
+        """최신순으로 이미 받은 리뷰가 나올 때까지만 새 리뷰를 수집합니다. 확인용 1페이지는 다시 요청하지 않는다."""
+        product_id = product['product_id']
+        reviews, reached_known = apply_known_ids(head, known_ids)
+        reviews, reached_since = apply_since(reviews, self.since)
+        if reached_known or reached_since or product['max_pages'] < 2:
+            return reviews
+        more, failed_pages, aborted, _ = fetch_review_sequence(
+            self.transport, product_id, product['max_pages'], self.cancel_token, stats=self.stats, rate_limiter=self.rate_limiter,
+            since=self.since, start_page=2, known_ids=known_ids)
+        if aborted:
+            raise RuntimeError("인증 문제로 증분 수집 중단")
+        self.stats.record_failed_pages(product_id, failed_pages)
+        logging.info(f"상품 {product_id}: 새 리뷰 {len(reviews) + len(more)}개 증분 수집")
+        return reviews + more
+
+    @staticmethod
+    def _new_result(product: dict) -> dict:
+        return {'product_id': product['product_id'], 'input': product['input'], 'status': STATUS_FAILED, 'change': '',
+                'rows': 0, 'pages': 0, 'failed_pages': [], 'duration_sec': 0, 'error': ''}
+
+    def _record_outcome(self, result: dict, reviews: list, save_future) -> None:
+        """수집이 끝난 상품의 페이지 수/실패 페이지/상태를 결과에 채웁니다."""
+        info = self.stats.product_info(result['product_id'])
+        result['pages'] = info.get('pages', 0)
+        result['failed_pages'] = info.get('failed_pages', [])
+        if save_future is not None:
+            # 행 수와 저장 성공 여부는 배치가 끝난 뒤 _resolve_saved_rows에서 채운다
+            result['_save_future'] = save_future
+        if self.cancel_token.is_cancelled():
+            result['status'] = STATUS_CANCELLED
+        elif result['failed_pages']:
+            result['status'] = STATUS_PARTIAL
+        else:
+            result['status'] = STATUS_OK if reviews else STATUS_EMPTY
+
+    def scrape_product(self, product: dict) -> dict:
+        product_id = product['product_id']
+        result = self._new_result(product)
+        started = time.monotonic()
+        self.stats.start_product(product_id, product['max_pages'])
+        try:
+            if self.cancel_token.is_cancelled():
+                result['status'] = STATUS_CANCELLED
+                return result
+            head = known_ids = None
+            if self.snapshots is not None:
+                head = self._fetch_head(product_id)
+                if head is None:
+                    result['status'] = STATUS_CANCELLED if self.cancel_token.is_cancelled() else STATUS_FAILED
+                    result['error'] = '변경 확인 실패'
+                    return result
+                known_ids = self.snapshots.known_ids(product_id)
+                result['change'] = self._classify_change(head, known_ids)
+                if result['change'] == CHANGE_UNCHANGED:
+                    result['status'] = STATUS_UNCHANGED
+                    self.snapshots.update(product_id, head)
+                    return result
+            elif not self._refresh_session(product_id):
+                result['status'] = STATUS_CANCELLED if self.cancel_token.is_cancelled() else STATUS_FAILED
+                result['error'] = '페이지 로드/인증 실패'
+                return result
+
+            partitions = self._partitions_for(product)
+            if result['change'] == CHANGE_UPDATED:
+                reviews = self._fetch_incremental(product, head, known_ids)
+            elif partitions:
+                reviews = fetch_reviews_partitioned(self.transport, product_id, product['max_pages'], partitions, stats=self.stats,
+                                                    cancel_token=self.cancel_token, rate_limiter=self.rate_limiter, since=self.since)
+            else:
+                reviews = fetch_reviews(self.transport, self.transport.user_agent, product_id, product['max_pages'], stats=self.stats,
+                                        cancel_token=self.cancel_token, rate_limiter=self.rate_limiter, since=self.since)
+            save_future = self.pipeline.submit(product_id, reviews) if reviews else None
+            self._record_outcome(result, reviews, save_future)
+            if head is not None and result['status'] in SUCCESS_STATUSES:
+                # 끝까지 받은 경우에만 기준을 옮긴다 (실패한 페이지가 있으면 다음 배치에서 다시 받음)
+                self.snapshots.update(product_id, head)
+        except Exception as e:
+            logging.error(f"상품 {product_id} 수집 실패: {e}", exc_info=True)
+            result['error'] = f"{type(e).__name__}: {e}"
+        finally:
+            result['duration_sec'] = round(time.monotonic() - started, 1)
+            self.stats.finish_product(product_id, result['status'])
+        return result
@@ -0,0 +1,422 @@
+import heapq
+import json
+import logging
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+from olive_engine.runtime import CancelToken, RateLimiter, ScrapeCancelled, ScrapeStats, resolve_cancel_token, sleep_with_backoff
+from olive_engine.transform import parse_review_date
+from olive_engine.transport import SORT_LATEST, RequestsTransport, ReviewTransport
+
+
+def extract_product_id(input_string: str) -> str | None:
+    """상품 ID(A + 숫자 12자리) 또는 goodsNo 파라미터가 있는 올리브영 URL에서 상품 ID를 추출합니다."""
+    # URL 형식 확인
+    if input_string.startswith("http://") or input_string.startswith("https://"):
+        parsed_url = urlparse(input_string)
+        query_params = parse_qs(parsed_url.query)
+        goods_no = query_params.get('goodsNo', [None])[0]
+        if goods_no:
+            return goods_no
+        else:
+            logging.warning(f"URL에서 'goodsNo' 파라미터를 찾을 수 없습니다: {input_string}")
+            return None
+    else:
+        if re.fullmatch(r"A[0-9]{12}", input_string):
+            return input_string
+        else:
+            logging.warning(f"유효한 상품 ID 형식이 아닙니다: {input_string}")
+            return None
+
+
+RETRY_MAX_ATTEMPTS = 4      # 페이지당 최대 시도 횟수 (첫 시도 포함)
+RETRY_BASE_DELAY = 10.0     # 지연 재시도 첫 대기 시간(초). 이후 시도마다 두 배
+RETRY_MAX_DELAY = 120.0
+
+
+class DeferredRetryQueue:
+    """실패한 페이지를 모아두었다가 백오프 시간이 지나면 다시 꺼내주는 큐.
+
+    실패한 페이지 때문에 수집 전체가 멈추지 않도록, 정상 페이지는 계속 진행하고
+    실패한 페이지는 시도 횟수에 따라 지수적으로 늘어나는 대기 후에 재시도한다.
+    최대 시도 횟수를 넘긴 페이지는 given_up에 남는다.
+    """
+
+    def __init__(self, max_attempts: int = RETRY_MAX_ATTEMPTS, base_delay: float = RETRY_BASE_DELAY, max_delay: float = RETRY_MAX_DELAY):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._heap: list = []  # (재시도 가능 시각, 페이지)
+        self.attempts: dict[int, int] = {}
+        self.given_up: dict[int, str] = {}  # 페이지 -> 마지막 실패 사유
+
+    def __len__(self):
+        return len(self._heap)
+
+    def defer(self, page: int, reason: str) -> bool:
+        """페이지를 재시도 대기열에 넣습니다. 최대 시도 횟수를 넘겼으면 포기하고 False를 반환합니다."""
+        attempts = self.attempts.get(page, 0) + 1
+        self.attempts[page] = attempts
+        if attempts >= self.max_attempts:
+            self.given_up[page] = reason
+            return False
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1))) * random.uniform(0.8, 1.2)
+        heapq.heappush(self._heap, (time.monotonic() + delay, page))
+        return True
+
+    def pop_ready(self) -> int | None:
+        if self._heap and self._heap[0][0] <= time.monotonic():
+            return heapq.heappop(self._heap)[1]
+        return None
+
+    def seconds_until_ready(self) -> float:
+        if not self._heap:
+            return 0.0
+        return max(self._heap[0][0] - time.monotonic(), 0.0)
+
+    def discard_after(self, last_page: int) -> None:
+        """마지막 페이지가 확인되면 그 뒤 페이지의 재시도는 의미가 없으므로 버립니다."""
+        self._heap = [item for item in self._heap if item[1] <= last_page]
+        heapq.heapify(self._heap)
+        for page in [p for p in self.given_up if p > last_page]:
+            del self.given_up[page]
+
+
+# 한 페이지 요청 결과
+PAGE_OK = 'ok'          # 리뷰를 받음
+PAGE_END = 'end'        # 빈 페이지/gdasList 없음 - 마지막 페이지를 지남
+PAGE_RETRY = 'retry'    # 일시적 실패 - 지연 재시도 대상
+PAGE_ABORT = 'abort'    # 인증 문제 등으로 이 상품 수집을 더 진행할 수 없음
+
+
+def fetch_review_page(transport: ReviewTransport, product_id: str, page: int, token: CancelToken, log_callback=None, stats: ScrapeStats | None = None, rate_limiter: RateLimiter | None = None, extra_params: dict | None = None) -> tuple[str, object]:
+    """리뷰 API 한 페이지를 한 번 요청하고 (상태, 리뷰 목록 또는 실패 사유)를 반환합니다."""
+    if log_callback and page == 1:
+        log_callback(f"API 요청 시작: {transport.api_url} ({transport.backend_name}, timeout={transport.timeout}초)")
+    logging.debug(f"페이지 {page} API 요청: {transport.api_url}")
+
+    if rate_limiter:
+        rate_limiter.acquire(token)
+    try:
+        # 전송 타임아웃(transport.timeout)이 대기 시간을 제한하므로 직접 호출하고, 끝난 뒤 아래 sleep에서 중지 요청을 확인한다
+        token.raise_if_cancelled()
+        response = transport.get_review_page(product_id, page, extra_params)
+    except ScrapeCancelled:
+        raise
+    except Exception as e:
+        error_msg = f"페이지 {page} 요청 오류: {type(e).__name__}: {e}"
+        if log_callback:
+            log_callback(error_msg)
+        logging.error(error_msg, exc_info=True)
+        return PAGE_RETRY, type(e).__name__
+    finally:
+        # 요청 간 최소 간격 유지
+        token.sleep(random.uniform(1.2, 2.0))
+
+    if log_callback and page == 1:
+        log_callback(f"응답 받음: 상태 코드 {response.status_code}")
+    logging.debug(f"페이지 {page} 응답: {response.status_code}")
+
+    result = classify_review_response(response, page, log_callback)
+    throttle = throttle_delay(response.status_code)
+    if throttle:
+        wait_time, reason = throttle
+        if log_callback:
+            log_callback(f"{response.status_code}: {wait_time:.1f}초 대기")
+        sleep_with_backoff(wait_time, reason, stats, token)
+    return result
+
+
+def throttle_delay(status_code: int) -> tuple[float, str] | None:
+    """429/403은 페이지 문제가 아니라 서버 전체의 제한이므로 잠시 전체 요청을 멈춘다. (대기 초, 사유) 또는 None."""
+    if status_code == 429:
+        return random.uniform(25, 35), "429 요청 제한"
+    if status_code == 403:
+        return random.uniform(40, 60), "403 차단"
+    return None
+
+
+def classify_review_response(response, page: int, log_callback=None) -> tuple[str, object]:
+    """리뷰 API 응답을 (상태, 리뷰 목록 또는 실패 사유)로 해석합니다. 동기/비동기 수집이 함께 쓴다."""
+    if response.status_code != 200:
+        if log_callback:
+            log_callback(f"페이지 {page} 요청 실패: 상태 코드 {response.status_code}")
+        return PAGE_RETRY, f"HTTP {response.status_code}"
+
+    content_type = response.headers.get('Content-Type', '')
+    if 'json' not in content_type.lower():
+        if '<html' in response.text.lower():
+            if log_callback:
+                log_callback(f"페이지 {page} 응답이 HTML입니다. 로그인/캡차 필요 가능성")
+            if page == 1:
+                return PAGE_ABORT, "HTML 응답"
+            return PAGE_RETRY, "HTML 응답"
+
+    try:
+        data = response.json()
+    except json.JSONDecodeError:
+        if log_callback:
+            log_callback(f"페이지 {page} JSON 파싱 실패")
+        if page <= 3:
+            return PAGE_ABORT, "JSON 파싱 실패"
+        return PAGE_RETRY, "JSON 파싱 실패"
+
+    if 'gdasList' not in data:
+        if log_callback:
+            log_callback(f"페이지 {page}에 gdasList 없음. 종료")
+        return PAGE_END, None
+    if len(data['gdasList']) == 0:
+        if log_callback:
+            log_callback(f"빈 페이지 감지: {page}. 종료")
+        return PAGE_END, None
+    return PAGE_OK, data['gdasList']
+
+
+def parse_since(value) -> date | None:
+    """수집 기준일을 해석합니다. 'YYYY-MM-DD'/'YYYY.MM.DD' 날짜나 '30d'(최근 30일) 형식을 받고, 빈 값이면 None."""
+    if value is None or isinstance(value, date):
+        return value
+    text = str(value).strip()
+    if not text:
+        return None
+    match = re.fullmatch(r'(\d+)\s*[dD일]', text)
+    if match:
+        return date.today() - timedelta(days=int(match.group(1)))
+    return datetime.strptime(text.replace('.', '-').replace('/', '-'), '%Y-%m-%d').date()
+
+
+def since_params(extra_params: dict | None, since: date | None, known_ids=None) -> dict | None:
+    """기준일이나 이미 받은 리뷰 번호가 있으면 최신순 정렬을 요청합니다 (호출자가 정렬을 직접 지정한 경우는 그대로 둔다)."""
+    if since is None and not known_ids:
+        return extra_params
+    return {'gdasSort': SORT_LATEST, **(extra_params or {})}
+
+
+def apply_since(reviews: list, since: date | None) -> tuple[list, bool]:
+    """최신순 페이지에서 기준일 이전 리뷰를 걸러내고 (남은 리뷰, 기준일에 도달했는지)를 반환합니다.
+
+    날짜를 해석할 수 없는 리뷰는 남겨 둔다.
+    """
+    if since is None:
+        return reviews, False
+    kept = []
+    for review in reviews:
+        review_date = parse_review_date(review)
+        if review_date is None or review_date >= since:
+            kept.append(review)
+    return kept, len(kept) < len(reviews)
+
+
+def apply_known_ids(reviews: list, known_ids) -> tuple[list, bool]:
+    """최신순 페이지에서 이미 받은 리뷰(gdasSeq)가 처음 나오기 전까지만 남기고 (남은 리뷰, 도달 여부)를 반환합니다."""
+    if not known_ids:
+        return reviews, False
+    for i, review in enumerate(reviews):
+        if str(review.get('gdasSeq', '')) in known_ids:
+            return reviews[:i], True
+    return reviews, False
+
+
+def fetch_reviews(session: requests.Session | ReviewTransport, user_agent: str, product_id: str, total_pages: int, log_callback=None, stop_check_callback=None, stats: ScrapeStats | None = None, cancel_token: CancelToken | None = None, rate_limiter: RateLimiter | None = None, extra_params: dict | None = None, since: date | None = None) -> list:
+    """리뷰를 1페이지부터 순서대로 수집합니다.
+
+    실패한 페이지는 DeferredRetryQueue로 미뤄 두고 다음 페이지를 계속 진행하며,
+    미뤄 둔 페이지는 백오프가 지나면 다시 시도합니다. 끝내 실패한 페이지는 로그와
+    stats.products[product_id]['failed_pages']에 남습니다. 결과는 페이지 순서대로 반환합니다.
+    session에는 여러 상품이 공유하는 ReviewTransport를 넘기는 것을 권장합니다.
+    extra_params는 리뷰 API 쿼리(point, itemNo, optionValue 등)를 덮어씁니다.
+    since(date)를 넘기면 최신순으로 요청하고 그 날짜보다 오래된 리뷰가 나오는 페이지에서 멈춥니다.
+    """
+    token = resolve_cancel_token(cancel_token, stop_check_callback)
+    transport = session if isinstance(session, ReviewTransport) else RequestsTransport.from_session(session, user_agent)
+    reviews, failed_pages, aborted, _ = fetch_review_sequence(transport, product_id, total_pages, token, log_callback, stats, rate_limiter, extra_params, since)
+    if stats and not aborted:
+        stats.record_failed_pages(product_id, failed_pages)
+    return reviews
+
+
+def fetch_review_sequence(transport: ReviewTransport, product_id: str, total_pages: int, token: CancelToken, log_callback=None, stats: ScrapeStats | None = None, rate_limiter: RateLimiter | None = None, extra_params: dict | None = None, since: date | None = None, start_page: int = 1, known_ids=None) -> tuple[list, list[int], bool, bool]:
+    """한 쿼리의 start_page~total_pages 페이지를 차례로 수집합니다.
+
+    known_ids(gdasSeq 문자열 집합)를 넘기면 최신순으로 요청하고 이미 받은 리뷰가 나오는 페이지에서 멈춘다 (증분 수집).
+    (리뷰, 끝내 실패한 페이지, 중단 여부, 마지막 페이지/기준일 도달 여부)를 반환한다.
+    """
+    extra_params = since_params(extra_params, since, known_ids)
+    page_reviews: dict[int, list] = {}
+    retry_queue = DeferredRetryQueue()
+    last_page = total_pages
+    next_page = start_page
+    reached_end = False
+    page_count = max(1, total_pages - start_page + 1)
+    progress_interval = max(1, page_count // 20)
+    start_time = time.time()
+    
+    if log_callback:
+        log_callback(f"fetch_reviews 시작: 총 {page_count}페이지 수집 예정" + (f" ({start_page}페이지부터)" if start_page > 1 else ""))
+    logging.info(f"fetch_reviews 시작: product_id={product_id}, pages={start_page}~{total_pages}")
+
+    try:
+        while True:
+            token.raise_if_cancelled()
+            page = retry_queue.pop_ready()
+            if page is None:
+                if next_page <= last_page:
+                    page = next_page
+                    next_page += 1
+                elif len(retry_queue):
+                    sleep_with_backoff(retry_queue.seconds_until_ready(), f"실패 페이지 {len(retry_queue)}개 재시도 대기", stats, token)
+                    continue
+                else:
+                    break
+            elif page > last_page:
+                continue
+            else:
+                if log_callback:
+                    log_callback(f"페이지 {page} 재시도 ({retry_queue.attempts.get(page, 0) + 1}/{retry_queue.max_attempts})")
+
+            status, payload = fetch_review_page(transport, product_id, page, token, log_callback, stats, rate_limiter, extra_params)
+
+            if status == PAGE_ABORT:
+                return [], [], True, True
+            if status == PAGE_END:
+                last_page = min(last_page, page - 1)
+                reached_end = True
+                retry_queue.discard_after(last_page)
+                continue
+            if status == PAGE_RETRY:
+                if stats:
+                    stats.record_retry(product_id)
+                if retry_queue.defer(page, payload):
+                    if log_callback:
+                        log_callback(f"페이지 {page} 실패({payload}) - 나중에 다시 시도합니다")
+                else:
+                    if log_callback:
+                        log_callback(f"페이지 {page} 최대 재시도 초과({payload}) - 건너뜁니다")
+                continue
+
+            payload, reached_since = apply_since(payload, since)
+            payload, reached_known = apply_known_ids(payload, known_ids)
+            if reached_since or reached_known:
+                # 최신순이므로 이후 페이지는 모두 기준일 이전이거나 이미 받은 리뷰다
+                last_page = min(last_page, page)
+                reached_end = True
+                retry_queue.discard_after(last_page)
+                if log_callback:
+                    reason = f"기준일({since}) 이전 리뷰" if reached_since else "이미 받은 리뷰"
+                    log_callback(f"페이지 {page}에서 {reason} 도달 - 이후 페이지는 요청하지 않습니다")
+            page_reviews[page] = payload
+            if stats:
+                stats.record_page(product_id, len(payload))
+            if log_callback:
+                log_callback(f"페이지 {page}: {len(payload)}개 (총 {sum(len(r) for r in page_reviews.values())})")
+
+            done = len(page_reviews)
+            if done % progress_interval == 0:
+                elapsed = time.time() - start_time
+                if log_callback:
+                    log_callback(f"진행률: {done/page_count*100:.1f}% ({done}/{page_count}), 경과 {elapsed:.1f}s")
+    except ScrapeCancelled:
+        if log_callback:
+            log_callback(f"수집 중지 요청 감지. 리뷰 수집을 중단합니다. (지금까지 {sum(len(r) for r in page_reviews.values())}개)")
+        logging.info(f"fetch_reviews 중지: product_id={product_id}")
+
+    failed_pages = sorted(p for p in retry_queue.given_up if p <= last_page)
+    if failed_pages:
+        message = f"끝내 수집하지 못한 페이지 {len(failed_pages)}개: {failed_pages}"
+        if log_callback:
+            log_callback(message)
+        logging.warning(f"상품 {product_id}: {message}")
+
+    all_reviews: list = []
+    for page in sorted(page_reviews):
+        all_reviews.extend(page_reviews[page])
+    return all_reviews, failed_pages, False, reached_end
+
+
+PARTITION_RATINGS = ('1', '2', '3', '4', '5')  # 리뷰 API의 point 값 (별점별 필터)
+PARTITION_WORKERS = 5           # 동시에 수집하는 샤드 수
+PARTITION_DEFAULT_RATE = 2.0    # rate_limiter를 넘기지 않았을 때 샤드 전체의 요청 속도 (요청/초)
+
+
+def build_partitions(by_rating: bool = True, options: list[dict] | None = None) -> list[dict]:
+    """리뷰 API 필터(별점 point, 옵션 itemNo/optionValue)로 상품 하나를 서로 겹치지 않는 샤드로 나눕니다.
+
+    각 샤드는 fetch_reviews의 extra_params로 쓰는 dict이다. 옵션 목록은 {'itemNo', 'optionValue'} dict 목록.
+    """
+    option_params = [{'itemNo': str(o.get('itemNo') or 'all_search'), 'optionValue': str(o.get('optionValue') or '')}
+                     for o in options or []] or [{}]
+    rating_params = [{'point': point} for point in PARTITION_RATINGS] if by_rating else [{}]
+    return [{**option, **rating} for option in option_params for rating in rating_params]
+
+
+def partition_label(extra_params: dict | None) -> str:
+    return ','.join(f"{k}={v}" for k, v in (extra_params or {}).items()) or '전체'
+
+
+def merge_partition_reviews(shard_reviews: list[list]) -> list:
+    """샤드별 결과를 합치면서 리뷰 번호(gdasSeq)가 같은 리뷰는 한 번만 남깁니다. 번호가 없는 리뷰는 그대로 둔다."""
+    merged, seen = [], set()
+    for reviews in shard_reviews:
+        for review in reviews:
+            review_id = review.get('gdasSeq')
+            if review_id is not None:
+                if review_id in seen:
+                    continue
+                seen.add(review_id)
+            merged.append(review)
+    return merged
+
+
+def fetch_reviews_partitioned(transport: ReviewTransport, product_id: str, max_pages: int, partitions: list[dict] | None = None, workers: int = PARTITION_WORKERS, log_callback=None, stats: ScrapeStats | None = None, cancel_token: CancelToken | None = None, rate_limiter: RateLimiter | None = None, since: date | None = None) -> list:
+    """상품 하나를 샤드로 나눠 병렬로 수집하고 중복을 제거해 합칩니다.
+
+    샤드마다 독립된 페이지 순서와 재시도 큐를 가지므로 한 샤드가 실패해도 나머지 결과는 그대로 남는다.
+    max_pages는 샤드별 최대 페이지 수이다. 실패한 샤드/페이지는 '샤드:페이지' 형태로 stats의 failed_pages에 남는다.
+    """
+    token = resolve_cancel_token(cancel_token)
+    partitions = partitions or build_partitions()
+    # 샤드들이 동시에 요청하므로 전역 속도 제한 없이 돌리지 않는다
+    rate_limiter = rate_limiter or RateLimiter(PARTITION_DEFAULT_RATE, burst=min(workers, len(partitions)))
+    if log_callback:
+        log_callback(f"분할 수집 시작: 샤드 {len(partitions)}개 ({', '.join(partition_label(p) for p in partitions)}), 동시 {workers}개")
+
+    def fetch_shard(extra_params):
+        label = partition_label(extra_params)
+        shard_log = (lambda msg: log_callback(f"[{label}] {msg}")) if log_callback else None
+        reviews, failed, aborted, _ = fetch_review_sequence(transport, product_id, max_pages, token, shard_log, stats, rate_limiter, extra_params, since)
+        if aborted:
+            raise RuntimeError("인증 문제로 샤드 수집 중단")
+        return reviews, [f"{label}:{page}" for page in failed]
+
+    shard_reviews: list[list] = [[] for _ in partitions]
+    failed_pages: list[str] = []
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='olive-shard') as executor:
+        futures = {executor.submit(fetch_shard, extra_params): i for i, extra_params in enumerate(partitions)}
+        for future in as_completed(futures):
+            i = futures[future]
+            label = partition_label(partitions[i])
+            try:
+                shard_reviews[i], shard_failed = future.result()
+                failed_pages.extend(shard_failed)
+                if log_callback:
+                    log_callback(f"샤드 {label} 완료: {len(shard_reviews[i])}개")
+            except Exception as e:
+                # 샤드 하나의 예외가 다른 샤드 결과를 버리게 하지 않는다
+                failed_pages.append(f"{label}:전체")
+                if log_callback:
+                    log_callback(f"샤드 {label} 실패: {type(e).__name__}: {e}")
+                logging.error(f"상품 {product_id} 샤드 {label} 수집 실패: {e}", exc_info=True)
+
+    merged = merge_partition_reviews(shard_reviews)
+    duplicates = sum(len(r) for r in shard_reviews) - len(merged)
+    if stats:
+        stats.record_failed_pages(product_id, failed_pages)
+    if log_callback:
+        log_callback(f"분할 수집 완료: {len(merged)}개 (중복 제거 {duplicates}개, 실패 {len(failed_pages)}건)")
+    return merged
@@ -0,0 +1,242 @@
+import threading
+import time
+from collections import deque
+
+
+RATE_WINDOW_SECONDS = 30.0  # 처리량 계산에 사용할 최근 구간 길이
+
+
+class ScrapeStats:
+    """스크래퍼 계측 정보.
+
+    수집 스레드가 페이지/리뷰/재시도/대기 상태를 기록하고, GUI 등은 snapshot()으로
+    최근 RATE_WINDOW_SECONDS 동안의 처리량과 예상 남은 시간을 읽는다.
+    모든 메서드는 스레드 안전하다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, batch_total: int = 0) -> None:
+        with self._lock:
+            self.started_at = time.monotonic()
+            self.batch_total = batch_total
+            self.batch_done = 0
+            self.pages = 0
+            self.reviews = 0
+            self.retries = 0
+            self.backoff_until = 0.0
+            self.backoff_reason = ''
+            self.current_product = ''
+            self.products: dict[str, dict] = {}
+            self._events: deque = deque()  # (시각, 페이지 수, 리뷰 수)
+
+    def start_product(self, product_id: str, max_pages: int) -> None:
+        with self._lock:
+            self.current_product = product_id
+            self.products[product_id] = {
+                'max_pages': max_pages,
+                'pages': 0,
+                'reviews': 0,
+                'retries': 0,
+                'failed_pages': [],
+                'status': 'running',
+                'started_at': time.monotonic(),
+                'finished_at': None,
+            }
+
+    def finish_product(self, product_id: str, status: str = 'done') -> None:
+        with self._lock:
+            info = self.products.get(product_id)
+            if info and info['finished_at'] is None:
+                info['status'] = status
+                info['finished_at'] = time.monotonic()
+                self.batch_done += 1
+
+    def record_page(self, product_id: str, review_count: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.pages += 1
+            self.reviews += review_count
+            info = self.products.get(product_id)
+            if info:
+                info['pages'] += 1
+                info['reviews'] += review_count
+            self._events.append((now, 1, review_count))
+            self._trim_events(now)
+
+    def record_retry(self, product_id: str) -> None:
+        with self._lock:
+            self.retries += 1
+            info = self.products.get(product_id)
+            if info:
+                info['retries'] += 1
+
+    def record_failed_pages(self, product_id: str, pages: list[int]) -> None:
+        with self._lock:
+            info = self.products.get(product_id)
+            if info:
+                info['failed_pages'] = list(pages)
+
+    def product_info(self, product_id: str) -> dict:
+        with self._lock:
+            info = self.products.get(product_id)
+            return {**info, 'failed_pages': list(info['failed_pages'])} if info else {}
+
+    def failed_pages(self) -> dict[str, list[int]]:
+        """끝내 수집하지 못한 페이지가 있는 상품별 페이지 목록."""
+        with self._lock:
+            return {pid: list(info['failed_pages']) for pid, info in self.products.items() if info['failed_pages']}
+
+    def set_backoff(self, seconds: float, reason: str) -> None:
+        with self._lock:
+            self.backoff_until = time.monotonic() + seconds
+            self.backoff_reason = reason
+
+    def clear_backoff(self) -> None:
+        with self._lock:
+            self.backoff_until = 0.0
+            self.backoff_reason = ''
+
+    def _trim_events(self, now: float) -> None:
+        while self._events and now - self._events[0][0] > RATE_WINDOW_SECONDS:
+            self._events.popleft()
+
+    def snapshot(self) -> dict:
+        """현재 계측 값을 dict로 반환한다. 시간 단위는 초."""
+        now = time.monotonic()
+        with self._lock:
+            self._trim_events(now)
+            window = min(RATE_WINDOW_SECONDS, max(now - self.started_at, 1.0))
+            pages_per_sec = sum(e[1] for e in self._events) / window
+            reviews_per_sec = sum(e[2] for e in self._events) / window
+
+            product_eta = None
+            product_pages = product_max_pages = 0
+            batch_remaining_pages = 0
+            for pid, info in self.products.items():
+                if info['finished_at'] is None:
+                    remaining = max(info['max_pages'] - info['pages'], 0)
+                    batch_remaining_pages += remaining
+                    if pid == self.current_product and pages_per_sec > 0:
+                        product_eta = remaining / pages_per_sec
+                if pid == self.current_product:
+                    product_pages, product_max_pages = info['pages'], info['max_pages']
+            # 아직 시작하지 않은 상품은 지금까지의 상품당 평균 페이지 수로 추정
+            not_started = max(self.batch_total - len(self.products), 0)
+            if not_started and self.products:
+                avg_pages = sum(i['max_pages'] for i in self.products.values()) / len(self.products)
+                batch_remaining_pages += int(not_started * avg_pages)
+            batch_eta = batch_remaining_pages / pages_per_sec if pages_per_sec > 0 else None
+
+            backoff_left = max(self.backoff_until - now, 0.0)
+            return {
+                'elapsed': now - self.started_at,
+                'pages': self.pages,
+                'reviews': self.reviews,
+                'retries': self.retries,
+                'pages_per_sec': pages_per_sec,
+                'reviews_per_sec': reviews_per_sec,
+                'current_product': self.current_product,
+                'product_pages': product_pages,
+                'product_max_pages': product_max_pages,
+                'product_eta': product_eta,
+                'batch_done': self.batch_done,
+                'batch_total': self.batch_total,
+                'batch_eta': batch_eta,
+                'backoff_left': backoff_left,
+                'backoff_reason': self.backoff_reason if backoff_left > 0 else '',
+            }
+
+
+CANCEL_POLL_SECONDS = 0.2  # 중지 요청을 확인하는 최대 간격
+
+
+class ScrapeCancelled(Exception):
+    """중지 요청으로 대기, 요청 또는 드라이버 호출이 중단되었을 때 발생합니다."""
+
+
+class CancelToken:
+    """수집 중지 요청을 모든 대기/요청/드라이버 호출에 전달하는 토큰.
+
+    cancel()이 호출되면 진행 중인 sleep()이 CANCEL_POLL_SECONDS 안에 ScrapeCancelled를 던진다.
+HTTP 요청과 드라이버 호출은 스레드로 떼어 내지 않고 짧은 타임아웃으로 끊어 호출한 뒤 토큰을 확인한다.
+중단된 호출이 뒤에서 세션/드라이버를 계속 쓰는 일이 없게 하기 위함이다.
+    기존 stop_check_callback 방식과 호환되도록 check_callback을 함께 받을 수 있고,
+    토큰 자체를 stop_check_callback으로 넘겨도 동작한다.
+    """
+
+    def __init__(self, check_callback=None):
+        self._event = threading.Event()
+        self._check_callback = check_callback
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def is_cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        if self._check_callback and self._check_callback():
+            self._event.set()
+            return True
+        return False
+
+    __call__ = is_cancelled
+
+    def raise_if_cancelled(self) -> None:
+        if self.is_cancelled():
+            raise ScrapeCancelled()
+
+    def sleep(self, seconds: float) -> None:
+        """seconds 동안 기다리되 중지 요청이 오면 즉시 ScrapeCancelled를 던집니다."""
+        deadline = time.monotonic() + seconds
+        while True:
+            self.raise_if_cancelled()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            self._event.wait(min(remaining, CANCEL_POLL_SECONDS))
+
+
+def resolve_cancel_token(cancel_token: CancelToken | None, stop_check_callback=None) -> CancelToken:
+    """넘겨받은 토큰을 그대로 쓰고, 없으면 예전 stop_check_callback을 감싼 토큰을 만듭니다."""
+    if cancel_token is not None:
+        return cancel_token
+    return CancelToken(check_callback=stop_check_callback)
+
+
+class RateLimiter:
+    """여러 수집 스레드가 함께 쓰는 토큰 버킷 방식의 전역 요청 속도 제한기."""
+
+    def __init__(self, rate_per_sec: float, burst: int = 1):
+        self.rate_per_sec = rate_per_sec
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cancel_token: CancelToken | None = None) -> None:
+        """요청 하나를 보낼 수 있을 때까지 기다립니다."""
+        token = resolve_cancel_token(cancel_token)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate_per_sec)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate_per_sec
+            token.sleep(wait)
+
+
+def sleep_with_backoff(seconds: float, reason: str, stats: ScrapeStats | None, cancel_token: CancelToken) -> None:
+    """백오프 상태를 stats에 표시한 채 중지 가능하게 기다립니다."""
+    if stats:
+        stats.set_backoff(seconds, reason)
+    try:
+        cancel_token.sleep(seconds)
+    finally:
+        if stats:
+            stats.clear_backoff()
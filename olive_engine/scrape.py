@@ -0,0 +1,71 @@
+import logging
+
+from olive_engine.auth import connect_driver, wait_for_page_load_and_handle_cloudflare
+from olive_engine.fetch import fetch_reviews, fetch_reviews_partitioned, parse_since
+from olive_engine.runtime import CancelToken, resolve_cancel_token
+from olive_engine.sinks import ResultPipeline, save_results
+from olive_engine.transform import process_reviews
+from olive_engine.transport import DEFAULT_BACKEND, ReviewTransport, make_transport
+
+
+def scrape_reviews(product_id: str, max_pages: int, out_dir: str, port: int, user_data_dir: str, chrome_main_path: str, log_callback=None, stop_check_callback=None, cancel_token: CancelToken | None = None, pipeline: ResultPipeline | None = None, transport_backend: str = DEFAULT_BACKEND, partitions: list[dict] | None = None, since=None, prompt_callback=None, transport: ReviewTransport | None = None):
+    """상품 하나를 수집합니다. pipeline을 넘기면 가공/저장은 그쪽에 맡기고 바로 반환합니다.
+
+    partitions(build_partitions 결과)를 넘기면 샤드별로 병렬 수집해 합칩니다.
+    since('2024-01-01', '30d' 또는 date)를 넘기면 그 날짜 이후 리뷰만 최신순으로 수집합니다.
+    prompt_callback은 wait_for_page_load_and_handle_cloudflare에 그대로 넘긴다 (CLI에서 캡차를 직접 풀 때).
+    여러 상품을 수집할 때는 transport를 하나 만들어 넘겨 연결 풀을 공유한다 (닫는 것은 호출자 몫).
+    넘기지 않으면 transport_backend로 이번 호출에만 쓸 전송 계층을 만들고 끝나면 닫는다.
+    """
+    since = parse_since(since)
+    token = resolve_cancel_token(cancel_token, stop_check_callback)
+    driver = None
+    try:
+        driver = connect_driver(port, chrome_main_path=chrome_main_path, user_data_dir=user_data_dir)
+        # wait_for_page_load_and_handle_cloudflare에 log_callback과 중지 토큰 전달
+        if not wait_for_page_load_and_handle_cloudflare(driver, product_id, timeout=60, log_callback=log_callback, cancel_token=token,
+                                                          prompt_callback=prompt_callback):
+            if log_callback:
+                log_callback("Cloudflare 또는 페이지 로드 문제로 인증 정보 획득 실패. 스크립트를 종료합니다.")
+            return
+
+        owns_transport = transport is None
+        if owns_transport:
+            transport = make_transport(transport_backend)
+        try:
+            transport.update_from_driver(driver)
+            if partitions:
+                reviews = fetch_reviews_partitioned(transport, product_id, max_pages, partitions, log_callback=log_callback, cancel_token=token, since=since)
+            else:
+                reviews = fetch_reviews(transport, transport.user_agent, product_id, max_pages, log_callback, cancel_token=token, since=since)
+        finally:
+            if owns_transport:
+                transport.close()
+            
+        if not reviews:
+            if log_callback:
+                log_callback("수집된 리뷰가 없습니다.")
+            return
+        if token.is_cancelled() and log_callback:
+            log_callback(f"사용자에 의해 수집이 중지되었습니다. 지금까지 수집한 {len(reviews)}개 리뷰를 저장합니다.")
+        if pipeline is not None:
+            pipeline.submit(product_id, reviews, out_dir)
+        else:
+            df = process_reviews(reviews)
+            save_results(product_id, reviews, df, out_dir, log_callback)
+    except Exception as e:
+        if log_callback:
+            log_callback(f"스크래핑 중 오류 발생: {e}")
+        logging.error(f"스크래핑 중 예상치 못한 오류 발생: {e}", exc_info=True)
+    finally:
+        if driver:
+            try:
+                driver.quit()
+                if log_callback:
+                    log_callback("Chrome 드라이버를 종료했습니다.")
+            except (OSError, Exception) as e:
+                if log_callback:
+                    log_callback(f"Chrome 드라이버 종료 중 오류 발생: {e}")
+                logging.warning(f"Chrome 드라이버 종료 중 오류 발생: {e}")
+            finally:
+                driver = None
@@ -0,0 +1,157 @@
+import csv
+import glob
+import json
+import logging
+import os
+import queue
+import re
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+
+from olive_engine.transform import process_reviews
+
+
+RAW_JSON_PATTERN = "올리브영_리뷰_원본_*.json"
+RESULT_JSON_RE = re.compile(r"올리브영_리뷰_(?:원본|가공)_(.+)_(\d{8}_\d{6})\.json$")
+
+
+def product_id_from_result_file(path: str) -> str:
+    """save_results가 만든 JSON 파일 이름에서 상품 ID를 꺼냅니다. 형식이 다르면 빈 문자열."""
+    match = RESULT_JSON_RE.search(os.path.basename(path))
+    return match.group(1) if match else ''
+
+
+def saved_at_from_result_file(path: str) -> datetime | None:
+    """save_results가 파일 이름에 붙인 저장 시각. 형식이 다르면 None."""
+    match = RESULT_JSON_RE.search(os.path.basename(path))
+    return datetime.strptime(match.group(2), "%Y%m%d_%H%M%S") if match else None
+
+
+def find_raw_result_files(inputs: list[str]) -> list[str]:
+    """파일/글롭/폴더 목록을 원본 리뷰 JSON 경로 목록으로 펼칩니다. 폴더는 그 안의 원본 JSON 전체."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, RAW_JSON_PATTERN))))
+        else:
+            paths.extend(sorted(glob.glob(item)) or [item])
+    return paths
+
+
+def export_rows(path: str, rows: list[dict], fieldnames: list[str] | None = None) -> None:
+    """색인/집계 CLI의 결과 행을 CSV 또는 JSONL(.jsonl/.ndjson)로 저장합니다."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.lower().endswith(('.jsonl', '.ndjson')):
+        with open(path, 'w', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + '\n')
+        return
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames or (list(rows[0]) if rows else ['product_id']))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def save_results(product_id: str, reviews: list, df, out_dir: str, log_callback=None) -> None:
+    os.makedirs(out_dir, exist_ok=True)
+    date_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+    raw_json = os.path.join(out_dir, f"올리브영_리뷰_원본_{product_id}_{date_str}.json")
+    with open(raw_json, 'w', encoding='utf-8') as f:
+        json.dump(reviews, f, ensure_ascii=False, indent=2)
+    if log_callback:
+        log_callback(f"원본 JSON 저장: {raw_json}")
+
+    if df is not None and not df.empty:
+        excel_path = os.path.join(out_dir, f"올리브영_리뷰_{product_id}_{date_str}.xlsx")
+        json_processed = os.path.join(out_dir, f"올리브영_리뷰_가공_{product_id}_{date_str}.json")
+        df.to_excel(excel_path, index=False, engine='openpyxl')
+        df.to_json(json_processed, force_ascii=False, orient='records', indent=2)
+        if log_callback:
+            log_callback(f"엑셀 저장: {excel_path}")
+            log_callback(f"가공 JSON 저장: {json_processed}")
+    else:
+        if log_callback:
+            log_callback("가공 데이터프레임이 비어 있어 엑셀/가공JSON 저장 생략")
+
+class ResultPipeline:
+    """수집이 끝난 상품의 가공(process_reviews)과 저장(save_results)을 백그라운드 스레드에서 처리합니다.
+
+    수집 스레드는 submit()으로 결과를 넘기고 곧바로 다음 상품 수집을 시작한다.
+    대기열은 max_pending개로 제한되어 저장이 밀리면 submit()이 잠시 멈춘다(메모리 상한).
+    sinks는 파일 저장 뒤 같은 스레드에서 write(product_id, reviews, df)가 호출되는 추가 저장소(검색 색인 등)이며,
+    annotate(product_id, reviews, df)가 있는 sink는 파일 저장 전에 호출되어 가공 데이터에 열을 더할 수 있다.
+    sink 실패는 로그만 남기고 저장 결과에는 영향을 주지 않는다.
+    close()는 남은 결과를 모두 저장할 때까지 기다린 뒤 sink도 닫는다.
+    """
+
+    def __init__(self, out_dir: str, log_callback=None, max_pending: int = 2, sinks: list | None = None):
+        self.out_dir = out_dir
+        self.sinks = list(sinks or [])
+        self.log_callback = log_callback
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_pending))
+        self._closed = False
+        self._thread = threading.Thread(target=self._worker, name='olive-result-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, product_id: str, reviews: list, out_dir: str | None = None) -> Future:
+        """결과 저장을 예약하고, 저장이 끝나면 가공된 행 수로 완료되는 Future를 반환합니다."""
+        if self._closed:
+            raise RuntimeError("이미 닫힌 ResultPipeline입니다.")
+        future: Future = Future()
+        self._queue.put((product_id, reviews, out_dir or self.out_dir, future))
+        return future
+
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                product_id, reviews, out_dir, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    df = process_reviews(reviews)
+                    self._call_sinks('annotate', product_id, reviews, df)
+                    save_results(product_id, reviews, df, out_dir, self.log_callback)
+                    self._call_sinks('write', product_id, reviews, df)
+                    future.set_result(len(df))
+                except Exception as e:
+                    if self.log_callback:
+                        self.log_callback(f"상품 {product_id} 결과 저장 실패: {e}")
+                    logging.error(f"상품 {product_id} 결과 저장 실패: {e}", exc_info=True)
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    def _call_sinks(self, method: str, product_id: str, reviews: list, df) -> None:
+        for sink in self.sinks:
+            handler = getattr(sink, method, None)
+            if handler is None:
+                continue
+            try:
+                handler(product_id, reviews, df)
+            except Exception as e:
+                if self.log_callback:
+                    self.log_callback(f"상품 {product_id} {type(sink).__name__} 반영 실패: {e}")
+                logging.error(f"상품 {product_id} {type(sink).__name__} 반영 실패: {e}", exc_info=True)
+
+    def close(self) -> None:
+        """남은 결과를 모두 저장하고 작업 스레드를 종료합니다. 여러 번 호출해도 안전합니다."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                logging.warning(f"{type(sink).__name__} 닫기 실패: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import re
+import unicodedata
+from datetime import date, datetime
+
+import pandas as pd
+
+
+def parse_review_date(review: dict) -> date | None:
+    """리뷰의 dispRegDate('2024.01.31' 형식)를 날짜로 바꿉니다. 해석할 수 없으면 None."""
+    text = str(review.get('dispRegDate') or '').strip()[:10].replace('-', '.')
+    try:
+        return datetime.strptime(text, '%Y.%m.%d').date()
+    except ValueError:
+        return None
+
+
+def review_flags(r: dict) -> dict:
+    """process_reviews와 같은 규칙으로 리뷰 하나의 5점 평점과 예/아니오 지표를 계산합니다."""
+    ord_no = r.get('ordNo', '') or ''
+    return {
+        '평점': (r.get('gdasScrVal', 0) or 0) / 2,
+        '재구매': r.get('firstGdasYn') == 'N',
+        '한달이상사용': r.get('renewUsed1mmGdasYn') == 'Y',
+        '오프라인구매': bool(ord_no) and not ord_no.startswith('Y'),
+        '사진여부': len(r.get('photoList', []) or []) > 0,
+    }
+
+
+REVIEW_FLAG_METRICS = ('재구매', '한달이상사용', '오프라인구매', '사진여부')
+
+PHOTO_URL_BASE = "https://image.oliveyoung.co.kr/uploads/images/gdasEditor/"
+
+
+def review_key(r: dict) -> str:
+    """상품 안에서 리뷰를 구별하는 키. 보통 gdasSeq이고, 없으면 작성자/날짜/내용의 해시."""
+    if r.get('gdasSeq') not in (None, ''):
+        return str(r['gdasSeq'])
+    raw = f"{r.get('mbrId', '')}|{r.get('dispRegDate', '')}|{r.get('gdasCont', '')}"
+    return 'h' + hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def review_text(r: dict) -> str:
+    """리뷰 본문(gdasCont)에서 <br/>을 줄바꿈으로 바꾼 내용."""
+    return (r.get('gdasCont', '') or '').replace('<br/>', '\n').strip()
+
+
+WORD_RE = re.compile(r"\w+")
+
+
+def fold_text(text: str) -> str:
+    """NFKC 정규화 후 소문자로 바꿉니다. 검색/중복/키워드 색인이 같은 기준으로 글자를 비교하도록 함께 쓴다."""
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+
+def words(text: str) -> list[str]:
+    """fold_text한 본문을 어절(\\w+) 단위로 나눕니다."""
+    return WORD_RE.findall(fold_text(text))
+
+
+def photo_urls(r: dict) -> list[str]:
+    """리뷰 하나의 photoList를 이미지 전체 URL 목록으로 바꿉니다."""
+    return [f"{PHOTO_URL_BASE}{p['appxFilePathNm']}" for p in r.get('photoList', []) or [] if p.get('appxFilePathNm')]
+
+
+def summarize_reviews(reviews: list) -> dict:
+    """원본 리뷰 목록의 간단한 요약(개수, 평균 평점, 지표별 비율, 최신 작성일)을 pandas 없이 계산합니다."""
+    summary = {'reviews': len(reviews), '평균평점': None, **{f"{name}_비율": None for name in REVIEW_FLAG_METRICS}, '최신작성일': ''}
+    if not reviews:
+        return summary
+    flags = [review_flags(r) for r in reviews]
+    summary['평균평점'] = round(sum(f['평점'] for f in flags) / len(flags), 2)
+    for name in REVIEW_FLAG_METRICS:
+        summary[f"{name}_비율"] = round(sum(f[name] for f in flags) / len(flags), 3)
+    summary['최신작성일'] = max((str(r.get('dispRegDate') or '') for r in reviews), default='')
+    return summary
+
+
+REVIEW_KEYS_ATTR = 'review_keys'  # process_reviews 결과(df.attrs)에 행 순서대로 담는 review_key 목록
+
+
+def process_reviews(reviews: list):
+    processed = []
+    keys = []
+    for r in reviews:
+        try:
+            flags = review_flags(r)
+            nickname = r.get('mbrNickNm', '') or (r.get('mbrId') or '알 수 없음')
+            user_id = r.get('mbrId', '') or '알 수 없음'
+            rating5 = flags['평점']
+            date = r.get('dispRegDate', '')
+            content = review_text(r)
+            option = r.get('itemNm', '')
+            has_photo = flags['사진여부']
+            help_cnt = r.get('recommCnt', 0)
+            rank_info = '일반'
+            rank = r.get('topRvrRnk', 0)
+            if rank and rank > 0:
+                rank_info = f"TOP {rank}위"
+            skin_info = []
+            for inf in r.get('addInfoNm', []) or []:
+                skin_info.append(inf.get('mrkNm', ''))
+            repurchase = flags['재구매']
+            long_use = flags['한달이상사용']
+            offline = flags['오프라인구매']
+
+            processed.append({
+                '작성자': nickname,
+                '아이디': user_id,
+                '회원랭킹': rank_info,
+                '평점': rating5,
+                '작성일': date,
+                '구매옵션': option,
+                '리뷰내용': content,
+                '리뷰형태': '포토리뷰' if has_photo else '일반리뷰',
+                '사진여부': '있음' if has_photo else '없음',
+                '사진URL': ';'.join(photo_urls(r)),
+                '도움이 돼요 수': help_cnt,
+                '재구매': '예' if repurchase else '아니오',
+                '한달이상사용': '예' if long_use else '아니오',
+                '오프라인구매': '예' if offline else '아니오',
+                '피부정보': ', '.join(skin_info) if skin_info else '',
+                '리뷰번호': r.get('gdasSeq', ''),  # 사진 매니페스트 등 다른 산출물과 행을 잇는 키
+            })
+            keys.append(review_key(r))
+        except Exception as e:
+            logging.warning(f"리뷰 처리 오류: {e}")
+            continue
+
+    df = pd.DataFrame(processed)
+    # 처리 중 건너뛴 리뷰가 있어도 sink가 행과 원본 리뷰를 맞출 수 있게 한다
+    df.attrs[REVIEW_KEYS_ATTR] = keys
+    return df
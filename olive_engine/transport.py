@@ -0,0 +1,294 @@
+import asyncio
+import importlib.util
+import logging
+import threading
+from types import MappingProxyType
+
+import requests
+from requests.adapters import HTTPAdapter
+
+REVIEW_API_URL = "https://www.oliveyoung.co.kr/store/goods/getGdasNewListJson.do"
+PRODUCT_URL_TEMPLATE = "https://www.oliveyoung.co.kr/store/goods/getGoodsDetail.do?goodsNo={product_id}"
+
+# 모든 리뷰 API 요청에 공통인 헤더. User-Agent와 Referer는 세션/상품별로 붙인다.
+BASE_HEADERS = MappingProxyType({
+    'Accept': '*/*',
+    'Accept-Language': 'ko,en;q=0.9,en-US;q=0.8',
+    'Cache-Control': 'no-cache',
+    'Pragma': 'no-cache',
+    'X-Requested-With': 'XMLHttpRequest',
+    'sec-ch-ua': '"Chromium";v="135", "Not.A/Brand";v="8"',
+    'sec-ch-ua-mobile': '?0',
+    'sec-ch-ua-platform': '"Windows"',
+    'sec-fetch-dest': 'empty',
+    'sec-fetch-mode': 'cors',
+    'sec-fetch-site': 'same-origin',
+})
+
+# 리뷰 API 정렬(gdasSort) 값
+SORT_HELPFUL = '05'     # 유용한 순 (기본)
+SORT_LATEST = '02'      # 최신 순 - 기준일(since) 수집에 사용
+
+# 리뷰 API 기본 쿼리 파라미터. goodsNo/pageIdx와 필터 값만 요청마다 덮어쓴다.
+BASE_PARAMS = MappingProxyType({
+    'goodsNo': '',
+    'gdasSort': SORT_HELPFUL,
+    'itemNo': 'all_search',
+    'pageIdx': 1,
+    'colData': '',
+    'keywordGdasSeqs': '',
+    'type': '',
+    'point': '',
+    'hashTag': '',
+    'optionValue': '',
+    'cTypeLength': '0',
+})
+
+DEFAULT_TIMEOUT = (5, 20)   # (연결, 읽기) 초
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+DEFAULT_BACKEND = 'requests'
+SITE_BASE_URL = "https://www.oliveyoung.co.kr"
+REVIEW_API_PATH = "/store/goods/getGdasNewListJson.do"
+
+
+class ReviewTransport:
+    """여러 상품과 스레드가 함께 쓰는 리뷰 API 전송 계층의 공통 부분.
+
+    하위 클래스는 HTTP 클라이언트 하나(커넥션 풀 포함)를 유지해 상품이 바뀌어도 keep-alive 연결과
+    TLS 세션을 재사용하고, 공통 헤더는 클라이언트에 한 번만 설정한다. TLS 인증서 검증은 기본으로 켜져 있다.
+    응답 객체는 status_code, headers, text, json()을 제공해야 한다.
+    """
+
+    backend_name = ''
+
+    def __init__(self, user_agent: str = '', timeout=DEFAULT_TIMEOUT, verify: bool = True,
+                 pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 base_url: str = SITE_BASE_URL):
+        self.timeout = timeout
+        self.verify = verify
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.api_url = base_url.rstrip('/') + REVIEW_API_PATH
+        self._referer_headers: dict[str, MappingProxyType] = {}
+        self._lock = threading.Lock()
+        self.user_agent = ''
+        self._open()
+        if user_agent:
+            self.set_user_agent(user_agent)
+
+    # --- 하위 클래스 구현 부분 ---
+    def _open(self) -> None:
+        raise NotImplementedError
+
+    def _set_header(self, name: str, value: str) -> None:
+        raise NotImplementedError
+
+    def _set_cookie(self, name: str, value: str, domain: str, path: str) -> None:
+        raise NotImplementedError
+
+    def _get(self, url: str, params: dict, headers):
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+    # --- 공통 부분 ---
+    def set_user_agent(self, user_agent: str) -> None:
+        self.user_agent = user_agent
+        self._set_header('User-Agent', user_agent)
+
+    @staticmethod
+    def read_driver_state(driver) -> tuple[list, str]:
+        """브라우저의 쿠키 목록과 User-Agent를 읽습니다 (드라이버 호출이라 블로킹)."""
+        return driver.get_cookies(), driver.execute_script("return navigator.userAgent;")
+
+    def update_from_driver(self, driver) -> None:
+        """브라우저의 최신 쿠키와 User-Agent를 세션에 반영합니다. 연결 풀은 그대로 유지됩니다."""
+        self.apply_driver_state(*self.read_driver_state(driver))
+
+    def apply_driver_state(self, cookies: list, user_agent: str) -> None:
+        with self._lock:
+            for c in cookies:
+                self._set_cookie(c.get('name'), c.get('value'), c.get('domain', ''), c.get('path', '/'))
+            self.set_user_agent(user_agent)
+
+    def update_cookies(self, cookies: dict) -> None:
+        with self._lock:
+            for name, value in cookies.items():
+                self._set_cookie(name, value, '', '/')
+
+    def _headers_for(self, product_id: str) -> MappingProxyType:
+        headers = self._referer_headers.get(product_id)
+        if headers is None:
+            headers = MappingProxyType({'Referer': PRODUCT_URL_TEMPLATE.format(product_id=product_id)})
+            self._referer_headers[product_id] = headers
+        return headers
+
+    def review_params(self, product_id: str, page: int, extra_params: dict | None = None) -> dict:
+        params = dict(BASE_PARAMS)
+        params['goodsNo'] = product_id
+        params['pageIdx'] = page
+        if extra_params:
+            params.update(extra_params)
+        return params
+
+    def get_review_page(self, product_id: str, page: int, extra_params: dict | None = None):
+        return self._get(self.api_url, self.review_params(product_id, page, extra_params), self._headers_for(product_id))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class RequestsTransport(ReviewTransport):
+    """requests.Session + urllib3 커넥션 풀 (HTTP/1.1). 기본 백엔드."""
+
+    backend_name = 'requests'
+
+    def __init__(self, *args, session: requests.Session | None = None, **kwargs):
+        self.session = session
+        super().__init__(*args, **kwargs)
+
+    def _open(self) -> None:
+        self.session = self.session or requests.Session()
+        # 재시도는 fetch_reviews의 지연 재시도 큐가 담당하므로 어댑터 수준 재시도는 끈다
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update(BASE_HEADERS)
+
+    @classmethod
+    def from_session(cls, session: requests.Session, user_agent: str) -> 'RequestsTransport':
+        """기존 requests.Session(쿠키 포함)을 감싸는 전송 계층을 만듭니다."""
+        return cls(user_agent=user_agent, session=session)
+
+    def _set_header(self, name, value):
+        self.session.headers[name] = value
+
+    def _set_cookie(self, name, value, domain, path):
+        self.session.cookies.set(name, value, domain=domain, path=path)
+
+    def _get(self, url, params, headers):
+        return self.session.get(url, params=params, headers=headers, timeout=self.timeout, verify=self.verify)
+
+    def close(self) -> None:
+        try:
+            self.session.close()
+        except Exception as e:
+            logging.debug(f"세션 종료 오류(무시 가능): {e}")
+
+
+class CurlCffiTransport(ReviewTransport):
+    """curl_cffi 세션 (libcurl, 브라우저 TLS 지문 흉내). test.py에서 쓰던 방식."""
+
+    backend_name = 'curl_cffi'
+    impersonate = 'chrome'
+
+    def _open(self) -> None:
+        from curl_cffi import CurlOpt, requests as curl_requests
+        # 동기 Session은 max_clients를 받지 않는다(AsyncSession 전용). 스레드별 curl 핸들의 연결 캐시 크기로 맞춘다
+        self.session = curl_requests.Session(impersonate=self.impersonate, curl_options={CurlOpt.MAXCONNECTS: self.pool_maxsize})
+        self.session.headers.update(dict(BASE_HEADERS))
+
+    def _set_header(self, name, value):
+        self.session.headers[name] = value
+
+    def _set_cookie(self, name, value, domain, path):
+        self.session.cookies.set(name, value, domain=domain or None, path=path)
+
+    def _get(self, url, params, headers):
+        timeout = self.timeout[1] if isinstance(self.timeout, tuple) else self.timeout
+        return self.session.get(url, params=params, headers=dict(headers), timeout=timeout, verify=self.verify)
+
+    def close(self) -> None:
+        try:
+            self.session.close()
+        except Exception as e:
+            logging.debug(f"세션 종료 오류(무시 가능): {e}")
+
+
+class HttpxTransport(ReviewTransport):
+    """httpx 클라이언트. h2 패키지가 있으면 HTTPS에서 HTTP/2 하나의 연결로 요청을 다중화한다."""
+
+    backend_name = 'httpx'
+
+    def _open(self) -> None:
+        import httpx
+        self.client = self._client_class(httpx)(**self._client_options(httpx))
+
+    @staticmethod
+    def _client_class(httpx):
+        return httpx.Client
+
+    def _client_options(self, httpx) -> dict:
+        http2 = importlib.util.find_spec('h2') is not None  # h2가 설치되어 있으면 HTTP/2를 쓴다
+        connect_timeout, read_timeout = self.timeout if isinstance(self.timeout, tuple) else (self.timeout, self.timeout)
+        return dict(
+            http2=http2,
+            verify=self.verify,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=self.pool_maxsize, max_keepalive_connections=self.pool_maxsize),
+            headers=dict(BASE_HEADERS),
+        )
+
+    def _set_header(self, name, value):
+        self.client.headers[name] = value
+
+    def _set_cookie(self, name, value, domain, path):
+        self.client.cookies.set(name, value, domain=domain, path=path)
+
+    def _get(self, url, params, headers):
+        return self.client.get(url, params=params, headers=headers)
+
+    def close(self) -> None:
+        try:
+            self.client.close()
+        except Exception as e:
+            logging.debug(f"세션 종료 오류(무시 가능): {e}")
+
+
+class AsyncHttpxTransport(HttpxTransport):
+    """httpx.AsyncClient 기반 전송 계층 (olive_async 전용).
+
+    get_review_page()는 코루틴을 반환하므로 await 해야 한다. 쿠키/헤더 변경과 요청은
+    모두 이벤트 루프 스레드에서 해야 하므로 드라이버 상태는 read_driver_state()로 따로 읽어
+    apply_driver_state()로 반영한다.
+    """
+
+    backend_name = 'httpx-async'
+
+    @staticmethod
+    def _client_class(httpx):
+        return httpx.AsyncClient
+
+    async def aclose(self) -> None:
+        try:
+            await self.client.aclose()
+        except Exception as e:
+            logging.debug(f"세션 종료 오류(무시 가능): {e}")
+
+    def close(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self.aclose())
+        else:
+            loop.create_task(self.aclose())
+
+
+TRANSPORT_BACKENDS = {
+    RequestsTransport.backend_name: RequestsTransport,
+    CurlCffiTransport.backend_name: CurlCffiTransport,
+    HttpxTransport.backend_name: HttpxTransport,
+}
+
+
+def make_transport(backend: str = DEFAULT_BACKEND, **kwargs) -> ReviewTransport:
+    """설정 이름(requests/curl_cffi/httpx)으로 전송 계층을 만듭니다. 필요한 패키지가 없으면 ImportError."""
+    backend = (backend or DEFAULT_BACKEND).strip().lower()
+    if backend not in TRANSPORT_BACKENDS:
+        raise ValueError(f"알 수 없는 전송 백엔드입니다: {backend} (사용 가능: {', '.join(TRANSPORT_BACKENDS)})")
+    return TRANSPORT_BACKENDS[backend](**kwargs)
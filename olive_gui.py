@@ -1,15 +1,32 @@
 import sys
 import os
+import asyncio
 import threading
 import logging
-import re
-from urllib.parse import urlparse, parse_qs
-from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QTextEdit, QFileDialog, QFrame, QProgressBar, QMessageBox, QScrollArea
-from PySide6.QtCore import Signal, QObject, Slot, Qt
+from collections import deque
+from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QPlainTextEdit, QFileDialog, QFrame, QProgressBar, QMessageBox, QScrollArea, QGridLayout, QTabWidget
+from PySide6.QtCore import Signal, Slot, Qt, QTimer
 import configparser
 from datetime import datetime
 
-from olive_scraper import ensure_chrome_debug, connect_driver, extract_session_from_driver, fetch_reviews, process_reviews, save_results, wait_for_page_load_and_handle_cloudflare
+try:
+    import qasync  # Qt 이벤트 루프 위에서 asyncio를 돌리기 위함 (선택)
+except ImportError:
+    qasync = None
+
+from olive_async import AsyncBatchRunner
+from olive_results import ResultsTab, SearchTab
+from olive_search import SEARCH_INDEX_FILENAME, ReviewSearchIndex
+from olive_aggregates import AGGREGATES_FILENAME, ReviewAggregates
+from olive_dedupe import DEDUPE_FILENAME, ReviewDedupeIndex
+from olive_history import HISTORY_FILENAME, ReviewHistory
+from olive_keywords import KEYWORDS_FILENAME, KeywordIndex
+from olive_reviewers import REVIEWERS_FILENAME, ReviewerIndex
+from olive_engine.auth import collect_memory_usage, connect_driver, ensure_chrome_debug, wait_for_page_load_and_handle_cloudflare
+from olive_engine.fetch import build_partitions, extract_product_id, fetch_reviews, fetch_reviews_partitioned, parse_since
+from olive_engine.runtime import CancelToken, ScrapeStats
+from olive_engine.sinks import ResultPipeline
+from olive_engine.transport import DEFAULT_BACKEND, make_transport
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
                     handlers=[
@@ -32,22 +49,78 @@ def handle_exception(exc_type, exc_value, exc_traceback):
 
 sys.excepthook = handle_exception
 
-# GUI 로깅을 위한 커스텀 핸들러
-class StreamHandler(logging.Handler, QObject):
-    log_signal = Signal(str)
-
-    def __init__(self, parent=None):
-        QObject.__init__(self, parent)
+LOG_FLUSH_INTERVAL_MS = 200   # 로그 화면 갱신 주기
+LOG_BUFFER_MAX_LINES = 5000   # 한 번의 갱신 주기 동안 보관할 최대 로그 줄 수
+LOG_VIEW_MAX_BLOCKS = 20000   # 로그 창에 표시할 최대 줄 수 (초과분은 앞에서부터 삭제)
+DASHBOARD_REFRESH_MS = 1000   # 실시간 현황 패널 갱신 주기
+DASHBOARD_MEMORY_EVERY = 5    # 메모리 사용량은 N번 갱신마다 한 번만 측정 (프로세스 탐색 비용)
+
+
+class LogBuffer:
+    """여러 스레드에서 들어오는 로그 줄을 모아두는 유한 링 버퍼.
+
+    GUI 타이머가 주기적으로 drain()을 호출해 한 번에 화면에 반영한다.
+    spill 파일이 지정되면 버퍼 한도와 관계없이 모든 줄을 파일에 남긴다.
+    """
+
+    def __init__(self, max_lines: int = LOG_BUFFER_MAX_LINES, spill_path: str = ''):
+        self._lock = threading.Lock()
+        self._lines = deque(maxlen=max_lines)
+        self._dropped = 0
+        self._spill_file = None
+        self.set_spill_path(spill_path)
+
+    def set_spill_path(self, spill_path: str) -> None:
+        with self._lock:
+            if self._spill_file:
+                self._spill_file.close()
+                self._spill_file = None
+            if spill_path:
+                try:
+                    os.makedirs(os.path.dirname(os.path.abspath(spill_path)), exist_ok=True)
+                    self._spill_file = open(spill_path, 'a', encoding='utf-8')
+                except OSError as e:
+                    logging.warning(f"로그 파일을 열 수 없습니다: {spill_path} ({e})")
+
+    def append(self, msg: str) -> None:
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self._dropped += 1
+            self._lines.append(msg)
+            if self._spill_file:
+                self._spill_file.write(msg + '\n')
+
+    def drain(self) -> tuple[list[str], int]:
+        """쌓인 로그 줄과 버퍼 한도 초과로 버려진 줄 수를 반환하고 버퍼를 비운다."""
+        with self._lock:
+            lines = list(self._lines)
+            self._lines.clear()
+            dropped, self._dropped = self._dropped, 0
+            if self._spill_file:
+                self._spill_file.flush()
+        return lines, dropped
+
+    def close(self) -> None:
+        self.set_spill_path('')
+
+
+# GUI 로깅을 위한 커스텀 핸들러 (레코드마다 시그널을 보내지 않고 버퍼에만 쌓는다)
+class StreamHandler(logging.Handler):
+    def __init__(self, log_buffer: LogBuffer):
         logging.Handler.__init__(self)
+        self.log_buffer = log_buffer
 
     def emit(self, record):
-        msg = self.format(record)
-        self.log_signal.emit(msg)
+        try:
+            self.log_buffer.append(self.format(record))
+        except Exception:
+            self.handleError(record)
 
 class OliveScraperGUI(QWidget):
     status_update_signal = Signal(str)
     progress_update_signal = Signal(int)
     message_box_signal = Signal(str, str, str) # type, title, message
+    memory_update_signal = Signal(object) # collect_memory_usage 결과 dict
 
     def __init__(self):
         super().__init__()
@@ -60,10 +133,18 @@ class OliveScraperGUI(QWidget):
         self.is_running = False
         self.is_running_lock = threading.Lock()
         self.current_scraper_thread = None
+        self.current_async_task = None
+        # qasync로 실행했을 때 __main__에서 넣어주는 Qt 통합 이벤트 루프
+        self.async_loop = None
+        self.cancel_token = CancelToken()
+        self.scrape_stats = ScrapeStats()
+        self.chrome_port = 9222
+        self.init_dashboard_timer()
 
         self.status_update_signal.connect(self.status_label.setText)
         self.progress_update_signal.connect(self.progress_bar.setValue)
         self.message_box_signal.connect(self._show_message_box)
+        self.memory_update_signal.connect(self._update_memory_labels)
 
         logging.info("올리브영 리뷰 수집기 GUI 시작.")
 
@@ -73,6 +154,28 @@ class OliveScraperGUI(QWidget):
             self.config['Settings'] = {}
         self.output_dir = self.config['Settings'].get('output_directory', os.getcwd())
         self.user_data_dir = self.config['Settings'].get('user_data_directory', '')
+        # 비워두면 로그 파일을 남기지 않는다
+        self.log_file = self.config['Settings'].get('log_file', '')
+        # 리뷰 API 전송 백엔드: requests / curl_cffi / httpx (bench_transport.py로 비교)
+        self.transport_backend = self.config['Settings'].get('transport', DEFAULT_BACKEND)
+        # 수집 엔진: thread(기본, 상품을 차례로 수집) / async(asyncio로 여러 상품과 페이지를 동시에 요청, httpx 필요)
+        self.engine = self.config['Settings'].get('engine', 'thread')
+        self.async_workers = self.config['Settings'].getint('async_workers', 4)
+        self.async_rate = self.config['Settings'].getfloat('async_rate', 2.0)
+        # 분할 수집: none(기본) / rating(별점별 샤드를 병렬로 수집, 최대 페이지 수는 샤드별로 적용)
+        self.partition = self.config['Settings'].get('partition', 'none')
+        # 저장하는 리뷰를 저장 폴더의 전체 검색 색인(review_search.sqlite)에도 넣을지 여부
+        self.search_index = self.config['Settings'].getboolean('search_index', False)
+        # 상품x날짜 집계(review_aggregates.sqlite)를 저장할 때마다 갱신할지 여부
+        self.aggregates = self.config['Settings'].getboolean('aggregates', False)
+        # 저장할 때 다른 리뷰와 거의 같은 본문을 찾아 '중복그룹' 열을 채울지 여부 (review_dedupe.sqlite)
+        self.dedupe = self.config['Settings'].getboolean('dedupe', False)
+        # 작성자(mbrId)별 상품 간 색인(review_reviewers.sqlite)을 저장할 때마다 갱신할지 여부
+        self.reviewers = self.config['Settings'].getboolean('reviewers', False)
+        # 도움이 돼요 수/TOP 순위 등이 수집 사이에 바뀐 값만 기록할지 여부 (review_history.sqlite)
+        self.history = self.config['Settings'].getboolean('history', False)
+        # 상품x별점 구간별 키워드/구문 빈도 캐시(review_keywords.sqlite)를 저장할 때마다 갱신할지 여부
+        self.keywords = self.config['Settings'].getboolean('keywords', False)
 
     def save_settings(self):
         self.config['Settings']['output_directory'] = self.output_dir_input.text()
@@ -137,6 +240,14 @@ class OliveScraperGUI(QWidget):
         user_data_dir_hbox.addWidget(user_data_dir_select_btn)
         input_layout.addLayout(user_data_dir_hbox)
 
+        since_hbox = QHBoxLayout()
+        since_label = QLabel("수집 기준일:")
+        self.since_input = QLineEdit()
+        self.since_input.setPlaceholderText("예: 2024-01-01 또는 30d (비우면 전체 기간)")
+        since_hbox.addWidget(since_label)
+        since_hbox.addWidget(self.since_input)
+        input_layout.addLayout(since_hbox)
+
         main_layout.addWidget(input_frame)
 
         button_frame = QHBoxLayout()
@@ -164,14 +275,17 @@ class OliveScraperGUI(QWidget):
 
         main_layout.addWidget(progress_frame)
 
+        main_layout.addWidget(self._create_dashboard_panel())
+
         log_frame = QFrame()
         log_frame.setFrameShape(QFrame.StyledPanel)
         log_layout = QVBoxLayout()
         log_frame.setLayout(log_layout)
         
         log_layout.addWidget(QLabel("로그:"))
-        self.log_output = QTextEdit()
+        self.log_output = QPlainTextEdit()
         self.log_output.setReadOnly(True)
+        self.log_output.setMaximumBlockCount(LOG_VIEW_MAX_BLOCKS)
         log_layout.addWidget(self.log_output)
 
         main_layout.addWidget(log_frame)
@@ -188,10 +302,104 @@ class OliveScraperGUI(QWidget):
 
         main_layout.addLayout(bottom_button_frame)
 
-        self.setLayout(main_layout)
+        collect_widget = QWidget()
+        collect_widget.setLayout(main_layout)
+        self.results_tab = ResultsTab(lambda: self.output_dir_input.text())
+        self.tab_widget = QTabWidget()
+        self.tab_widget.addTab(collect_widget, "리뷰 수집")
+        self.tab_widget.addTab(self.results_tab, "결과 보기")
+        self.search_tab = SearchTab(lambda: self.output_dir_input.text())
+        self.tab_widget.addTab(self.search_tab, "전체 검색")
+        # 결과 탭으로 넘어올 때마다 저장 폴더의 최신 결과 파일 목록을 다시 읽는다
+        self.tab_widget.currentChanged.connect(
+            lambda index: self.results_tab.refresh_file_list() if self.tab_widget.widget(index) is self.results_tab else None)
+
+        outer_layout = QVBoxLayout()
+        outer_layout.addWidget(self.tab_widget)
+        self.setLayout(outer_layout)
+
+        self.log_output.appendPlainText("올리브영 리뷰 수집기가 시작되었습니다.")
+        self.log_output.appendPlainText("상품 ID 또는 URL을 입력하고 '링크 추가' 버튼으로 여러 링크를 추가하여 수집할 수 있습니다.")
+
+    def _create_dashboard_panel(self):
+        dashboard_frame = QFrame()
+        dashboard_frame.setFrameShape(QFrame.StyledPanel)
+        dashboard_layout = QGridLayout()
+        dashboard_frame.setLayout(dashboard_layout)
+
+        self.dashboard_labels = {}
+        items = [
+            ('pages_per_sec', "페이지/초:"), ('reviews_per_sec', "리뷰/초:"),
+            ('product_eta', "상품 남은 시간:"), ('batch_eta', "전체 남은 시간:"),
+            ('backoff', "대기 상태:"), ('retries', "재시도:"),
+            ('process_mb', "프로그램 메모리:"), ('chrome_mb', "Chrome 메모리:"),
+        ]
+        for i, (key, text) in enumerate(items):
+            row, col = divmod(i, 2)
+            dashboard_layout.addWidget(QLabel(text), row, col * 2)
+            value_label = QLabel("-")
+            dashboard_layout.addWidget(value_label, row, col * 2 + 1)
+            self.dashboard_labels[key] = value_label
+        return dashboard_frame
+
+    def init_dashboard_timer(self):
+        self._dashboard_tick = 0
+        self._memory_probe_running = False
+        self.dashboard_timer = QTimer(self)
+        self.dashboard_timer.setInterval(DASHBOARD_REFRESH_MS)
+        self.dashboard_timer.timeout.connect(self._refresh_dashboard)
+        self.dashboard_timer.start()
+
+    @staticmethod
+    def _format_seconds(seconds):
+        if seconds is None:
+            return "-"
+        seconds = int(seconds)
+        hours, rest = divmod(seconds, 3600)
+        minutes, secs = divmod(rest, 60)
+        return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+    @Slot()
+    def _refresh_dashboard(self):
+        snap = self.scrape_stats.snapshot()
+        running = self._check_is_running()
+        labels = self.dashboard_labels
+        labels['pages_per_sec'].setText(f"{snap['pages_per_sec']:.2f} (누적 {snap['pages']})")
+        labels['reviews_per_sec'].setText(f"{snap['reviews_per_sec']:.1f} (누적 {snap['reviews']})")
+        labels['product_eta'].setText(self._format_seconds(snap['product_eta']) if running else "-")
+        labels['batch_eta'].setText(
+            f"{self._format_seconds(snap['batch_eta'])} ({snap['batch_done']}/{snap['batch_total']} 상품)" if running else "-")
+        if snap['backoff_left'] > 0:
+            labels['backoff'].setText(f"{snap['backoff_reason']} - {snap['backoff_left']:.0f}초 남음")
+        else:
+            labels['backoff'].setText("정상" if running else "-")
+        labels['retries'].setText(str(snap['retries']))
+
+        if running and snap['product_max_pages']:
+            self.progress_bar.setValue(min(100, int(snap['product_pages'] * 100 / snap['product_max_pages'])))
+
+        if self._dashboard_tick % DASHBOARD_MEMORY_EVERY == 0 and not self._memory_probe_running:
+            # 프로세스 탐색은 GUI 스레드를 막지 않도록 작업 스레드에서 하고 결과만 시그널로 받는다
+            self._memory_probe_running = True
+            threading.Thread(target=self._collect_memory_usage, args=(self.chrome_port,), daemon=True).start()
+        self._dashboard_tick += 1
 
-        self.log_output.append("올리브영 리뷰 수집기가 시작되었습니다.")
-        self.log_output.append("상품 ID 또는 URL을 입력하고 '링크 추가' 버튼으로 여러 링크를 추가하여 수집할 수 있습니다.")
+    def _collect_memory_usage(self, port):
+        try:
+            memory = collect_memory_usage(port)
+        except Exception as e:
+            logging.debug(f"메모리 사용량 측정 실패: {e}")
+            memory = None
+        self.memory_update_signal.emit(memory)
+
+    @Slot(object)
+    def _update_memory_labels(self, memory):
+        self._memory_probe_running = False
+        if memory is None:
+            return
+        for key in ('process_mb', 'chrome_mb'):
+            value = memory[key]
+            self.dashboard_labels[key].setText(f"{value:.0f} MB" if value is not None else "psutil 필요")
 
     def _create_input_field(self, layout, label_text, default_value=""):
         hbox = QHBoxLayout()
@@ -258,15 +466,38 @@ class OliveScraperGUI(QWidget):
             self.save_settings() # 설정 저장
 
     def init_logging(self):
-        # StreamHandler는 이미 basicConfig에서 stdout으로 추가되었으므로 여기서는 GUI 텍스트 에디터 연결만.
-        self.gui_log_handler = StreamHandler()
-        self.gui_log_handler.log_signal.connect(self.update_log_output)
+        # StreamHandler는 이미 basicConfig에서 stdout으로 추가되었으므로 여기서는 GUI 로그 버퍼 연결만.
+        self.log_buffer = LogBuffer(spill_path=self.log_file)
+        self.gui_log_handler = StreamHandler(self.log_buffer)
         logging.getLogger().addHandler(self.gui_log_handler)
 
-    @Slot(str)
+        self.log_flush_timer = QTimer(self)
+        self.log_flush_timer.setInterval(LOG_FLUSH_INTERVAL_MS)
+        self.log_flush_timer.timeout.connect(self._flush_log_buffer)
+        self.log_flush_timer.start()
+
     def update_log_output(self, msg):
-        self.log_output.append(msg)
-        self.log_output.verticalScrollBar().setValue(self.log_output.verticalScrollBar().maximum())
+        # 워커 스레드에서도 호출되므로 위젯을 직접 건드리지 않고 버퍼에만 쌓는다.
+        self.log_buffer.append(msg)
+
+    @Slot()
+    def _flush_log_buffer(self):
+        lines, dropped = self.log_buffer.drain()
+        if not lines:
+            return
+        if dropped:
+            lines.insert(0, f"... 로그가 너무 많아 {dropped}줄을 화면에서 생략했습니다 ...")
+        scroll_bar = self.log_output.verticalScrollBar()
+        at_bottom = scroll_bar.value() >= scroll_bar.maximum() - 4
+        self.log_output.appendPlainText('\n'.join(lines))
+        if at_bottom:
+            scroll_bar.setValue(scroll_bar.maximum())
+
+    def closeEvent(self, event):
+        self._flush_log_buffer()
+        logging.getLogger().removeHandler(self.gui_log_handler)
+        self.log_buffer.close()
+        super().closeEvent(event)
 
     @Slot(str, str, str)
     def _show_message_box(self, type: str, title: str, message: str):
@@ -281,7 +512,7 @@ class OliveScraperGUI(QWidget):
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
         self.log_output.clear()
-        self.log_output.append("리뷰 수집을 시작합니다...")
+        self.log_buffer.drain()
         logging.info("리뷰 수집을 시작합니다...") # 파일에도 로그 기록
         self.status_update_signal.emit("수집 준비 중...")
         self.progress_update_signal.emit(0)
@@ -322,6 +553,14 @@ class OliveScraperGUI(QWidget):
             self._reset_gui_state()
             return
 
+        try:
+            since = parse_since(self.since_input.text())
+        except ValueError:
+            self.message_box_signal.emit("warning", "입력 오류", "수집 기준일은 YYYY-MM-DD 또는 30d 형식으로 입력해주세요.")
+            logging.warning(f"수집 기준일 입력 오류: {self.since_input.text()}")
+            self._reset_gui_state()
+            return
+
         out_dir = self.output_dir_input.text()
         if not os.path.exists(out_dir):
             try:
@@ -335,23 +574,41 @@ class OliveScraperGUI(QWidget):
         
         user_data_dir = self.user_data_dir_input.text()
         chrome_main_path = r"C:\Program Files\Google\Chrome\Application\chrome.exe" # 고정된 값
-        port = 9222 # 고정된 값
+        port = self.chrome_port # 고정된 값
 
-        logging.info(f"스크래핑 시작: 상품 정보={products_to_scrape}, 출력 디렉토리={out_dir}, 사용자 데이터 디렉토리={user_data_dir}, 포트={port}")
+        logging.info(f"스크래핑 시작: 상품 정보={products_to_scrape}, 출력 디렉토리={out_dir}, 사용자 데이터 디렉토리={user_data_dir}, 포트={port}, 기준일={since}")
+        self.scrape_stats.reset(batch_total=len(products_to_scrape))
+        # 실행마다 새 토큰을 만들어 이전 실행의 중지 요청이 남지 않도록 한다
+        self.cancel_token = CancelToken()
         self._set_is_running(True)
+        if self.engine == 'async':
+            coro = self._run_scraper_async(products_to_scrape, out_dir, user_data_dir, port, self.cancel_token, since)
+            if self.async_loop is not None:
+                # Qt 이벤트 루프에서 바로 실행 (블로킹 작업은 run_async 안에서 스레드로 넘긴다)
+                self.current_async_task = self.async_loop.create_task(coro)
+            else:
+                # qasync가 없으면 별도 스레드의 이벤트 루프에서 실행
+                self.current_scraper_thread = threading.Thread(target=asyncio.run, args=(coro,))
+                self.current_scraper_thread.start()
+            return
         self.current_scraper_thread = threading.Thread(target=self._run_scraper_thread, args=(
-            products_to_scrape, out_dir, user_data_dir, chrome_main_path, port
+            products_to_scrape, out_dir, user_data_dir, chrome_main_path, port, self.cancel_token, since
         ))
         self.current_scraper_thread.start()
 
-    def _run_scraper_thread(self, products_to_scrape, out_dir, user_data_dir, chrome_main_path, port):
+    def _run_scraper_thread(self, products_to_scrape, out_dir, user_data_dir, chrome_main_path, port, cancel_token, since=None):
         driver = None
-        chrome_process = None
+        pipeline = None
+        transport = None
         try:
+            # 가공/엑셀 저장은 별도 스레드에서 처리하고 이 스레드는 곧바로 다음 상품 수집으로 넘어간다
+            pipeline = ResultPipeline(out_dir, log_callback=self.update_log_output, sinks=self._create_sinks(out_dir))
+            # 모든 상품이 하나의 연결 풀을 공유해 keep-alive 연결과 TLS 세션을 재사용한다
+            transport = make_transport(self.transport_backend)
+
             self.status_update_signal.emit("Chrome 브라우저 확인 중...")
             logging.info("Chrome 브라우저 확인 중...")
-            from olive_scraper import ensure_chrome_debug
-            chrome_process = ensure_chrome_debug(port, user_data_dir)
+            ensure_chrome_debug(port, user_data_dir, cancel_token=cancel_token)
             
             self.status_update_signal.emit("Chrome 드라이버 연결 중...")
             logging.info("Chrome 드라이버 연결 중...")
@@ -361,7 +618,7 @@ class OliveScraperGUI(QWidget):
 
             for i, product_data in enumerate(products_to_scrape):
                 if not self._check_is_running():
-                    self.update_log_output(f"전체 수집이 중지되었습니다.")
+                    self.update_log_output("전체 수집이 중지되었습니다.")
                     logging.info("사용자에 의해 전체 수집이 중지되었습니다.")
                     break
 
@@ -371,11 +628,12 @@ class OliveScraperGUI(QWidget):
                 logging.info(f"--- 상품 {i+1}/{len(products_to_scrape)} 수집 시작: 상품 ID={product_id}, 최대 페이지={max_pages} ---")
                 self.status_update_signal.emit(f"상품 {i+1}/{len(products_to_scrape)} ({product_id}) 수집 중...")
                 self.progress_update_signal.emit(0)
+                self.scrape_stats.start_product(product_id, max_pages)
 
                 try:
                     self.update_log_output("페이지 로드 시작...")
                     logging.info("wait_for_page_load_and_handle_cloudflare 호출 전")
-                    load_result = wait_for_page_load_and_handle_cloudflare(driver, product_id, timeout=60, log_callback=self.update_log_output, stop_check_callback=lambda: not self._check_is_running())
+                    load_result = wait_for_page_load_and_handle_cloudflare(driver, product_id, timeout=60, log_callback=self.update_log_output, cancel_token=cancel_token)
                     logging.info(f"wait_for_page_load_and_handle_cloudflare 결과: {load_result}")
                 except Exception as page_load_error:
                     self.update_log_output(f"페이지 로드 중 예외 발생: {page_load_error}")
@@ -385,28 +643,34 @@ class OliveScraperGUI(QWidget):
                 if not load_result:
                     self.update_log_output("Cloudflare 또는 페이지 로드 문제로 인증 정보 획득 실패. 다음 상품으로 넘어갑니다.")
                     logging.warning(f"상품 {product_id}: Cloudflare 또는 페이지 로드 문제로 인증 정보 획득 실패. 다음 상품으로 넘어갑니다.")
+                    self.scrape_stats.finish_product(product_id, 'failed')
                     continue
                 
                 if not self._check_is_running():
-                    self.update_log_output(f"사용자에 의해 수집이 중지되었습니다. 다음 상품으로 넘어갑니다.")
+                    self.update_log_output("사용자에 의해 수집이 중지되었습니다. 다음 상품으로 넘어갑니다.")
                     logging.info(f"상품 {product_id}: 사용자에 의해 수집이 중지되었습니다.")
+                    self.scrape_stats.finish_product(product_id, 'stopped')
                     continue
 
                 try:
                     self.update_log_output("세션 정보 추출 중...")
-                    logging.info("extract_session_from_driver 호출")
-                    session, user_agent = extract_session_from_driver(driver)
-                    logging.info(f"세션 정보 추출 완료: User-Agent={user_agent[:50]}...")
+                    logging.info("브라우저 쿠키를 공유 세션에 반영")
+                    transport.update_from_driver(driver)
+                    logging.info(f"세션 정보 추출 완료: User-Agent={transport.user_agent[:50]}...")
                 except Exception as session_error:
                     self.update_log_output(f"세션 정보 추출 실패: {session_error}")
                     logging.error(f"세션 정보 추출 실패: {session_error}", exc_info=True)
+                    self.scrape_stats.finish_product(product_id, 'failed')
                     continue
                 
                 try:
                     self.update_log_output(f"리뷰 수집 시작: 최대 {max_pages}페이지")
                     logging.info(f"fetch_reviews 호출: max_pages={max_pages}")
                     
-                    reviews = fetch_reviews(session, user_agent, product_id, max_pages, log_callback=self.update_log_output, stop_check_callback=lambda: not self._check_is_running())
+                    if self.partition == 'rating':
+                        reviews = fetch_reviews_partitioned(transport, product_id, max_pages, build_partitions(), log_callback=self.update_log_output, stats=self.scrape_stats, cancel_token=cancel_token, since=since)
+                    else:
+                        reviews = fetch_reviews(transport, transport.user_agent, product_id, max_pages, log_callback=self.update_log_output, stats=self.scrape_stats, cancel_token=cancel_token, since=since)
                     
                     logging.info(f"fetch_reviews 완료: {len(reviews) if reviews else 0}개 리뷰 수집")
                     self.update_log_output(f"fetch_reviews 완료: {len(reviews) if reviews else 0}개 리뷰")
@@ -414,37 +678,25 @@ class OliveScraperGUI(QWidget):
                     self.update_log_output(f"리뷰 수집 중 예외 발생: {fetch_error}")
                     logging.error(f"fetch_reviews 예외: {fetch_error}", exc_info=True)
                     reviews = []
-                finally:
-                    try:
-                        session.close()
-                        logging.info("세션 정상 종료")
-                    except Exception as close_error:
-                        logging.debug(f"세션 종료 오류(무시 가능): {close_error}")
                 
-                if not self._check_is_running():
-                    self.update_log_output(f"사용자에 의해 수집이 중지되었습니다. 결과 저장을 건너뜁니다.")
-                    logging.info(f"상품 {product_id}: 사용자에 의해 수집이 중지되었습니다. 결과 저장을 건너뜀.")
-                    continue
-
                 if not reviews:
                     self.update_log_output(f"상품 ID {product_id}에 대해 수집된 리뷰가 없습니다.")
                     logging.warning(f"상품 ID {product_id}에 대해 수집된 리뷰가 없습니다.")
+                    self.scrape_stats.finish_product(product_id, 'empty')
                     continue
                 
-                df = process_reviews(reviews)
-                save_results(product_id, reviews, df, out_dir, log_callback=self.update_log_output)
+                if cancel_token.is_cancelled():
+                    # 중지되었더라도 지금까지 받은 리뷰는 버리지 않고 저장한다
+                    self.update_log_output(f"사용자에 의해 수집이 중지되었습니다. 지금까지 수집한 {len(reviews)}개 리뷰를 저장합니다.")
+                    logging.info(f"상품 {product_id}: 중지 요청으로 부분 결과 {len(reviews)}개 저장")
+                pipeline.submit(product_id, reviews)
+                self.scrape_stats.finish_product(product_id, 'stopped' if cancel_token.is_cancelled() else 'done')
                 self.update_log_output(f"--- 상품 {i+1}/{len(products_to_scrape)} 수집 완료: 상품 ID={product_id} ---")
                 logging.info(f"--- 상품 {i+1}/{len(products_to_scrape)} 수집 완료: 상품 ID={product_id} ---")
 
-            if self._check_is_running():
-                self.update_log_output("모든 리뷰 수집이 완료되었습니다.")
-                logging.info("모든 리뷰 수집이 완료되었습니다.")
-                self.status_update_signal.emit("완료")
-                self.progress_update_signal.emit(100)
-                self.message_box_signal.emit("information", "수집 완료", "모든 리뷰 수집이 완료되었습니다.")
-            else:
-                self.update_log_output("사용자에 의해 모든 수집이 중지되었습니다.")
-                logging.info("사용자에 의해 모든 수집이 중지되었습니다.")
+            self.status_update_signal.emit("결과 저장 마무리 중...")
+            pipeline.close()
+            self._report_completion()
 
         except Exception as e:
             self.update_log_output(f"스크래핑 중 오류 발생: {e}")
@@ -452,6 +704,11 @@ class OliveScraperGUI(QWidget):
             self.status_update_signal.emit("오류 발생")
             self.message_box_signal.emit("critical", "오류", f"리뷰 수집 중 오류가 발생했습니다:\n{e}")
         finally:
+            # 오류/중지로 빠져나온 경우에도 이미 넘긴 결과는 모두 저장한다
+            if pipeline is not None:
+                pipeline.close()
+            if transport is not None:
+                transport.close()
             if driver:
                 try:
                     driver.quit()
@@ -464,9 +721,77 @@ class OliveScraperGUI(QWidget):
                     driver = None
             self._reset_gui_state()
 
+    async def _run_scraper_async(self, products_to_scrape, out_dir, user_data_dir, port, cancel_token, since=None):
+        try:
+            runner = AsyncBatchRunner(out_dir, port, user_data_dir, workers=self.async_workers, rate=self.async_rate, cancel_token=cancel_token,
+                                      stats=self.scrape_stats, log_callback=self.update_log_output, partition=self.partition, since=since,
+                                      sinks=self._create_sinks(out_dir))
+            self.status_update_signal.emit(f"비동기 수집 중... (상품 {len(products_to_scrape)}개, 동시 {self.async_workers}개)")
+            self.update_log_output(f"비동기 엔진으로 수집 시작: 동시 상품 {self.async_workers}개, 전역 속도 {self.async_rate}/초")
+            results = await runner.run_async(products_to_scrape)
+            for result in results:
+                logging.info(f"상품 {result['product_id']}: {result['status']} (행 {result['rows']}, 페이지 {result['pages']}) {result['error']}")
+            self._report_completion()
+        except Exception as e:
+            self.update_log_output(f"스크래핑 중 오류 발생: {e}")
+            logging.exception("스크래핑 중 오류 발생:")
+            self.status_update_signal.emit("오류 발생")
+            self.message_box_signal.emit("critical", "오류", f"리뷰 수집 중 오류가 발생했습니다:\n{e}")
+        finally:
+            self.current_async_task = None
+            self._reset_gui_state()
+
+    def _create_sinks(self, out_dir):
+        """설정에서 켠 색인 sink를 엽니다. 하나라도 열지 못하면(잠긴/손상된 DB 등) 이미 연 것을 닫고 예외를 그대로 올린다."""
+        enabled = [
+            (self.search_index, ReviewSearchIndex, SEARCH_INDEX_FILENAME),
+            (self.aggregates, ReviewAggregates, AGGREGATES_FILENAME),
+            (self.dedupe, ReviewDedupeIndex, DEDUPE_FILENAME),
+            (self.reviewers, ReviewerIndex, REVIEWERS_FILENAME),
+            (self.history, ReviewHistory, HISTORY_FILENAME),
+            (self.keywords, KeywordIndex, KEYWORDS_FILENAME),
+        ]
+        sinks = []
+        try:
+            for on, sink_class, filename in enabled:
+                if on:
+                    sinks.append(sink_class(os.path.join(out_dir, filename)))
+        except Exception:
+            for sink in sinks:
+                try:
+                    sink.close()
+                except Exception as e:
+                    logging.warning(f"{type(sink).__name__} 닫기 실패: {e}")
+            raise
+        return sinks
+
+    def _report_completion(self):
+        if self._check_is_running():
+            self.update_log_output("모든 리뷰 수집이 완료되었습니다.")
+            logging.info("모든 리뷰 수집이 완료되었습니다.")
+            self.status_update_signal.emit("완료")
+            self.progress_update_signal.emit(100)
+            failed_pages = self.scrape_stats.failed_pages()
+            if failed_pages:
+                report = "\n".join(f"{pid}: {pages}" for pid, pages in failed_pages.items())
+                logging.warning(f"끝내 수집하지 못한 페이지:\n{report}")
+                self.message_box_signal.emit("warning", "수집 완료 (일부 페이지 실패)", f"모든 리뷰 수집이 완료되었지만 다음 페이지는 재시도 후에도 수집하지 못했습니다.\n{report}")
+            else:
+                self.message_box_signal.emit("information", "수집 완료", "모든 리뷰 수집이 완료되었습니다.")
+        else:
+            self.update_log_output("사용자에 의해 모든 수집이 중지되었습니다.")
+            logging.info("사용자에 의해 모든 수집이 중지되었습니다.")
+
+    def _is_collection_active(self):
+        if self.current_async_task is not None and not self.current_async_task.done():
+            return True
+        return bool(self.current_scraper_thread and self.current_scraper_thread.is_alive())
+
     def stop_collection(self):
         self._set_is_running(False)
-        if self.current_scraper_thread and self.current_scraper_thread.is_alive():
+        # 진행 중인 대기/요청/드라이버 호출을 즉시 깨운다
+        self.cancel_token.cancel()
+        if self._is_collection_active():
             self.update_log_output("현재 진행 중인 스크래핑 작업을 중지 요청했습니다. 잠시 기다려주세요...")
             logging.info("스크래핑 중지 요청됨.")
         else:
@@ -510,26 +835,19 @@ class OliveScraperGUI(QWidget):
             logging.warning("지정된 저장 경로가 존재하지 않습니다.")
 
     def extract_product_id(self, input_string: str) -> str | None:
-        # URL 형식 확인
-        if input_string.startswith("http://") or input_string.startswith("https://"):
-            parsed_url = urlparse(input_string)
-            query_params = parse_qs(parsed_url.query)
-            goods_no = query_params.get('goodsNo', [None])[0]
-            if goods_no:
-                return goods_no
-            else:
-                logging.warning(f"URL에서 'goodsNo' 파라미터를 찾을 수 없습니다: {input_string}")
-                return None
-        else:
-            if re.fullmatch(r"A[0-9]{12}", input_string):
-                return input_string
-            else:
-                logging.warning(f"유효한 상품 ID 형식이 아닙니다: {input_string}")
-                return None
+        return extract_product_id(input_string)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setStyleSheet("QWidget { font-size: 14pt; }")
     gui = OliveScraperGUI()
     gui.show()
+    if qasync is not None:
+        # Qt와 asyncio가 같은 루프를 쓰므로 비동기 엔진을 GUI 스레드에서 스레드 없이 돌릴 수 있다
+        loop = qasync.QEventLoop(app)
+        asyncio.set_event_loop(loop)
+        gui.async_loop = loop
+        with loop:
+            loop.run_forever()
+        sys.exit(0)
     sys.exit(app.exec()) 
\ No newline at end of file
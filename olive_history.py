@@ -0,0 +1,215 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from olive_engine.sinks import export_rows, find_raw_result_files, product_id_from_result_file, saved_at_from_result_file
+from olive_engine.transform import review_key
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+HISTORY_FILENAME = 'review_history.sqlite'
+DEFAULT_LIMIT = 50
+
+# 수집할 때마다 바뀔 수 있는 리뷰 필드 -> 저장용 번호 (번호는 바꾸지 말고 뒤에만 추가)
+TRACKED_FIELDS = {'recommCnt': 1, 'topRvrRnk': 2, 'gdasScrVal': 3}
+FIELD_NAMES = {field_id: name for name, field_id in TRACKED_FIELDS.items()}
+
+
+def _field_value(review: dict, field: str) -> int:
+    try:
+        return int(review.get(field) or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class ReviewHistory:
+    """리뷰의 도움이 돼요 수(recommCnt), 작성자 TOP 순위(topRvrRnk) 같은 바뀌는 필드의 변화 이력(SQLite).
+
+    수집할 때마다 전체 사본을 남기지 않고, 리뷰마다 처음 본 값과 값이 달라진 수집만 changes에 한 행씩 쌓는다.
+    changes는 (상품, 리뷰, 필드 번호, 수집 번호) 정수 키만 가진 WITHOUT ROWID 테이블이라, 크기는 수집 횟수가 아니라
+    바뀐 값의 수만큼 늘어난다. 각 필드의 현재 값은 latest에 따로 두어 다음 수집과 비교할 때 이력을 다시 읽지 않는다.
+    ResultPipeline sink로 쓸 수 있고, 모든 메서드는 스레드 안전하다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS crawls (
+            crawl_id INTEGER PRIMARY KEY, product_id TEXT NOT NULL, crawled_at TEXT NOT NULL, reviews INTEGER NOT NULL)""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS crawls_product ON crawls(product_id, crawled_at)")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS latest (
+            product_id TEXT NOT NULL, review_id TEXT NOT NULL, field_id INTEGER NOT NULL, value INTEGER NOT NULL,
+            PRIMARY KEY (product_id, review_id, field_id)) WITHOUT ROWID""")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS changes (
+            product_id TEXT NOT NULL, review_id TEXT NOT NULL, field_id INTEGER NOT NULL, crawl_id INTEGER NOT NULL, value INTEGER NOT NULL,
+            PRIMARY KEY (product_id, review_id, field_id, crawl_id)) WITHOUT ROWID""")
+        self.conn.commit()
+
+    def last_crawled_at(self, product_id: str) -> str | None:
+        with self.lock:
+            row = self.conn.execute("SELECT MAX(crawled_at) FROM crawls WHERE product_id = ?", (product_id,)).fetchone()
+        return row[0]
+
+    def record(self, product_id: str, reviews: list, crawled_at: datetime | None = None) -> dict | None:
+        """한 번의 수집 결과를 현재 값과 비교해 처음 본 값과 바뀐 값만 기록합니다.
+
+        {'reviews', 'new', 'changed'}를 반환한다. 이미 기록된 수집보다 이전 시각이면 순서가 뒤섞이지 않도록 건너뛰고 None.
+        """
+        crawled_at = (crawled_at or datetime.now()).isoformat(timespec='seconds')
+        counts = {'reviews': len(reviews), 'new': 0, 'changed': 0}
+        with self.lock:
+            last = self.conn.execute("SELECT MAX(crawled_at) FROM crawls WHERE product_id = ?", (product_id,)).fetchone()[0]
+            if last and crawled_at <= last:
+                return None
+            with self.conn:
+                crawl_id = self.conn.execute("INSERT INTO crawls (product_id, crawled_at, reviews) VALUES (?, ?, ?)",
+                                             (product_id, crawled_at, len(reviews))).lastrowid
+                # 상품 하나의 현재 값을 한 번에 읽어 두고 메모리에서 비교한다
+                current = {(row[0], row[1]): row[2] for row in self.conn.execute(
+                    "SELECT review_id, field_id, value FROM latest WHERE product_id = ?", (product_id,))}
+                updates = []
+                for review in reviews:
+                    key = review_key(review)
+                    for field, field_id in TRACKED_FIELDS.items():
+                        value = _field_value(review, field)
+                        previous = current.get((key, field_id))
+                        if previous == value:
+                            continue
+                        counts['new' if previous is None else 'changed'] += 1
+                        current[(key, field_id)] = value
+                        updates.append((product_id, key, field_id, value, crawl_id))
+                self.conn.executemany("INSERT OR REPLACE INTO latest VALUES (?, ?, ?, ?)", [row[:4] for row in updates])
+                self.conn.executemany("INSERT OR IGNORE INTO changes VALUES (?, ?, ?, ?, ?)",
+                                      [(p, r, f, c, v) for p, r, f, v, c in updates])
+        return counts
+
+    def write(self, product_id: str, reviews: list, df=None) -> None:
+        """ResultPipeline sink 인터페이스."""
+        counts = self.record(product_id, reviews)
+        if counts:
+            logging.info(f"변화 이력 반영: 상품 {product_id} 바뀐 값 {counts['changed']}개, 새 값 {counts['new']}개")
+
+    def history(self, product_id: str, review_id: str, field: str | None = None) -> list[dict]:
+        """리뷰 하나의 필드별 값 이력 [{'field', 'crawled_at', 'value'}]. 값이 바뀐 수집만 나온다."""
+        clauses, params = ["c.product_id = ?", "c.review_id = ?"], [product_id, str(review_id)]
+        if field:
+            clauses.append("c.field_id = ?")
+            params.append(TRACKED_FIELDS[field])
+        sql = (f"SELECT c.field_id, k.crawled_at, c.value FROM changes c JOIN crawls k ON k.crawl_id = c.crawl_id "
+               f"WHERE {' AND '.join(clauses)} ORDER BY c.field_id, c.crawl_id")
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [{'field': FIELD_NAMES[row[0]], 'crawled_at': row[1], 'value': row[2]} for row in rows]
+
+    def deltas(self, product_id: str, field: str = 'recommCnt', date_from: str | None = None, date_to: str | None = None) -> list[dict]:
+        """상품 리뷰들의 field 값이 바뀐 기록 [{'review_id', 'crawled_at', 'previous', 'value', 'delta'}]. 수집 시각 순."""
+        sql = """SELECT review_id, crawled_at, previous, value FROM (
+                     SELECT c.review_id, k.crawled_at, c.value,
+                            LAG(c.value) OVER (PARTITION BY c.review_id ORDER BY c.crawl_id) AS previous
+                     FROM changes c JOIN crawls k ON k.crawl_id = c.crawl_id
+                     WHERE c.product_id = ? AND c.field_id = ?)
+                 WHERE previous IS NOT NULL AND (? IS NULL OR crawled_at >= ?) AND (? IS NULL OR crawled_at <= ?)
+                 ORDER BY crawled_at, review_id"""
+        with self.lock:
+            rows = self.conn.execute(sql, (product_id, TRACKED_FIELDS[field], date_from, date_from, date_to, date_to)).fetchall()
+        return [{'review_id': row[0], 'crawled_at': row[1], 'previous': row[2], 'value': row[3], 'delta': row[3] - row[2]} for row in rows]
+
+    def top_movers(self, product_id: str, field: str = 'recommCnt', date_from: str | None = None, date_to: str | None = None,
+                   limit: int = DEFAULT_LIMIT) -> list[dict]:
+        """기간 안에 field 값이 가장 많이 늘어난 리뷰 순. 도움이 돼요 수가 빠르게 늘어나는 리뷰를 찾을 때 쓴다."""
+        totals: dict[str, dict] = {}
+        for row in self.deltas(product_id, field, date_from, date_to):
+            total = totals.setdefault(row['review_id'], {'review_id': row['review_id'], 'delta': 0, 'changes': 0})
+            total['delta'] += row['delta']
+            total['changes'] += 1
+            total['value'] = row['value']
+            total['last_changed'] = row['crawled_at']
+        return sorted(totals.values(), key=lambda total: total['delta'], reverse=True)[:limit]
+
+    def stats(self) -> dict:
+        """수집 횟수, 추적 중인 값 수, 기록된 변화 수."""
+        with self.lock:
+            return {
+                'crawls': self.conn.execute("SELECT COUNT(*) FROM crawls").fetchone()[0],
+                'values': self.conn.execute("SELECT COUNT(*) FROM latest").fetchone()[0],
+                'changes': self.conn.execute("SELECT COUNT(*) FROM changes").fetchone()[0],
+            }
+
+    def ingest_files(self, paths: list[str], log_callback=None) -> int:
+        """저장된 원본 리뷰 JSON들을 저장 시각 순으로 기록합니다. 이미 기록한 수집보다 이전 파일은 건너뛴다.
+
+        기록한 파일 수를 반환한다.
+        """
+        dated = [(saved_at_from_result_file(path), path) for path in paths]
+        recorded = 0
+        for saved_at, path in sorted((item for item in dated if item[0]), key=lambda item: item[0]):
+            with open(path, encoding='utf-8') as f:
+                reviews = json.load(f)
+            counts = self.record(product_id_from_result_file(path), reviews, crawled_at=saved_at)
+            if counts is None:
+                continue
+            recorded += 1
+            if log_callback:
+                log_callback(f"변화 이력: {os.path.basename(path)} (바뀐 값 {counts['changed']}개, 새 값 {counts['new']}개)")
+        return recorded
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OliveYoung review crawler - change history of mutable review fields")
+    parser.add_argument('--db', required=True, help=f'history file (e.g. <out_dir>/{HISTORY_FILENAME})')
+    parser.add_argument('--ingest', nargs='*', default=None, help='raw review JSON files or folders to record first, oldest first')
+    parser.add_argument('--product', default=None, help='product ID to query')
+    parser.add_argument('--review', default=None, help='review ID (gdasSeq) whose history to show; needs --product')
+    parser.add_argument('--field', default='recommCnt', choices=list(TRACKED_FIELDS))
+    parser.add_argument('--deltas', action='store_true', help='list every change of --field instead of the biggest movers')
+    parser.add_argument('--from', dest='date_from', default=None, help='crawl time lower bound, YYYY-MM-DD')
+    parser.add_argument('--to', dest='date_to', default=None, help='crawl time upper bound, YYYY-MM-DD')
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT)
+    parser.add_argument('--export', default=None, help='write the result to .csv or .jsonl instead of printing it')
+    args = parser.parse_args()
+
+    history = ReviewHistory(args.db)
+    try:
+        if args.ingest is not None:
+            started = time.monotonic()
+            recorded = history.ingest_files(find_raw_result_files(args.ingest), log_callback=logging.info)
+            logging.info(f"변화 이력 반영 완료: 수집 {recorded}회 {history.stats()} ({time.monotonic() - started:.1f}초)")
+        if not args.product:
+            if args.ingest is None:
+                print(json.dumps(history.stats(), ensure_ascii=False))
+            return
+        date_to = f"{args.date_to}T23:59:59" if args.date_to else None
+        started = time.perf_counter()
+        if args.review:
+            rows = history.history(args.product, args.review)
+        elif args.deltas:
+            rows = history.deltas(args.product, args.field, args.date_from, date_to)
+        else:
+            rows = history.top_movers(args.product, args.field, args.date_from, date_to, args.limit)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if args.export:
+            export_rows(args.export, rows)
+            logging.info(f"{len(rows)}행 저장: {args.export} ({elapsed_ms:.1f}ms)")
+        else:
+            for row in rows:
+                print(json.dumps(row, ensure_ascii=False))
+            logging.info(f"{len(rows)}행 ({elapsed_ms:.1f}ms)")
+    finally:
+        history.close()
+
+
+if __name__ == '__main__':
+    main()
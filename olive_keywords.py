@@ -0,0 +1,285 @@
+import argparse
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from olive_engine.sinks import export_rows, find_raw_result_files, product_id_from_result_file
+from olive_engine.transform import review_flags, review_key, review_text, words
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+KEYWORDS_FILENAME = 'review_keywords.sqlite'
+DEFAULT_LIMIT = 30
+
+KIND_WORD = 'word'      # 조사를 뗀 어절
+KIND_PHRASE = 'phrase'  # 이웃한 두 어절
+KIND_CHAR = 'char3'     # 어절 안의 3글자 조각 (띄어쓰기가 제각각인 복합어용)
+KINDS = (KIND_WORD, KIND_PHRASE, KIND_CHAR)
+
+BAND_LOW = 'low'        # 1~2점
+BAND_MID = 'mid'        # 3점
+BAND_HIGH = 'high'      # 4~5점
+BANDS = (BAND_LOW, BAND_MID, BAND_HIGH)
+
+POOL_MIN_REVIEWS = 5000  # 이보다 적으면 프로세스를 띄우는 비용이 더 크다
+POOL_CHUNK = 2000
+
+# 길이가 긴 것부터 확인해야 '에서'가 '서'보다 먼저 떨어진다
+JOSA_SUFFIXES = sorted(['이', '가', '은', '는', '을', '를', '도', '만', '에', '의', '와', '과', '로', '으로', '에서', '에게',
+                        '까지', '부터', '보다', '처럼', '이랑', '랑', '이나', '나'], key=len, reverse=True)
+STOPWORDS = {'너무', '정말', '진짜', '완전', '그리고', '그냥', '조금', '약간', '아주', '제가', '저는', '이거', '이건', '그래서',
+             '하지만', '근데', '있어요', '같아요', '했어요', '합니다', '입니다', '하고', '해서', '있는', '없는', '제품', '사용'}
+
+
+def rating_band(rating: float) -> str:
+    if rating <= 2:
+        return BAND_LOW
+    if rating < 4:
+        return BAND_MID
+    return BAND_HIGH
+
+
+def strip_josa(word: str) -> str:
+    """어절 끝의 흔한 조사를 한 번 뗍니다. 남는 말이 두 글자 미만이면 그대로 둔다."""
+    for suffix in JOSA_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str, kinds=KINDS) -> set[tuple[str, str]]:
+    """리뷰 한 건의 (종류, 항목) 집합. 한 리뷰에 여러 번 나와도 한 번만 센다(문서 빈도)."""
+    tokens = [strip_josa(word) for word in words(text)]
+    tokens = [word for word in tokens if len(word) >= 2 and not word.isdigit()]
+    terms = set()
+    if KIND_WORD in kinds:
+        terms.update((KIND_WORD, word) for word in tokens if word not in STOPWORDS)
+    if KIND_PHRASE in kinds:
+        terms.update((KIND_PHRASE, f"{a} {b}") for a, b in zip(tokens, tokens[1:]) if a not in STOPWORDS or b not in STOPWORDS)
+    if KIND_CHAR in kinds:
+        terms.update((KIND_CHAR, word[i:i + 3]) for word in tokens for i in range(len(word) - 2))
+    return terms
+
+
+def count_terms(items: list[tuple[str, str]], kinds=KINDS) -> tuple[Counter, Counter]:
+    """(별점 구간, 본문) 목록을 세어 ((종류, 구간, 항목) -> 리뷰 수, 구간 -> 리뷰 수)를 반환합니다.
+
+    리뷰마다 파이썬 루프를 돌며 더하지 않고, 묶음 전체의 항목을 한 번의 Counter.update로 센다.
+    프로세스 풀에서 호출되므로 모듈 최상위 함수로 둔다.
+    """
+    counts = Counter()
+    counts.update((kind, band, term) for band, text in items for kind, term in tokenize(text, kinds))
+    return counts, Counter(band for band, _ in items)
+
+
+def log_odds(target: dict[str, int], target_total: int, other: dict[str, int], other_total: int, prior_weight: float = 0.01) -> dict[str, float]:
+    """두 집단의 항목별 로그 오즈비 z 점수 (정보 사전분포를 둔 Monroe et al. 방식).
+
+    양수면 target 쪽에서, 음수면 other 쪽에서 더 자주 쓰인 항목이다. 드문 항목이 과장되지 않도록
+    전체 빈도를 사전분포로 더한다.
+    """
+    terms = set(target) | set(other)
+    background = {term: target.get(term, 0) + other.get(term, 0) for term in terms}
+    background_total = sum(background.values()) or 1
+    alpha_total = prior_weight * background_total
+    scores = {}
+    for term in terms:
+        alpha = prior_weight * background[term]
+        y1, y2 = target.get(term, 0), other.get(term, 0)
+        l1 = math.log((y1 + alpha) / (target_total + alpha_total - y1 - alpha))
+        l2 = math.log((y2 + alpha) / (other_total + alpha_total - y2 - alpha))
+        scores[term] = (l1 - l2) / math.sqrt(1 / (y1 + alpha) + 1 / (y2 + alpha))
+    return scores
+
+
+class KeywordIndex:
+    """상품 x 별점 구간별 단어/구문/글자 조각의 문서 빈도를 쌓아 두는 캐시(SQLite).
+
+    이미 센 리뷰는 (상품, 리뷰 키)로 기억하므로 같은 상품을 다시 수집해도 새 리뷰만 더한다. 리포트는 원본 본문을
+    다시 토큰화하지 않고 이 표에서 바로 읽는다. 리뷰가 많으면 workers개 프로세스로 나눠 센다.
+    ResultPipeline sink로 쓸 수 있고, 모든 메서드는 스레드 안전하다.
+    """
+
+    def __init__(self, path: str, workers: int | None = 1):
+        self.path = path
+        self.workers = workers
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS keyword_seen (
+            product_id TEXT NOT NULL, review_id TEXT NOT NULL, PRIMARY KEY (product_id, review_id)) WITHOUT ROWID""")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS keyword_docs (
+            product_id TEXT NOT NULL, band TEXT NOT NULL, reviews INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (product_id, band)) WITHOUT ROWID""")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS keyword_counts (
+            product_id TEXT NOT NULL, kind TEXT NOT NULL, band TEXT NOT NULL, term TEXT NOT NULL, docs INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (product_id, kind, band, term)) WITHOUT ROWID""")
+        self.conn.commit()
+
+    def _count(self, items: list[tuple[str, str]]) -> tuple[Counter, Counter]:
+        if self.workers == 1 or len(items) < POOL_MIN_REVIEWS:
+            return count_terms(items)
+        counts, docs = Counter(), Counter()
+        chunks = [items[i:i + POOL_CHUNK] for i in range(0, len(items), POOL_CHUNK)]
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for chunk_counts, chunk_docs in executor.map(count_terms, chunks):
+                counts.update(chunk_counts)
+                docs.update(chunk_docs)
+        return counts, docs
+
+    def add_reviews(self, product_id: str, reviews: list) -> int:
+        """처음 보는 리뷰의 본문만 세어 더하고 더한 리뷰 수를 반환합니다.
+
+        세는 동안(프로세스 풀)은 잠금과 쓰기 트랜잭션을 잡지 않는다. keyword_seen을 먼저 커밋해 같은 리뷰가
+        동시에 두 번 세어지지 않게 하고, 세다가 실패하면 그 표시를 되돌린다.
+        """
+        with self.lock:
+            with self.conn:
+                keys, items = [], []
+                for review in reviews:
+                    key = review_key(review)
+                    cursor = self.conn.execute("INSERT OR IGNORE INTO keyword_seen VALUES (?, ?)", (product_id, key))
+                    if cursor.rowcount:
+                        keys.append(key)
+                        items.append((rating_band(review_flags(review)['평점']), review_text(review)))
+        if not items:
+            return 0
+        try:
+            counts, docs = self._count(items)
+        except BaseException:
+            with self.lock:
+                with self.conn:
+                    self.conn.executemany("DELETE FROM keyword_seen WHERE product_id = ? AND review_id = ?", [(product_id, key) for key in keys])
+            raise
+        with self.lock:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO keyword_docs VALUES (?, ?, ?) ON CONFLICT (product_id, band) DO UPDATE SET reviews = reviews + excluded.reviews",
+                    [(product_id, band, count) for band, count in docs.items()])
+                self.conn.executemany(
+                    "INSERT INTO keyword_counts VALUES (?, ?, ?, ?, ?) ON CONFLICT (product_id, kind, band, term) DO UPDATE SET docs = docs + excluded.docs",
+                    [(product_id, kind, band, term, count) for (kind, band, term), count in counts.items()])
+        return len(items)
+
+    def write(self, product_id: str, reviews: list, df=None) -> None:
+        """ResultPipeline sink 인터페이스."""
+        added = self.add_reviews(product_id, reviews)
+        logging.info(f"키워드 반영: 상품 {product_id} 새 리뷰 {added}개")
+
+    @staticmethod
+    def _where(product_ids, bands) -> tuple[str, list]:
+        clauses, params = [], []
+        if product_ids:
+            clauses.append(f"product_id IN ({', '.join('?' * len(product_ids))})")
+            params.extend(product_ids)
+        if bands:
+            clauses.append(f"band IN ({', '.join('?' * len(bands))})")
+            params.extend(bands)
+        return (' AND '.join(clauses) or '1'), params
+
+    def _docs(self, product_ids, bands) -> int:
+        where, params = self._where(product_ids, bands)
+        return self.conn.execute(f"SELECT COALESCE(SUM(reviews), 0) FROM keyword_docs WHERE {where}", params).fetchone()[0]
+
+    def _terms(self, kind, product_ids, bands) -> dict[str, int]:
+        where, params = self._where(product_ids, bands)
+        sql = f"SELECT term, SUM(docs) FROM keyword_counts WHERE kind = ? AND {where} GROUP BY term"
+        return dict(self.conn.execute(sql, [kind] + params).fetchall())
+
+    def top_terms(self, product_ids: list[str] | None = None, kind: str = KIND_WORD, band: str | None = None,
+                  limit: int = DEFAULT_LIMIT, min_docs: int = 2) -> list[dict]:
+        """가장 많은 리뷰에 나온 항목 순. ratio는 해당 리뷰 중 그 항목이 나온 비율."""
+        bands = [band] if band else None
+        where, params = self._where(product_ids, bands)
+        sql = (f"SELECT term, SUM(docs) AS docs FROM keyword_counts WHERE kind = ? AND {where} "
+               f"GROUP BY term HAVING docs >= ? ORDER BY docs DESC, term LIMIT ?")
+        with self.lock:
+            total = self._docs(product_ids, bands)
+            rows = self.conn.execute(sql, [kind] + params + [min_docs, limit]).fetchall()
+        return [{'term': row['term'], 'docs': row['docs'], 'ratio': round(row['docs'] / total, 4) if total else None} for row in rows]
+
+    def contrast(self, product_ids: list[str] | None = None, kind: str = KIND_WORD, band: str = BAND_LOW,
+                 limit: int = DEFAULT_LIMIT, min_docs: int = 3) -> list[dict]:
+        """band 리뷰에서 나머지 별점 구간보다 유난히 자주 쓰인 항목. z 점수가 높은 순."""
+        others = [other for other in BANDS if other != band]
+        with self.lock:
+            target_total = self._docs(product_ids, [band])
+            other_total = self._docs(product_ids, others)
+            target = self._terms(kind, product_ids, [band])
+            other = self._terms(kind, product_ids, others)
+        if not target_total or not other_total:
+            return []
+        scores = log_odds(target, target_total, other, other_total)
+        rows = []
+        for term, score in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+            if score <= 0 or len(rows) >= limit:
+                break
+            if target.get(term, 0) < min_docs:
+                continue
+            rows.append({'term': term, 'z': round(score, 2), 'docs': target[term], 'ratio': round(target[term] / target_total, 4),
+                         'other_docs': other.get(term, 0), 'other_ratio': round(other.get(term, 0) / other_total, 4)})
+        return rows
+
+    def ingest_files(self, paths: list[str], log_callback=None) -> int:
+        """이미 저장된 원본 리뷰 JSON을 반영합니다. 이미 센 리뷰는 건너뛴다."""
+        added = 0
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                reviews = json.load(f)
+            added += self.add_reviews(product_id_from_result_file(path), reviews)
+            if log_callback:
+                log_callback(f"키워드: {os.path.basename(path)} ({len(reviews)}개)")
+        return added
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OliveYoung review crawler - keyword and n-gram frequencies of review text")
+    parser.add_argument('--db', required=True, help=f'keyword cache file (e.g. <out_dir>/{KEYWORDS_FILENAME})')
+    parser.add_argument('--ingest', nargs='*', default=None, help='raw review JSON files or folders to count first (already counted reviews are skipped)')
+    parser.add_argument('--workers', type=int, default=1, help='counting processes for large inputs (0: CPU count)')
+    parser.add_argument('--product', nargs='*', default=None)
+    parser.add_argument('--kind', default=KIND_WORD, choices=list(KINDS))
+    parser.add_argument('--band', default=None, choices=list(BANDS), help='only reviews in this rating band (low 1-2, mid 3, high 4-5)')
+    parser.add_argument('--contrast', action='store_true', help='terms over-represented in --band (default low) versus the other bands')
+    parser.add_argument('--min_docs', type=int, default=None)
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT)
+    parser.add_argument('--export', default=None, help='write the result to .csv or .jsonl instead of printing it')
+    args = parser.parse_args()
+
+    index = KeywordIndex(args.db, workers=args.workers or None)
+    try:
+        if args.ingest is not None:
+            started = time.monotonic()
+            added = index.ingest_files(find_raw_result_files(args.ingest), log_callback=logging.info)
+            logging.info(f"키워드 반영 완료: 새 리뷰 {added}개 ({time.monotonic() - started:.1f}초)")
+        started = time.perf_counter()
+        if args.contrast:
+            rows = index.contrast(args.product, args.kind, args.band or BAND_LOW, args.limit,
+                                  3 if args.min_docs is None else args.min_docs)
+        else:
+            rows = index.top_terms(args.product, args.kind, args.band, args.limit, 2 if args.min_docs is None else args.min_docs)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if args.export:
+            export_rows(args.export, rows)
+            logging.info(f"{len(rows)}행 저장: {args.export} ({elapsed_ms:.1f}ms)")
+        else:
+            for row in rows:
+                print(json.dumps(row, ensure_ascii=False))
+            logging.info(f"{len(rows)}행 ({elapsed_ms:.1f}ms)")
+    finally:
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
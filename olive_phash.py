@@ -0,0 +1,254 @@
+import argparse
+import csv
+import logging
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import combinations
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:  # 사진 색인용 (선택)
+    np = None
+    Image = None
+
+from olive_photos import INDEX_FILENAME
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+HASH_BITS = 64
+SEGMENTS = 4                      # 다중 색인 해싱: 64비트를 16비트 조각 4개로 나눠 조각별로 색인
+SEGMENT_BITS = HASH_BITS // SEGMENTS
+DEFAULT_MAX_DISTANCE = 6          # 이 해밍 거리 이하면 같은 사진(재압축/리사이즈)으로 본다
+DCT_SIZE = 32
+LOW_FREQ = 8
+INDEX_CHUNK = 64                  # 프로세스 풀에 한 번에 넘기는 사진 수
+
+DUPLICATE_FIELDS = ['cluster', 'sha256', 'distance', 'product_id', '리뷰번호', '순번', 'url', 'path']
+
+
+def _dct_matrix(n: int):
+    k = np.arange(n)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+def compute_phash(path: str) -> int | None:
+    """DCT 기반 64비트 perceptual hash. 32x32 흑백으로 줄인 뒤 저주파 8x8 계수가 중앙값보다 큰지로 비트를 정한다.
+
+    프로세스 풀에서 호출되므로 모듈 최상위 함수로 둔다. 읽을 수 없는 파일이면 None.
+    """
+    try:
+        with Image.open(path) as image:
+            pixels = np.asarray(image.convert('L').resize((DCT_SIZE, DCT_SIZE), Image.LANCZOS), dtype=np.float64)
+    except Exception:
+        return None
+    dct = _dct_matrix(DCT_SIZE)
+    low = (dct @ pixels @ dct.T)[:LOW_FREQ, :LOW_FREQ].flatten()
+    median = np.median(low[1:])  # 직류 성분은 밝기만 반영하므로 기준에서 뺀다
+    value = 0
+    for bit in low > median:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def _to_signed(value: int) -> int:
+    """SQLite INTEGER는 부호 있는 64비트라 상위 비트가 켜진 해시를 음수로 바꿔 저장한다."""
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << HASH_BITS) if value < 0 else value
+
+
+def _segments(value: int) -> list[int]:
+    mask = (1 << SEGMENT_BITS) - 1
+    return [(value >> (SEGMENT_BITS * i)) & mask for i in range(SEGMENTS)]
+
+
+def _neighbors(segment: int, radius: int) -> list[int]:
+    """조각 값에서 해밍 거리 radius 이내인 모든 값."""
+    values = [segment]
+    for r in range(1, radius + 1):
+        for bits in combinations(range(SEGMENT_BITS), r):
+            flipped = segment
+            for bit in bits:
+                flipped ^= 1 << bit
+            values.append(flipped)
+    return values
+
+
+class PhashIndex:
+    """사진 저장소(photos.sqlite) 옆에 pHash와 다중 색인 해싱(MIH) 테이블을 둡니다.
+
+    해밍 거리 d 이내의 두 해시는 4개 조각 중 적어도 하나가 d // 4 비트 이내로 같다(비둘기집 원리).
+    그래서 조각별 색인에서 후보만 꺼내 실제 거리를 확인하면 전체 쌍을 비교하지 않고 근접 중복을 찾을 수 있다.
+    """
+
+    def __init__(self, store_root: str):
+        self.store_root = store_root
+        self.conn = sqlite3.connect(os.path.join(store_root, INDEX_FILENAME))
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS phashes (
+            sha256 TEXT PRIMARY KEY, path TEXT NOT NULL, phash INTEGER, computed_at TEXT)""")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS phash_segments (
+            segment INTEGER NOT NULL, value INTEGER NOT NULL, sha256 TEXT NOT NULL)""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS phash_segments_lookup ON phash_segments(segment, value)")
+        self.conn.commit()
+
+    def pending(self) -> list[tuple[str, str]]:
+        """저장소에 있지만 아직 해시를 계산하지 않은 (sha256, 경로) 목록."""
+        if not self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'photos'").fetchone():
+            return []
+        return self.conn.execute("""SELECT p.sha256, MIN(p.path) FROM photos p
+            LEFT JOIN phashes h ON h.sha256 = p.sha256 WHERE h.sha256 IS NULL GROUP BY p.sha256""").fetchall()
+
+    def update(self, workers: int | None = None, log_callback=None) -> int:
+        """새로 들어온 사진만 프로세스 풀로 해시를 계산해 색인에 더하고, 더한 개수를 반환합니다."""
+        if np is None or Image is None:
+            raise ImportError("사진 색인에는 Pillow와 numpy가 필요합니다: pip install Pillow numpy")
+        pending = self.pending()
+        if not pending:
+            return 0
+        paths = [os.path.join(self.store_root, path) for _, path in pending]
+        now = datetime.now().isoformat(timespec='seconds')
+        added = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for i, ((sha256, path), value) in enumerate(zip(pending, executor.map(compute_phash, paths, chunksize=INDEX_CHUNK)), 1):
+                # 읽지 못한 파일도 NULL로 남겨 다음 실행에서 다시 시도하지 않는다
+                self.conn.execute("INSERT OR REPLACE INTO phashes VALUES (?, ?, ?, ?)",
+                                  (sha256, path, None if value is None else _to_signed(value), now))
+                if value is not None:
+                    self.conn.executemany("INSERT INTO phash_segments VALUES (?, ?, ?)",
+                                          [(segment, part, sha256) for segment, part in enumerate(_segments(value))])
+                    added += 1
+                if i % 1000 == 0:
+                    self.conn.commit()
+                    if log_callback:
+                        log_callback(f"pHash 계산: {i}/{len(pending)}")
+        self.conn.commit()
+        return added
+
+    def hash_of(self, sha256: str) -> int | None:
+        row = self.conn.execute("SELECT phash FROM phashes WHERE sha256 = ?", (sha256,)).fetchone()
+        return None if row is None or row[0] is None else _to_unsigned(row[0])
+
+    def query(self, value: int, max_distance: int = DEFAULT_MAX_DISTANCE) -> list[tuple[str, int]]:
+        """해시 value에서 max_distance 이내인 사진의 (sha256, 거리) 목록. 가까운 순."""
+        radius = max_distance // SEGMENTS
+        candidates = set()
+        for segment, part in enumerate(_segments(value)):
+            for neighbor in _neighbors(part, radius):
+                candidates.update(row[0] for row in self.conn.execute(
+                    "SELECT sha256 FROM phash_segments WHERE segment = ? AND value = ?", (segment, neighbor)))
+        matches = []
+        for sha256 in candidates:
+            distance = hamming(value, self.hash_of(sha256))
+            if distance <= max_distance:
+                matches.append((sha256, distance))
+        return sorted(matches, key=lambda m: m[1])
+
+    def clusters(self, max_distance: int = DEFAULT_MAX_DISTANCE) -> list[dict[str, int]]:
+        """서로 max_distance 이내로 이어지는 사진 묶음({sha256: 묶음 대표와의 거리}) 중 2장 이상인 것."""
+        hashes = {sha256: _to_unsigned(value) for sha256, value in self.conn.execute("SELECT sha256, phash FROM phashes WHERE phash IS NOT NULL")}
+        parent = {sha256: sha256 for sha256 in hashes}
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for sha256, value in hashes.items():
+            for other, _ in self.query(value, max_distance):
+                a, b = find(sha256), find(other)
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+        groups: dict[str, dict[str, int]] = {}
+        for sha256 in hashes:
+            root = find(sha256)
+            groups.setdefault(root, {})[sha256] = hamming(hashes[root], hashes[sha256])
+        return [group for group in groups.values() if len(group) > 1]
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def duplicate_rows(clusters: list[dict[str, int]], manifest_rows: list[dict], min_reviews: int = 2) -> list[dict]:
+    """묶음별로 사진 매니페스트 행(리뷰)을 이어 붙입니다. 같은 사진은 내용 주소라 sha256 하나로 모인다.
+
+    서로 다른 리뷰 min_reviews개 이상에 쓰인 묶음만 남긴다.
+    """
+    by_sha: dict[str, list[dict]] = {}
+    for row in manifest_rows:
+        if row.get('sha256'):
+            by_sha.setdefault(row['sha256'], []).append(row)
+    # 완전히 같은 파일이 여러 리뷰에 쓰인 경우도 거리 0짜리 묶음으로 포함한다
+    clustered = {sha256 for group in clusters for sha256 in group}
+    groups = clusters + [{sha256: 0} for sha256 in by_sha if sha256 not in clustered]
+
+    result = []
+    cluster_no = 0
+    for group in groups:
+        rows = [(sha256, distance, row) for sha256, distance in group.items() for row in by_sha.get(sha256, [])]
+        if len({(row['product_id'], row['리뷰번호']) for _, _, row in rows}) < min_reviews:
+            continue
+        cluster_no += 1
+        for sha256, distance, row in rows:
+            result.append({**row, 'cluster': cluster_no, 'sha256': sha256, 'distance': distance})
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OliveYoung review crawler - perceptual-hash index of downloaded review photos")
+    parser.add_argument('--store', required=True, help='photo store folder created by olive_photos.py')
+    parser.add_argument('--workers', type=int, default=None, help='hashing processes (default: CPU count)')
+    parser.add_argument('--max_distance', type=int, default=DEFAULT_MAX_DISTANCE, help='max Hamming distance treated as the same photo')
+    parser.add_argument('--manifest', nargs='*', default=[], help='photo manifest CSV(s) to map duplicate photos back to reviews')
+    parser.add_argument('--out', default=None, help='duplicate report CSV. default: <store>/photo_duplicates_<timestamp>.csv')
+    parser.add_argument('--query', default=None, help='image file to look up instead of writing a report')
+    args = parser.parse_args()
+
+    index = PhashIndex(args.store)
+    try:
+        started = time.monotonic()
+        added = index.update(workers=args.workers, log_callback=logging.info)
+        logging.info(f"pHash 색인 갱신: 새 사진 {added}장 ({time.monotonic() - started:.1f}초)")
+
+        if args.query:
+            value = compute_phash(args.query)
+            if value is None:
+                sys.exit(f"이미지를 읽을 수 없습니다: {args.query}")
+            for sha256, distance in index.query(value, args.max_distance):
+                print(f"{distance:>3}  {sha256}")
+            return
+
+        clusters = index.clusters(args.max_distance)
+        logging.info(f"근접 중복 묶음 {len(clusters)}개 (해밍 거리 {args.max_distance} 이하)")
+        if not args.manifest:
+            return
+        manifest_rows = []
+        for path in args.manifest:
+            with open(path, encoding='utf-8-sig', newline='') as f:
+                manifest_rows.extend(csv.DictReader(f))
+        rows = duplicate_rows(clusters, manifest_rows)
+        out_path = args.out or os.path.join(args.store, f"photo_duplicates_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        with open(out_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=DUPLICATE_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+        logging.info(f"여러 리뷰에 쓰인 사진 묶음 {len({r['cluster'] for r in rows})}개 저장: {out_path}")
+    finally:
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
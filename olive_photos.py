@@ -0,0 +1,288 @@
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import signal
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from olive_engine.runtime import CancelToken, RateLimiter, ScrapeCancelled
+from olive_engine.sinks import find_raw_result_files, product_id_from_result_file
+from olive_engine.transform import photo_urls
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_WORKERS = 8
+DEFAULT_TIMEOUT = 20
+CHUNK_SIZE = 64 * 1024
+PHOTO_RETRIES = 2
+INDEX_FILENAME = 'photos.sqlite'
+
+# 매니페스트의 사진별 상태
+PHOTO_DOWNLOADED = 'downloaded'
+PHOTO_CACHED = 'cached'                # 색인에 있고 파일도 있어 요청하지 않음
+PHOTO_NOT_MODIFIED = 'not_modified'    # 조건부 요청에 304
+PHOTO_FAILED = 'failed'
+
+MANIFEST_FIELDS = ['product_id', '리뷰번호', '순번', 'url', 'status', 'sha256', 'path', 'bytes', 'error']
+
+# 확장자는 URL이 아니라 내용으로 정한다 (같은 내용은 항상 같은 파일)
+IMAGE_SIGNATURES = [(b'\xff\xd8\xff', '.jpg'), (b'\x89PNG\r\n\x1a\n', '.png'), (b'GIF8', '.gif')]
+
+PHOTO_HEADERS = {
+    'Accept': 'image/avif,image/webp,image/apng,image/*,*/*;q=0.8',
+    'Referer': 'https://www.oliveyoung.co.kr/',
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36',
+}
+
+
+def image_extension(head: bytes) -> str:
+    for signature, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return '.webp'
+    return '.bin'
+
+
+class PhotoStore:
+    """내용 주소(sha256) 기반 사진 저장소와 URL 색인(SQLite).
+
+    파일은 <root>/<sha 앞 2자>/<sha><확장자>에 한 번만 저장되므로 같은 사진이 여러 리뷰/상품에 올라와도
+    디스크에는 하나만 남는다. 색인은 URL별 sha256과 ETag/Last-Modified를 기록해 재실행 시 이어 받기와
+    조건부 요청에 쓴다. 모든 메서드는 스레드 안전하다.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(root, INDEX_FILENAME), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS photos (
+            url TEXT PRIMARY KEY, sha256 TEXT NOT NULL, path TEXT NOT NULL, bytes INTEGER,
+            etag TEXT, last_modified TEXT, fetched_at TEXT)""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS photos_sha256 ON photos(sha256)")
+        self.conn.commit()
+
+    def lookup(self, url: str) -> dict | None:
+        """색인된 URL 정보. 색인에 있어도 파일이 지워졌으면 None."""
+        with self.lock:
+            row = self.conn.execute("SELECT sha256, path, bytes, etag, last_modified FROM photos WHERE url = ?", (url,)).fetchone()
+        if row is None or not os.path.exists(os.path.join(self.root, row[1])):
+            return None
+        return {'sha256': row[0], 'path': row[1], 'bytes': row[2], 'etag': row[3], 'last_modified': row[4]}
+
+    def record(self, url: str, sha256: str, path: str, size: int, etag: str | None, last_modified: str | None) -> None:
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO photos VALUES (?, ?, ?, ?, ?, ?, ?)", (url, sha256, path, size, etag, last_modified, now))
+            self.conn.commit()
+
+    def touch(self, url: str) -> None:
+        with self.lock:
+            self.conn.execute("UPDATE photos SET fetched_at = ? WHERE url = ?", (datetime.now().isoformat(timespec='seconds'), url))
+            self.conn.commit()
+
+    def temp_path(self) -> str:
+        temp_dir = os.path.join(self.root, 'tmp')
+        os.makedirs(temp_dir, exist_ok=True)
+        return os.path.join(temp_dir, f"{uuid.uuid4().hex}.part")
+
+    def commit_file(self, temp_path: str, sha256: str, extension: str) -> str:
+        """받은 임시 파일을 내용 주소 경로로 옮기고 저장소 기준 상대 경로를 반환합니다. 이미 있으면 임시 파일만 지운다."""
+        relative = os.path.join(sha256[:2], sha256 + extension)
+        final_path = os.path.join(self.root, relative)
+        if os.path.exists(final_path):
+            os.remove(temp_path)
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(temp_path, final_path)
+        return relative.replace(os.sep, '/')
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+class PhotoDownloader:
+    """사진 URL을 워커 풀로 내려받아 PhotoStore에 저장합니다.
+
+    같은 URL은 한 번만 요청하고, 이미 색인된 URL은 건너뛴다(revalidate=True면 ETag/Last-Modified로 조건부 요청).
+    """
+
+    def __init__(self, store: PhotoStore, workers: int = DEFAULT_WORKERS, rate: float | None = None, revalidate: bool = False,
+                 cancel_token: CancelToken | None = None, timeout: float = DEFAULT_TIMEOUT, session=None):
+        self.store = store
+        self.workers = max(1, workers)
+        self.rate_limiter = RateLimiter(rate, burst=self.workers) if rate else None
+        self.revalidate = revalidate
+        self.cancel_token = cancel_token or CancelToken()
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update(PHOTO_HEADERS)
+        self.session = session
+
+    def download_all(self, urls: list[str], progress_callback=None) -> dict[str, dict]:
+        """URL별 결과 {'status', 'sha256', 'path', 'bytes', 'error'}를 반환합니다. 취소되면 받은 데까지만 반환한다."""
+        unique = list(dict.fromkeys(urls))
+        results: dict[str, dict] = {}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='olive-photo') as executor:
+            futures = {executor.submit(self._download_one, url): url for url in unique}
+            for i, future in enumerate(as_completed(futures), 1):
+                url = futures[future]
+                try:
+                    results[url] = future.result()
+                except ScrapeCancelled:
+                    continue
+                if progress_callback:
+                    progress_callback(i, len(unique), url, results[url])
+        return results
+
+    def _download_one(self, url: str) -> dict:
+        self.cancel_token.raise_if_cancelled()
+        known = self.store.lookup(url)
+        if known and not self.revalidate:
+            return {'status': PHOTO_CACHED, 'sha256': known['sha256'], 'path': known['path'], 'bytes': known['bytes'], 'error': ''}
+        headers = {}
+        if known:
+            if known['etag']:
+                headers['If-None-Match'] = known['etag']
+            if known['last_modified']:
+                headers['If-Modified-Since'] = known['last_modified']
+
+        error = ''
+        for attempt in range(PHOTO_RETRIES + 1):
+            if attempt:
+                self.cancel_token.sleep(2 ** attempt)
+            if self.rate_limiter:
+                self.rate_limiter.acquire(self.cancel_token)
+            try:
+                return self._fetch(url, headers, known)
+            except ScrapeCancelled:
+                raise
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                logging.debug(f"사진 다운로드 실패 ({attempt + 1}/{PHOTO_RETRIES + 1}): {url} - {error}")
+        logging.warning(f"사진 다운로드 실패: {url} - {error}")
+        return {'status': PHOTO_FAILED, 'sha256': '', 'path': '', 'bytes': 0, 'error': error}
+
+    def _fetch(self, url: str, headers: dict, known: dict | None) -> dict:
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304 and known:
+                self.store.touch(url)
+                return {'status': PHOTO_NOT_MODIFIED, 'sha256': known['sha256'], 'path': known['path'], 'bytes': known['bytes'], 'error': ''}
+            if response.status_code != 200:
+                # 4xx는 다시 시도해도 같으므로 바로 실패로 기록한다
+                if 400 <= response.status_code < 500 and response.status_code != 429:
+                    return {'status': PHOTO_FAILED, 'sha256': '', 'path': '', 'bytes': 0, 'error': f"HTTP {response.status_code}"}
+                raise RuntimeError(f"HTTP {response.status_code}")
+            # 받는 동안 해시를 계산하고 임시 파일에 써서 메모리에 사진 전체를 들고 있지 않는다
+            digest = hashlib.sha256()
+            head = b''
+            size = 0
+            temp_path = self.store.temp_path()
+            try:
+                with open(temp_path, 'wb') as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        self.cancel_token.raise_if_cancelled()
+                        if len(head) < 16:
+                            head += chunk[:16]
+                        digest.update(chunk)
+                        f.write(chunk)
+                        size += len(chunk)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+            sha256 = digest.hexdigest()
+            path = self.store.commit_file(temp_path, sha256, image_extension(head))
+            self.store.record(url, sha256, path, size, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            return {'status': PHOTO_DOWNLOADED, 'sha256': sha256, 'path': path, 'bytes': size, 'error': ''}
+
+
+def collect_photo_rows(paths: list[str]) -> list[dict]:
+    """원본(또는 가공) 리뷰 JSON에서 사진 하나당 한 행 {'product_id', '리뷰번호', '순번', 'url'}을 만듭니다."""
+    rows = []
+    for path in paths:
+        product_id = product_id_from_result_file(path)
+        with open(path, encoding='utf-8') as f:
+            reviews = json.load(f)
+        for review in reviews:
+            if 'photoList' in review:
+                urls = photo_urls(review)
+            else:
+                urls = [u for u in str(review.get('사진URL') or '').split(';') if u]
+            review_id = review.get('gdasSeq', review.get('리뷰번호', ''))
+            for i, url in enumerate(urls, 1):
+                rows.append({'product_id': product_id, '리뷰번호': review_id, '순번': i, 'url': url})
+    return rows
+
+
+def write_photo_manifest(path: str, rows: list[dict]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OliveYoung review crawler - download review photos into a content-addressed store")
+    parser.add_argument('inputs', nargs='+', help='raw review JSON files (or folders containing 올리브영_리뷰_원본_*.json)')
+    parser.add_argument('--store', required=True, help='photo store folder (files + photos.sqlite index)')
+    parser.add_argument('--manifest', default=None, help='output CSV linking review rows to local files. default: <store>/photo_manifest_<timestamp>.csv')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--rate', type=float, default=None, help='optional global request rate limit (requests/sec)')
+    parser.add_argument('--revalidate', action='store_true', help='re-check already stored photos with conditional requests (ETag / Last-Modified)')
+    args = parser.parse_args()
+
+    rows = collect_photo_rows(find_raw_result_files(args.inputs))
+    urls = [row['url'] for row in rows]
+    logging.info(f"사진 {len(rows)}장 (고유 URL {len(set(urls))}개), 워커 {args.workers}개")
+
+    cancel_token = CancelToken()
+    signal.signal(signal.SIGINT, lambda signum, frame: cancel_token.cancel())
+    store = PhotoStore(args.store)
+    started = time.monotonic()
+    try:
+        downloader = PhotoDownloader(store, workers=args.workers, rate=args.rate, revalidate=args.revalidate, cancel_token=cancel_token)
+        step = max(1, len(set(urls)) // 20)
+
+        def progress(done, total, url, result):
+            if done % step == 0 or done == total:
+                logging.info(f"진행률: {done}/{total}")
+
+        results = downloader.download_all(urls, progress_callback=progress)
+    finally:
+        store.close()
+
+    for row in rows:
+        row.update(results.get(row['url']) or {'status': PHOTO_FAILED, 'error': '취소됨'})
+    manifest_path = args.manifest or os.path.join(args.store, f"photo_manifest_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    write_photo_manifest(manifest_path, rows)
+
+    counts = {}
+    for result in results.values():
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    total_bytes = sum(r['bytes'] or 0 for r in results.values() if r['status'] == PHOTO_DOWNLOADED)
+    logging.info(f"사진 다운로드 완료 ({time.monotonic() - started:.1f}초, {total_bytes / 1024 / 1024:.1f}MB): {counts}")
+    logging.info(f"사진 매니페스트 저장: {manifest_path}")
+    sys.exit(1 if counts.get(PHOTO_FAILED) or cancel_token.is_cancelled() else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,455 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QComboBox, QTableView, QFileDialog, QDoubleSpinBox, QHeaderView
+from PySide6.QtCore import Signal, Slot, Qt, QTimer, QAbstractTableModel, QModelIndex
+
+from olive_search import ORDER_LATEST, ORDER_RELEVANCE, SEARCH_INDEX_FILENAME, ReviewSearchIndex
+
+PAGE_SIZE = 5000               # 테이블이 한 번에 가져오는 행 수 (fetchMore 단위)
+JSON_READ_BYTES = 1 << 20      # 결과 JSON을 읽어 들이는 단위
+FILTER_DEBOUNCE_MS = 300       # 검색어 입력 후 필터를 적용하기까지 대기 시간
+PROCESSED_JSON_PATTERN = "올리브영_리뷰_가공_*.json"
+DATE_COLUMN = '작성일'
+RATING_COLUMN = '평점'
+TEXT_COLUMNS = ['작성자', '아이디', '구매옵션', '리뷰내용', '피부정보']
+SEARCH_LIMIT = 5000            # 전체 검색 결과 최대 행 수
+SEARCH_COLUMNS = {'product_id': '상품ID', 'review_id': '리뷰번호', 'rating': RATING_COLUMN, 'review_date': DATE_COLUMN,
+                  'nickname': '작성자', 'option': '구매옵션', 'content': '리뷰내용'}
+
+
+def iter_json_records(path: str, chunk_rows: int = PAGE_SIZE):
+    """레코드 배열 JSON 파일을 통째로 읽지 않고 JSON_READ_BYTES씩 읽어 chunk_rows개씩 레코드 목록으로 돌려줍니다."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding='utf-8') as f:
+        buf, pos, eof = '', 0, False
+
+        def fill():
+            nonlocal buf, pos, eof
+            more = f.read(JSON_READ_BYTES)
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+
+        def skip(chars):
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in chars:
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                fill()
+
+        skip(' \t\r\n\ufeff')
+        if buf[pos:pos + 1] != '[':
+            raise ValueError(f"레코드 배열 형식의 JSON이 아닙니다: {path}")
+        pos += 1
+        chunk = []
+        while True:
+            skip(' \t\r\n,')
+            if pos >= len(buf):
+                raise ValueError(f"JSON 배열이 끝나지 않았습니다: {path}")
+            if buf[pos] == ']':
+                break
+            try:
+                record, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()  # 레코드가 읽은 범위 끝에서 잘렸다
+                continue
+            chunk.append(record)
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class ReviewDataSource:
+    """저장된 가공 리뷰 데이터(JSON)를 열 단위로 들고 있으면서 필터/정렬 결과를 행 번호 배열로 돌려준다.
+
+    위젯은 만들지 않으며 query()는 UI 스레드 밖에서 호출하는 것을 전제로 한다.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df.reset_index(drop=True)
+        self.columns = list(self.df.columns)
+        # 날짜/텍스트 필터용 보조 열은 로드 시 한 번만 만든다
+        if DATE_COLUMN in self.df:
+            self._dates = pd.to_datetime(self.df[DATE_COLUMN].astype(str).str.replace('.', '-', regex=False), errors='coerce')
+        else:
+            self._dates = None
+        text_columns = [c for c in TEXT_COLUMNS if c in self.df]
+        self._search_text = None
+        for column in text_columns:
+            column_text = self.df[column].astype(str)
+            self._search_text = column_text if self._search_text is None else self._search_text + '\n' + column_text
+        if self._search_text is not None:
+            self._search_text = self._search_text.str.lower()
+        # 셀 조회는 numpy 배열에서 바로 한다 (DataFrame.iat보다 빠름)
+        self._values = [self.df[c].to_numpy() for c in self.columns]
+
+    @classmethod
+    def from_json(cls, path: str) -> 'ReviewDataSource':
+        # 파일 문자열 전체와 파싱된 객체 전체를 한꺼번에 들지 않도록 PAGE_SIZE개씩 DataFrame으로 바꿔 붙인다
+        frames = [pd.DataFrame.from_records(chunk) for chunk in iter_json_records(path)]
+        return cls(pd.concat(frames, ignore_index=True) if frames else pd.DataFrame())
+
+    def __len__(self):
+        return len(self.df)
+
+    def value(self, row: int, col: int):
+        return self._values[col][row]
+
+    def query(self, text: str = '', min_rating: float = 0.0, date_from: str = '', date_to: str = '', sort_column: int | None = None, ascending: bool = True):
+        """조건에 맞는 행 번호 배열(numpy)을 정렬된 순서로 반환합니다."""
+        mask = pd.Series(True, index=self.df.index)
+        if text and self._search_text is not None:
+            mask &= self._search_text.str.contains(text.lower(), regex=False)
+        if min_rating > 0 and RATING_COLUMN in self.df:
+            mask &= pd.to_numeric(self.df[RATING_COLUMN], errors='coerce') >= min_rating
+        if self._dates is not None:
+            if date_from:
+                mask &= self._dates >= pd.to_datetime(date_from, errors='coerce')
+            if date_to:
+                mask &= self._dates <= pd.to_datetime(date_to, errors='coerce')
+
+        selected = self.df.index[mask.to_numpy()]
+        if sort_column is not None and 0 <= sort_column < len(self.columns):
+            column = self.columns[sort_column]
+            key = self._dates if column == DATE_COLUMN and self._dates is not None else self.df[column]
+            selected = key.loc[selected].sort_values(ascending=ascending, kind='mergesort', na_position='last').index
+        return selected.to_numpy()
+
+
+class ReviewTableModel(QAbstractTableModel):
+    """ReviewDataSource를 QTableView에 보여주는 모델. 행은 PAGE_SIZE 단위로 늘려가며 노출한다."""
+
+    sort_requested = Signal(int, bool)  # column, ascending
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.source = None
+        self._order = []
+        self._loaded_rows = 0
+
+    def set_result(self, source, order):
+        self.beginResetModel()
+        self.source = source
+        self._order = order
+        self._loaded_rows = min(PAGE_SIZE, len(order))
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded_rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() or self.source is None else len(self.source.columns)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded_rows < len(self._order)
+
+    def fetchMore(self, parent=QModelIndex()):
+        remaining = len(self._order) - self._loaded_rows
+        count = min(PAGE_SIZE, remaining)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded_rows, self._loaded_rows + count - 1)
+        self._loaded_rows += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        value = self.source.value(int(self._order[index.row()]), index.column())
+        if value is None or (isinstance(value, float) and pd.isna(value)):
+            return ''
+        text = str(value)
+        if role == Qt.DisplayRole and len(text) > 200:
+            return text[:200] + '…'
+        return text
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or self.source is None:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.source.columns[section]
+        return str(section + 1)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # 정렬은 뷰가 직접 하지 않고 백그라운드 쿼리로 넘긴다
+        self.sort_requested.emit(column, order == Qt.AscendingOrder)
+
+
+class ResultsTab(QWidget):
+    """수집 결과(가공 JSON)를 가상화된 표로 보여주는 탭. 로드/필터/정렬은 워커 스레드에서 수행한다."""
+
+    result_ready_signal = Signal(int, object, object)  # generation, source, order
+    error_signal = Signal(str)
+
+    def __init__(self, output_dir_getter, parent=None):
+        super().__init__(parent)
+        self.output_dir_getter = output_dir_getter
+        self.source = None
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+        self._sort_column = None
+        self._sort_ascending = True
+
+        layout = QVBoxLayout(self)
+
+        file_hbox = QHBoxLayout()
+        self.file_combo = QComboBox()
+        self.file_combo.setMinimumWidth(300)
+        refresh_button = QPushButton("새로고침")
+        refresh_button.clicked.connect(self.refresh_file_list)
+        browse_button = QPushButton("파일 열기")
+        browse_button.clicked.connect(self._browse_file)
+        load_button = QPushButton("불러오기")
+        load_button.clicked.connect(lambda: self.load_file(self.file_combo.currentData()))
+        file_hbox.addWidget(QLabel("결과 파일:"))
+        file_hbox.addWidget(self.file_combo, 1)
+        file_hbox.addWidget(refresh_button)
+        file_hbox.addWidget(browse_button)
+        file_hbox.addWidget(load_button)
+        layout.addLayout(file_hbox)
+
+        filter_hbox = QHBoxLayout()
+        self.text_filter_input = QLineEdit()
+        self.text_filter_input.setPlaceholderText("리뷰 내용/작성자/옵션 검색")
+        self.min_rating_input = QDoubleSpinBox()
+        self.min_rating_input.setRange(0, 5)
+        self.min_rating_input.setSingleStep(0.5)
+        self.date_from_input = QLineEdit()
+        self.date_from_input.setPlaceholderText("시작일 YYYY-MM-DD")
+        self.date_to_input = QLineEdit()
+        self.date_to_input.setPlaceholderText("종료일 YYYY-MM-DD")
+        filter_hbox.addWidget(QLabel("검색:"))
+        filter_hbox.addWidget(self.text_filter_input, 1)
+        filter_hbox.addWidget(QLabel("최소 평점:"))
+        filter_hbox.addWidget(self.min_rating_input)
+        filter_hbox.addWidget(self.date_from_input)
+        filter_hbox.addWidget(self.date_to_input)
+        layout.addLayout(filter_hbox)
+
+        self.model = ReviewTableModel(self)
+        self.model.sort_requested.connect(self._on_sort_requested)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.setSortingEnabled(True)
+        self.table_view.setWordWrap(False)
+        # 행 높이를 고정해야 뷰가 보이는 행만 계산한다
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        layout.addWidget(self.table_view)
+
+        self.status_label = QLabel("결과 파일을 선택하세요.")
+        layout.addWidget(self.status_label)
+
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.apply_filters)
+        self.text_filter_input.textChanged.connect(self.filter_timer.start)
+        self.min_rating_input.valueChanged.connect(self.filter_timer.start)
+        self.date_from_input.editingFinished.connect(self.filter_timer.start)
+        self.date_to_input.editingFinished.connect(self.filter_timer.start)
+
+        self.result_ready_signal.connect(self._on_result_ready)
+        self.error_signal.connect(self.status_label.setText)
+
+        self.refresh_file_list()
+
+    def refresh_file_list(self):
+        selected = self.file_combo.currentData()
+        self.file_combo.clear()
+        out_dir = self.output_dir_getter()
+        paths = sorted(glob.glob(os.path.join(out_dir, PROCESSED_JSON_PATTERN)), key=os.path.getmtime, reverse=True)
+        for path in paths:
+            self.file_combo.addItem(os.path.basename(path), path)
+        if selected:
+            index = self.file_combo.findData(selected)
+            if index >= 0:
+                self.file_combo.setCurrentIndex(index)
+
+    def _browse_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "가공 JSON 파일 선택", self.output_dir_getter(), "JSON (*.json)")
+        if path:
+            self.file_combo.insertItem(0, os.path.basename(path), path)
+            self.file_combo.setCurrentIndex(0)
+            self.load_file(path)
+
+    def _next_generation(self):
+        with self._generation_lock:
+            self._generation += 1
+            return self._generation
+
+    def load_file(self, path):
+        if not path:
+            return
+        self.status_label.setText(f"불러오는 중: {os.path.basename(path)}")
+        generation = self._next_generation()
+        threading.Thread(target=self._load_worker, args=(generation, path, self._current_query()), daemon=True).start()
+
+    def _load_worker(self, generation, path, query):
+        try:
+            source = ReviewDataSource.from_json(path)
+            order = source.query(**query)
+            self.result_ready_signal.emit(generation, source, order)
+        except Exception as e:
+            logging.error(f"결과 파일 로드 실패: {path} ({e})", exc_info=True)
+            self.error_signal.emit(f"결과 파일 로드 실패: {e}")
+
+    def _current_query(self):
+        return {
+            'text': self.text_filter_input.text().strip(),
+            'min_rating': self.min_rating_input.value(),
+            'date_from': self.date_from_input.text().strip(),
+            'date_to': self.date_to_input.text().strip(),
+            'sort_column': self._sort_column,
+            'ascending': self._sort_ascending,
+        }
+
+    @Slot()
+    def apply_filters(self):
+        if self.source is None:
+            return
+        generation = self._next_generation()
+        source, query = self.source, self._current_query()
+        self.status_label.setText("필터 적용 중...")
+        threading.Thread(target=self._query_worker, args=(generation, source, query), daemon=True).start()
+
+    def _query_worker(self, generation, source, query):
+        try:
+            self.result_ready_signal.emit(generation, source, source.query(**query))
+        except Exception as e:
+            logging.error(f"결과 필터 적용 실패: {e}", exc_info=True)
+            self.error_signal.emit(f"필터 적용 실패: {e}")
+
+    @Slot(int, bool)
+    def _on_sort_requested(self, column, ascending):
+        self._sort_column = column
+        self._sort_ascending = ascending
+        self.apply_filters()
+
+    @Slot(int, object, object)
+    def _on_result_ready(self, generation, source, order):
+        # 더 최근 요청이 있으면 늦게 도착한 결과는 버린다
+        if generation != self._generation:
+            return
+        self.source = source
+        self.model.set_result(source, order)
+        self.status_label.setText(f"{len(order):,} / {len(source):,}행 표시")
+
+
+class SearchTab(QWidget):
+    """저장 폴더의 전체 검색 색인(review_search.sqlite)에서 모든 상품의 리뷰를 찾는 탭. 검색은 워커 스레드에서 수행한다."""
+
+    result_ready_signal = Signal(int, object, float)  # generation, source, elapsed_ms
+    error_signal = Signal(str)
+
+    def __init__(self, output_dir_getter, parent=None):
+        super().__init__(parent)
+        self.output_dir_getter = output_dir_getter
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+
+        layout = QVBoxLayout(self)
+        query_hbox = QHBoxLayout()
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText('검색어 (모두 포함, "구문", -제외)  예: 트러블 -없어요')
+        self.product_input = QLineEdit()
+        self.product_input.setPlaceholderText("상품 ID (쉼표로 여러 개)")
+        self.order_combo = QComboBox()
+        self.order_combo.addItem("최신순", ORDER_LATEST)
+        self.order_combo.addItem("관련도순", ORDER_RELEVANCE)
+        search_button = QPushButton("검색")
+        search_button.clicked.connect(self.search)
+        query_hbox.addWidget(QLabel("전체 검색:"))
+        query_hbox.addWidget(self.query_input, 2)
+        query_hbox.addWidget(self.product_input, 1)
+        query_hbox.addWidget(self.order_combo)
+        query_hbox.addWidget(search_button)
+        layout.addLayout(query_hbox)
+
+        filter_hbox = QHBoxLayout()
+        self.min_rating_input = QDoubleSpinBox()
+        self.min_rating_input.setRange(0, 5)
+        self.min_rating_input.setSingleStep(0.5)
+        self.date_from_input = QLineEdit()
+        self.date_from_input.setPlaceholderText("시작일 YYYY-MM-DD")
+        self.date_to_input = QLineEdit()
+        self.date_to_input.setPlaceholderText("종료일 YYYY-MM-DD")
+        filter_hbox.addWidget(QLabel("최소 평점:"))
+        filter_hbox.addWidget(self.min_rating_input)
+        filter_hbox.addWidget(self.date_from_input)
+        filter_hbox.addWidget(self.date_to_input)
+        filter_hbox.addStretch(1)
+        layout.addLayout(filter_hbox)
+
+        self.model = ReviewTableModel(self)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.setWordWrap(False)
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        layout.addWidget(self.table_view)
+
+        self.status_label = QLabel("검색어를 입력하세요. 색인은 수집 결과를 저장할 때 함께 만들어집니다.")
+        layout.addWidget(self.status_label)
+
+        self.query_input.returnPressed.connect(self.search)
+        self.product_input.returnPressed.connect(self.search)
+        self.result_ready_signal.connect(self._on_result_ready)
+        self.error_signal.connect(self.status_label.setText)
+
+    def index_path(self):
+        return os.path.join(self.output_dir_getter(), SEARCH_INDEX_FILENAME)
+
+    @Slot()
+    def search(self):
+        path = self.index_path()
+        if not os.path.exists(path):
+            self.status_label.setText(f"검색 색인이 없습니다: {path}")
+            return
+        with self._generation_lock:
+            self._generation += 1
+            generation = self._generation
+        query = {
+            'query': self.query_input.text().strip(),
+            'product_ids': [p.strip() for p in self.product_input.text().split(',') if p.strip()] or None,
+            'min_rating': self.min_rating_input.value() or None,
+            'date_from': self.date_from_input.text().strip() or None,
+            'date_to': self.date_to_input.text().strip() or None,
+            'order': self.order_combo.currentData(),
+            'limit': SEARCH_LIMIT,
+        }
+        self.status_label.setText("검색 중...")
+        threading.Thread(target=self._search_worker, args=(generation, path, query), daemon=True).start()
+
+    def _search_worker(self, generation, path, query):
+        try:
+            started = time.perf_counter()
+            index = ReviewSearchIndex(path)
+            try:
+                rows = index.search(**query)
+            finally:
+                index.close()
+            df = pd.DataFrame(rows, columns=list(SEARCH_COLUMNS)).rename(columns=SEARCH_COLUMNS)
+            self.result_ready_signal.emit(generation, ReviewDataSource(df), (time.perf_counter() - started) * 1000)
+        except Exception as e:
+            logging.error(f"전체 검색 실패: {e}", exc_info=True)
+            self.error_signal.emit(f"검색 실패: {e}")
+
+    @Slot(int, object, float)
+    def _on_result_ready(self, generation, source, elapsed_ms):
+        if generation != self._generation:
+            return
+        self.model.set_result(source, list(range(len(source))))
+        more = " (최대 표시 수 도달)" if len(source) >= SEARCH_LIMIT else ""
+        self.status_label.setText(f"{len(source):,}건{more}, {elapsed_ms:.0f}ms")
@@ -0,0 +1,237 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from olive_engine.sinks import export_rows, find_raw_result_files, product_id_from_result_file
+from olive_engine.transform import parse_review_date, review_flags, review_key
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+REVIEWERS_FILENAME = 'review_reviewers.sqlite'
+RATING_STARS = (1, 2, 3, 4, 5)
+DEFAULT_LIMIT = 50
+
+ORDER_REVIEWS = 'reviews'
+ORDER_PRODUCTS = 'products'
+ORDER_RANK = 'rank'
+ORDER_RECENT = 'recent'
+
+STAR_COLUMNS = [f'star{star}' for star in RATING_STARS]
+
+
+class ReviewerIndex:
+    """작성자(mbrId)별로 모든 상품의 리뷰를 모아 두는 색인(SQLite).
+
+    reviewer_reviews에 리뷰 한 건당 한 행을 (작성자, 상품) 색인과 함께 두고, reviewers에는 작성자별 리뷰 수/상품 수/
+    별점 분포/첫·마지막 작성일/최고 TOP 순위를 리뷰가 들어올 때마다 더해 둔다. 그래서 "이 작성자가 리뷰한 모든 상품"이나
+    "상품을 많이 리뷰한 TOP 리뷰어" 조회가 원본 JSON을 다시 읽지 않고 색인만으로 끝난다.
+    같은 리뷰는 (상품, 리뷰 키)로 한 번만 센다. ResultPipeline sink로 쓸 수 있고, 모든 메서드는 스레드 안전하다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS reviewer_reviews (
+            product_id TEXT NOT NULL, review_id TEXT NOT NULL, member_id TEXT NOT NULL, rating REAL, review_date TEXT,
+            top_rank INTEGER, PRIMARY KEY (product_id, review_id)) WITHOUT ROWID""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS reviewer_reviews_member ON reviewer_reviews(member_id, product_id)")
+        stars = ', '.join(f"{column} INTEGER NOT NULL DEFAULT 0" for column in STAR_COLUMNS)
+        self.conn.execute(f"""CREATE TABLE IF NOT EXISTS reviewers (
+            member_id TEXT PRIMARY KEY, nickname TEXT, reviews INTEGER NOT NULL DEFAULT 0, products INTEGER NOT NULL DEFAULT 0,
+            rating_sum REAL NOT NULL DEFAULT 0, {stars}, photo INTEGER NOT NULL DEFAULT 0,
+            best_rank INTEGER, first_date TEXT, last_date TEXT)""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS reviewers_nickname ON reviewers(nickname)")
+        # 작성자 평점을 상품 평균과 비교할 수 있도록 상품별 합계도 같이 둔다
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS product_ratings (
+            product_id TEXT PRIMARY KEY, reviews INTEGER NOT NULL DEFAULT 0, rating_sum REAL NOT NULL DEFAULT 0)""")
+        self.conn.commit()
+
+    def add_reviews(self, product_id: str, reviews: list) -> int:
+        """작성자 ID가 있는 처음 보는 리뷰만 색인에 더하고 더한 리뷰 수를 반환합니다."""
+        added = 0
+        rating_sum = 0.0
+        with self.lock:
+            with self.conn:
+                for review in reviews:
+                    member_id = str(review.get('mbrId') or '').strip()
+                    if not member_id:
+                        continue
+                    # 이 상품에 대한 작성자의 첫 리뷰인지는 삽입 전에 확인해야 한다
+                    new_product = self.conn.execute(
+                        "SELECT 1 FROM reviewer_reviews WHERE member_id = ? AND product_id = ? LIMIT 1", (member_id, product_id)).fetchone() is None
+                    flags = review_flags(review)
+                    review_date = parse_review_date(review)
+                    day = review_date.isoformat() if review_date else None
+                    rank = review.get('topRvrRnk') or None
+                    cursor = self.conn.execute(
+                        "INSERT OR IGNORE INTO reviewer_reviews VALUES (?, ?, ?, ?, ?, ?)",
+                        (product_id, review_key(review), member_id, flags['평점'], day, rank))
+                    if not cursor.rowcount:
+                        continue
+                    star = round(flags['평점'])
+                    star_values = [int(star == s) for s in RATING_STARS]
+                    self.conn.execute(
+                        f"""INSERT INTO reviewers (member_id, nickname, reviews, products, rating_sum, {', '.join(STAR_COLUMNS)}, photo,
+                                best_rank, first_date, last_date)
+                            VALUES (?, ?, 1, ?, ?, {', '.join('?' * len(STAR_COLUMNS))}, ?, ?, ?, ?)
+                            ON CONFLICT (member_id) DO UPDATE SET
+                                nickname = COALESCE(NULLIF(excluded.nickname, ''), nickname),
+                                reviews = reviews + 1, products = products + excluded.products, rating_sum = rating_sum + excluded.rating_sum,
+                                {', '.join(f'{column} = {column} + excluded.{column}' for column in STAR_COLUMNS)},
+                                photo = photo + excluded.photo,
+                                best_rank = CASE WHEN best_rank IS NULL OR excluded.best_rank < best_rank THEN COALESCE(excluded.best_rank, best_rank) ELSE best_rank END,
+                                first_date = CASE WHEN first_date IS NULL OR excluded.first_date < first_date THEN COALESCE(excluded.first_date, first_date) ELSE first_date END,
+                                last_date = CASE WHEN last_date IS NULL OR excluded.last_date > last_date THEN COALESCE(excluded.last_date, last_date) ELSE last_date END""",
+                        (member_id, review.get('mbrNickNm', '') or '', int(new_product), flags['평점'], *star_values,
+                         int(flags['사진여부']), rank, day, day))
+                    added += 1
+                    rating_sum += flags['평점']
+                if added:
+                    self.conn.execute(
+                        "INSERT INTO product_ratings VALUES (?, ?, ?) ON CONFLICT (product_id) DO UPDATE SET "
+                        "reviews = reviews + excluded.reviews, rating_sum = rating_sum + excluded.rating_sum",
+                        (product_id, added, rating_sum))
+        return added
+
+    def write(self, product_id: str, reviews: list, df=None) -> None:
+        """ResultPipeline sink 인터페이스."""
+        added = self.add_reviews(product_id, reviews)
+        logging.info(f"작성자 색인 반영: 상품 {product_id} 새 리뷰 {added}개")
+
+    @staticmethod
+    def _profile(row: sqlite3.Row) -> dict:
+        reviews = row['reviews']
+        profile = {
+            'member_id': row['member_id'], 'nickname': row['nickname'] or '', 'reviews': reviews, 'products': row['products'],
+            '평균평점': round(row['rating_sum'] / reviews, 3) if reviews else None,
+        }
+        for star, column in zip(RATING_STARS, STAR_COLUMNS):
+            profile[f'별점{star}'] = row[column]
+        profile['사진_비율'] = round(row['photo'] / reviews, 4) if reviews else None
+        profile['최고순위'] = row['best_rank'] or ''
+        profile['첫작성일'] = row['first_date'] or ''
+        profile['최신작성일'] = row['last_date'] or ''
+        return profile
+
+    def reviewer(self, member_id: str) -> dict | None:
+        """작성자 한 명의 누적 통계. 색인에 없으면 None."""
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM reviewers WHERE member_id = ?", (member_id,)).fetchone()
+        return self._profile(row) if row else None
+
+    def products_of(self, member_id: str) -> list[dict]:
+        """작성자가 리뷰한 상품별 리뷰 수/평균 평점과, 같은 상품 전체 평균과의 차이. 최근 작성 순."""
+        sql = """SELECT r.product_id, COUNT(*) AS reviews, AVG(r.rating) AS rating, MIN(r.review_date) AS first_date,
+                     MAX(r.review_date) AS last_date, MIN(r.top_rank) AS best_rank, p.rating_sum * 1.0 / p.reviews AS product_rating
+                 FROM reviewer_reviews r LEFT JOIN product_ratings p ON p.product_id = r.product_id
+                 WHERE r.member_id = ? GROUP BY r.product_id ORDER BY last_date DESC, r.product_id"""
+        with self.lock:
+            rows = self.conn.execute(sql, (member_id,)).fetchall()
+        result = []
+        for row in rows:
+            product_rating = row['product_rating']
+            result.append({
+                'product_id': row['product_id'], 'reviews': row['reviews'], '평점': round(row['rating'], 3),
+                '상품평균평점': round(product_rating, 3) if product_rating is not None else None,
+                '평균대비': round(row['rating'] - product_rating, 3) if product_rating is not None else None,
+                '작성당시순위': row['best_rank'] or '', '첫작성일': row['first_date'] or '', '최신작성일': row['last_date'] or '',
+            })
+        return result
+
+    def find_nickname(self, text: str, limit: int = DEFAULT_LIMIT) -> list[dict]:
+        """닉네임에 text가 들어간 작성자 목록. 리뷰가 많은 순."""
+        with self.lock:
+            rows = self.conn.execute("SELECT * FROM reviewers WHERE nickname LIKE ? ORDER BY reviews DESC LIMIT ?",
+                                     (f'%{text}%', limit)).fetchall()
+        return [self._profile(row) for row in rows]
+
+    def top_reviewers(self, ranked_only: bool = False, min_products: int = 1, product_ids: list[str] | None = None,
+                      order: str = ORDER_REVIEWS, limit: int = DEFAULT_LIMIT) -> list[dict]:
+        """조건에 맞는 작성자 목록. ranked_only면 TOP 순위가 있었던 작성자만, product_ids를 주면 그 상품을 리뷰한 작성자만."""
+        clauses, params = ["products >= ?"], [min_products]
+        if ranked_only:
+            clauses.append("best_rank IS NOT NULL")
+        if product_ids:
+            clauses.append(f"member_id IN (SELECT member_id FROM reviewer_reviews WHERE product_id IN ({', '.join('?' * len(product_ids))}))")
+            params.extend(product_ids)
+        order_by = {ORDER_REVIEWS: "reviews DESC", ORDER_PRODUCTS: "products DESC, reviews DESC",
+                    ORDER_RANK: "best_rank IS NULL, best_rank, reviews DESC", ORDER_RECENT: "last_date DESC"}[order]
+        sql = f"SELECT * FROM reviewers WHERE {' AND '.join(clauses)} ORDER BY {order_by} LIMIT ?"
+        with self.lock:
+            rows = self.conn.execute(sql, params + [limit]).fetchall()
+        return [self._profile(row) for row in rows]
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM reviewers").fetchone()[0]
+
+    def ingest_files(self, paths: list[str], log_callback=None) -> int:
+        """이미 저장된 원본 리뷰 JSON을 색인에 반영합니다. 이미 반영한 리뷰는 건너뛴다."""
+        added = 0
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                reviews = json.load(f)
+            added += self.add_reviews(product_id_from_result_file(path), reviews)
+            if log_callback:
+                log_callback(f"작성자 색인: {os.path.basename(path)} ({len(reviews)}개)")
+        return added
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OliveYoung review crawler - cross-product reviewer index")
+    parser.add_argument('--db', required=True, help=f'reviewer index file (e.g. <out_dir>/{REVIEWERS_FILENAME})')
+    parser.add_argument('--ingest', nargs='*', default=None, help='raw review JSON files or folders to add first (already indexed reviews are skipped)')
+    parser.add_argument('--member', default=None, help='show this reviewer (mbrId) and every product they reviewed')
+    parser.add_argument('--nickname', default=None, help='find reviewers whose nickname contains this text')
+    parser.add_argument('--ranked', action='store_true', help='only reviewers that had a TOP reviewer rank')
+    parser.add_argument('--min_products', type=int, default=1, help='only reviewers with reviews on at least this many products')
+    parser.add_argument('--product', nargs='*', default=None, help='only reviewers who reviewed these product IDs')
+    parser.add_argument('--order', default=ORDER_REVIEWS, choices=[ORDER_REVIEWS, ORDER_PRODUCTS, ORDER_RANK, ORDER_RECENT])
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT)
+    parser.add_argument('--export', default=None, help='write the result to .csv or .jsonl instead of printing it')
+    args = parser.parse_args()
+
+    index = ReviewerIndex(args.db)
+    try:
+        if args.ingest is not None:
+            started = time.monotonic()
+            added = index.ingest_files(find_raw_result_files(args.ingest), log_callback=logging.info)
+            logging.info(f"작성자 색인 완료: 새 리뷰 {added}개, 작성자 {index.count()}명 ({time.monotonic() - started:.1f}초)")
+        started = time.perf_counter()
+        if args.member:
+            profile = index.reviewer(args.member)
+            if profile is None:
+                logging.info(f"색인에 없는 작성자입니다: {args.member}")
+                return
+            print(json.dumps(profile, ensure_ascii=False))
+            rows = index.products_of(args.member)
+        elif args.nickname:
+            rows = index.find_nickname(args.nickname, args.limit)
+        else:
+            rows = index.top_reviewers(args.ranked, args.min_products, args.product, args.order, args.limit)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if args.export:
+            export_rows(args.export, rows)
+            logging.info(f"{len(rows)}행 저장: {args.export} ({elapsed_ms:.1f}ms)")
+        else:
+            for row in rows:
+                print(json.dumps(row, ensure_ascii=False))
+            logging.info(f"{len(rows)}행 ({elapsed_ms:.1f}ms)")
+    finally:
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+import argparse
+import logging
+import math
+import os
+import random
+import signal
+import sys
+import time
+from datetime import datetime
+
+from olive_engine.batch import (STATUS_CANCELLED, STATUS_EMPTY, STATUS_FAILED, STATUS_OK, SUCCESS_STATUSES, BatchRunner, read_manifest,
+                                write_result_manifest)
+from olive_engine.fetch import PAGE_ABORT, PAGE_END, PAGE_OK, fetch_review_page
+from olive_engine.runtime import CancelToken, ScrapeCancelled
+from olive_engine.transform import REVIEW_FLAG_METRICS, review_flags
+from olive_engine.transport import DEFAULT_BACKEND, TRANSPORT_BACKENDS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+Z_95 = 1.96
+DEFAULT_PROPORTION_TARGET = 0.03   # 비율 지표 신뢰구간 반폭 목표 (±3%p)
+DEFAULT_RATING_TARGET = 0.1        # 평균 평점 신뢰구간 반폭 목표 (±0.1점)
+DEFAULT_MIN_SAMPLE_PAGES = 8       # 분산 추정이 안정되기 전에 멈추지 않도록 하는 최소 표본 페이지 수
+DEFAULT_MAX_SAMPLE_PAGES = 40
+SAMPLE_BATCH_PAGES = 4             # 이만큼 받을 때마다 수렴 여부를 확인
+PROBE_RETRIES = 2
+RATING_STARS = (1, 2, 3, 4, 5)
+
+SAMPLING_FIELDS = (['product_id', 'input', 'status', 'last_page', 'pages_sampled', 'reviews_sampled', 'requests', 'converged']
+                   + [f"{name}{suffix}" for name in ('평점',) + REVIEW_FLAG_METRICS for suffix in ('', '_lo', '_hi')]
+                   + [f"별점{star}_비율" for star in RATING_STARS]
+                   + ['duration_sec', 'error'])
+
+
+def cluster_ratio_estimate(totals: list[float], sizes: list[int], population_clusters: int) -> tuple[float, float] | None:
+    """페이지(클러스터) 단위 표본의 비 추정량과 분산을 계산합니다.
+
+    한 페이지의 리뷰들은 서로 비슷하므로(정렬 순서 영향) 리뷰 단위가 아니라 페이지 단위로 분산을 추정하고,
+    전체 페이지 수 대비 표본 비율만큼 유한모집단 수정을 한다. 표본이 2페이지 미만이면 분산은 inf.
+    """
+    n = sum(sizes)
+    m = len(sizes)
+    if n == 0:
+        return None
+    estimate = sum(totals) / n
+    if m < 2:
+        return estimate, math.inf
+    mean_size = n / m
+    residual = sum((t - estimate * s) ** 2 for t, s in zip(totals, sizes))
+    fpc = max(0.0, 1 - m / population_clusters) if population_clusters else 1.0
+    return estimate, fpc * residual / (m * (m - 1) * mean_size ** 2)
+
+
+def proportion_interval(totals: list[float], sizes: list[int], population_clusters: int, z: float = Z_95) -> tuple[float, float, float] | None:
+    """비율 지표의 (추정치, 하한, 상한). 설계효과로 줄인 유효 표본 크기로 Wilson 구간을 구한다.
+
+    Wilson 구간은 비율이 0이나 1에 가까워도 폭이 0으로 무너지지 않는다.
+    """
+    result = cluster_ratio_estimate(totals, sizes, population_clusters)
+    if result is None:
+        return None
+    p, variance = result
+    n = sum(sizes)
+    if math.isinf(variance):
+        return p, 0.0, 1.0
+    srs_variance = p * (1 - p) / n
+    design_effect = max(1.0, variance / srs_variance) if srs_variance > 0 else 1.0
+    n_eff = n / design_effect
+    denominator = 1 + z ** 2 / n_eff
+    center = (p + z ** 2 / (2 * n_eff)) / denominator
+    half = z * math.sqrt(p * (1 - p) / n_eff + z ** 2 / (4 * n_eff ** 2)) / denominator
+    return p, max(0.0, center - half), min(1.0, center + half)
+
+
+def mean_interval(totals: list[float], sizes: list[int], population_clusters: int, low: float, high: float, z: float = Z_95) -> tuple[float, float, float] | None:
+    result = cluster_ratio_estimate(totals, sizes, population_clusters)
+    if result is None:
+        return None
+    mean, variance = result
+    if math.isinf(variance):
+        return mean, low, high
+    half = z * math.sqrt(variance)
+    return mean, max(low, mean - half), min(high, mean + half)
+
+
+class PageSample:
+    """표본 페이지별 리뷰 수와 지표 합계를 모아 신뢰구간을 계산합니다."""
+
+    def __init__(self, population_pages: int):
+        self.population_pages = population_pages
+        self.sizes: list[int] = []
+        self.totals: dict[str, list[float]] = {name: [] for name in ('평점',) + REVIEW_FLAG_METRICS}
+        self.star_totals: dict[int, list[float]] = {star: [] for star in RATING_STARS}
+
+    def add_page(self, reviews: list) -> None:
+        flags = [review_flags(r) for r in reviews]
+        self.sizes.append(len(flags))
+        for name in self.totals:
+            self.totals[name].append(float(sum(f[name] for f in flags)))
+        for star in RATING_STARS:
+            self.star_totals[star].append(float(sum(1 for f in flags if round(f['평점']) == star)))
+
+    def estimates(self) -> dict:
+        result = {}
+        rating = mean_interval(self.totals['평점'], self.sizes, self.population_pages, 1.0, 5.0)
+        intervals = {'평점': rating}
+        for name in REVIEW_FLAG_METRICS:
+            intervals[name] = proportion_interval(self.totals[name], self.sizes, self.population_pages)
+        for name, interval in intervals.items():
+            estimate, low, high = interval if interval else (None, None, None)
+            result[name] = None if estimate is None else round(estimate, 4)
+            result[f"{name}_lo"] = None if low is None else round(low, 4)
+            result[f"{name}_hi"] = None if high is None else round(high, 4)
+        reviews = sum(self.sizes)
+        for star in RATING_STARS:
+            result[f"별점{star}_비율"] = round(sum(self.star_totals[star]) / reviews, 4) if reviews else None
+        return result
+
+    def converged(self, proportion_target: float, rating_target: float) -> bool:
+        estimates = self.estimates()
+        if estimates['평점'] is None:
+            return False
+        if (estimates['평점_hi'] - estimates['평점_lo']) / 2 > rating_target:
+            return False
+        return all((estimates[f"{name}_hi"] - estimates[f"{name}_lo"]) / 2 <= proportion_target for name in REVIEW_FLAG_METRICS)
+
+
+class SamplingRunner(BatchRunner):
+    """상품마다 무작위 페이지만 받아 평점/지표를 신뢰구간과 함께 추정합니다. 리뷰 원본은 저장하지 않는다."""
+
+    def __init__(self, *args, proportion_target: float = DEFAULT_PROPORTION_TARGET, rating_target: float = DEFAULT_RATING_TARGET,
+                 min_sample_pages: int = DEFAULT_MIN_SAMPLE_PAGES, max_sample_pages: int = DEFAULT_MAX_SAMPLE_PAGES, seed: int | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.proportion_target = proportion_target
+        self.rating_target = rating_target
+        self.min_sample_pages = max(2, min_sample_pages)
+        self.max_sample_pages = max(self.min_sample_pages, max_sample_pages)
+        self.random = random.Random(seed)
+
+    def _request_page(self, product_id: str, page: int, counter: list) -> tuple[str, object]:
+        """페이지 하나를 요청합니다. 일시적 실패는 PROBE_RETRIES번까지 바로 다시 시도한다."""
+        for _ in range(PROBE_RETRIES + 1):
+            counter[0] += 1
+            status, payload = fetch_review_page(self.transport, product_id, page, self.cancel_token, stats=self.stats, rate_limiter=self.rate_limiter)
+            if status in (PAGE_OK, PAGE_END, PAGE_ABORT):
+                return status, payload
+            self.stats.record_retry(product_id)
+        return status, payload
+
+    def _page_has_reviews(self, product_id: str, page: int, counter: list) -> bool:
+        """마지막 페이지 탐색용 요청. PAGE_END만 '비어 있음'으로 보고, 재시도 후에도 실패하거나 인증 문제면 예외를 던진다.
+
+        일시적 실패를 빈 페이지로 보면 last_page가 잘려 페이지 틀 전체가 치우친다.
+        """
+        status, payload = self._request_page(product_id, page, counter)
+        if status == PAGE_OK:
+            return True
+        if status == PAGE_END:
+            return False
+        if status == PAGE_ABORT:
+            raise RuntimeError(f"인증 문제로 마지막 페이지 탐색 실패 (페이지 {page})")
+        raise RuntimeError(f"페이지 {page} 요청이 {PROBE_RETRIES + 1}번 모두 실패해 마지막 페이지를 정할 수 없습니다 ({payload})")
+
+    def find_last_page(self, product_id: str, max_pages: int, counter: list) -> int:
+        """지수 탐색 후 이진 탐색으로 리뷰가 있는 마지막 페이지를 찾습니다 (약 2*log2(N)번 요청). 리뷰가 없으면 0."""
+        if not self._page_has_reviews(product_id, 1, counter):
+            return 0
+        low, high = 1, None   # low: 리뷰가 있는 페이지, high: 비어 있는 페이지
+        probe = 2
+        while high is None:
+            probe = min(probe, max_pages)
+            if self._page_has_reviews(product_id, probe, counter):
+                low = probe
+                if probe >= max_pages:
+                    return max_pages
+                probe *= 2
+            else:
+                high = probe
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self._page_has_reviews(product_id, middle, counter):
+                low = middle
+            else:
+                high = middle
+        return low
+
+    def scrape_product(self, product: dict) -> dict:
+        product_id = product['product_id']
+        result = {**self._new_result(product), 'last_page': 0, 'pages_sampled': 0, 'reviews_sampled': 0, 'requests': 0, 'converged': False}
+        started = time.monotonic()
+        counter = [0]
+        self.stats.start_product(product_id, self.max_sample_pages)
+        try:
+            if not self._refresh_session(product_id):
+                result['status'] = STATUS_CANCELLED if self.cancel_token.is_cancelled() else STATUS_FAILED
+                result['error'] = '페이지 로드/인증 실패'
+                return result
+            last_page = self.find_last_page(product_id, product['max_pages'], counter)
+            result['last_page'] = last_page
+            if last_page == 0:
+                result['status'] = STATUS_EMPTY
+                return result
+
+            # 탐색에 쓴 페이지는 무작위가 아니므로 추정에는 쓰지 않는다
+            sample = PageSample(last_page)
+            order = self.random.sample(range(1, last_page + 1), k=min(last_page, self.max_sample_pages))
+            for i, page in enumerate(order, 1):
+                status, payload = self._request_page(product_id, page, counter)
+                if status == PAGE_ABORT:
+                    raise RuntimeError("인증 문제로 표본 수집 중단")
+                if status == PAGE_OK:
+                    sample.add_page(payload)
+                    self.stats.record_page(product_id, len(payload))
+                if (len(sample.sizes) >= self.min_sample_pages and i % SAMPLE_BATCH_PAGES == 0
+                        and sample.converged(self.proportion_target, self.rating_target)):
+                    result['converged'] = True
+                    break
+            else:
+                # 모든 페이지를 받았으면 추정치가 곧 전수 값이다
+                result['converged'] = len(order) == last_page or sample.converged(self.proportion_target, self.rating_target)
+
+            result.update(sample.estimates())
+            result['pages_sampled'] = len(sample.sizes)
+            result['reviews_sampled'] = sum(sample.sizes)
+            result['status'] = STATUS_OK
+            logging.info(f"{product_id}: 마지막 페이지 {last_page}, 표본 {result['pages_sampled']}페이지, 요청 {counter[0]}회, "
+                         f"평점 {result['평점']} [{result['평점_lo']}, {result['평점_hi']}], 수렴 {result['converged']}")
+        except ScrapeCancelled:
+            result['status'] = STATUS_CANCELLED
+        except Exception as e:
+            logging.error(f"상품 {product_id} 표본 추정 실패: {e}", exc_info=True)
+            result['error'] = f"{type(e).__name__}: {e}"
+        finally:
+            result['requests'] = counter[0]
+            result['duration_sec'] = round(time.monotonic() - started, 1)
+            self.stats.finish_product(product_id, result['status'])
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OliveYoung review crawler - sampling mode (rating / repurchase / photo share estimates with 95% CI)")
+    parser.add_argument('--manifest', required=True, help='CSV or JSONL file of product IDs or URLs')
+    parser.add_argument('--max_pages', type=int, default=1000, help='upper bound for the last-page search')
+    parser.add_argument('--out_dir', default=os.getcwd())
+    parser.add_argument('--result_manifest', default=None, help='result path (.csv or .jsonl). default: <out_dir>/sampling_result_<timestamp>.csv')
+    parser.add_argument('--target', type=float, default=DEFAULT_PROPORTION_TARGET, help='CI half-width target for proportions')
+    parser.add_argument('--rating_target', type=float, default=DEFAULT_RATING_TARGET, help='CI half-width target for the mean rating')
+    parser.add_argument('--min_sample_pages', type=int, default=DEFAULT_MIN_SAMPLE_PAGES)
+    parser.add_argument('--max_sample_pages', type=int, default=DEFAULT_MAX_SAMPLE_PAGES)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--rate', type=float, default=1.0, help='global request rate limit (requests/sec)')
+    parser.add_argument('--transport', default=DEFAULT_BACKEND, choices=sorted(TRANSPORT_BACKENDS))
+    parser.add_argument('--port', type=int, default=9222)
+    parser.add_argument('--user_data_dir', default=r"E:\brwProf\User Data")
+    args = parser.parse_args()
+
+    products, invalid = read_manifest(args.manifest, args.max_pages)
+    logging.info(f"표본 추정 대상 상품 {len(products)}개 (해석 실패 {len(invalid)}개), 목표 반폭 ±{args.target} / 평점 ±{args.rating_target}")
+
+    cancel_token = CancelToken()
+    signal.signal(signal.SIGINT, lambda signum, frame: cancel_token.cancel())
+    runner = SamplingRunner(args.out_dir, args.port, args.user_data_dir, workers=args.workers, rate=args.rate, cancel_token=cancel_token,
+                            transport_backend=args.transport, proportion_target=args.target, rating_target=args.rating_target,
+                            min_sample_pages=args.min_sample_pages, max_sample_pages=args.max_sample_pages, seed=args.seed)
+    results = invalid + (runner.run(products) if products else [])
+
+    result_path = args.result_manifest or os.path.join(args.out_dir, f"sampling_result_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    write_result_manifest(result_path, results, fields=SAMPLING_FIELDS)
+    failed = [r for r in results if r['status'] not in SUCCESS_STATUSES]
+    logging.info(f"표본 추정 결과 저장: {result_path} (성공 {len(results) - len(failed)}개, 실패 {len(failed)}개)")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
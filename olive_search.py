@@ -0,0 +1,215 @@
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from olive_engine.sinks import find_raw_result_files, product_id_from_result_file
+from olive_engine.transform import parse_review_date, review_flags, review_key, review_text, words
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SEARCH_INDEX_FILENAME = 'review_search.sqlite'
+DEFAULT_LIMIT = 100
+ORDER_LATEST = 'latest'
+ORDER_OLDEST = 'oldest'
+ORDER_RATING_HIGH = 'rating_high'
+ORDER_RATING_LOW = 'rating_low'
+ORDER_RELEVANCE = 'relevance'
+ORDER_BY = {
+    ORDER_LATEST: "r.review_date DESC, r.id DESC",
+    ORDER_OLDEST: "r.review_date ASC, r.id ASC",
+    ORDER_RATING_HIGH: "r.rating DESC, r.review_date DESC, r.id DESC",
+    ORDER_RATING_LOW: "r.rating ASC, r.review_date DESC, r.id DESC",
+}
+
+QUERY_TERM_RE = re.compile(r'(-?)"([^"]*)"|(-?)(\S+)')
+
+
+def _word_bigrams(word: str) -> list[str]:
+    if len(word) < 2:
+        return [word]
+    return [word[i:i + 2] for i in range(len(word) - 1)]
+
+
+def to_bigrams(text: str) -> str:
+    """본문을 어절별 2글자 조각으로 나눈 문자열. FTS5 unicode61 토크나이저는 공백으로 나눠 조각 하나를 토큰 하나로 색인한다.
+
+    한국어는 조사/어미가 붙어 단어 단위 토큰으로는 '트러블이', '트러블은'이 서로 다른 토큰이 되므로
+    글자 조각으로 색인하고, 검색어도 같은 조각의 연속(구문)으로 바꿔 부분 문자열처럼 찾는다.
+    """
+    return ' '.join(gram for word in words(text) for gram in _word_bigrams(word))
+
+
+def build_match_query(query: str) -> str | None:
+    """검색어를 FTS5 MATCH 식으로 바꿉니다.
+
+    공백으로 나눈 검색어는 모두 포함(AND), "따옴표"는 구문, 앞에 -를 붙이면 제외한다.
+    한 글자 검색어는 그 글자로 시작하는 조각의 접두어 검색이 된다. 포함할 검색어가 없으면 None.
+    """
+    include, exclude = [], []
+    for match in QUERY_TERM_RE.finditer(query or ''):
+        negate = bool(match.group(1) or match.group(3))
+        text = match.group(2) if match.group(2) is not None else match.group(4)
+        grams = [gram for word in words(text) for gram in _word_bigrams(word)]
+        if not grams:
+            continue
+        if len(grams) == 1 and len(grams[0]) == 1:
+            expression = f'"{grams[0]}"*'
+        else:
+            expression = '"' + ' '.join(grams) + '"'
+        (exclude if negate else include).append(expression)
+    if not include:
+        return None
+    return ' AND '.join(include) + ''.join(f" NOT {expression}" for expression in exclude)
+
+
+class ReviewSearchIndex:
+    """모든 상품의 리뷰 본문을 한 SQLite 파일(FTS5)에 모아 두는 전체 검색 색인.
+
+    ResultPipeline의 sink로 넘기면 저장되는 리뷰가 바로 색인된다. 같은 상품의 같은 리뷰는 한 번만 들어가므로
+    같은 상품을 다시 수집해도 중복되지 않는다. 모든 메서드는 스레드 안전하다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS reviews (
+            id INTEGER PRIMARY KEY, product_id TEXT NOT NULL, review_id TEXT NOT NULL, rating REAL, review_date TEXT,
+            nickname TEXT, option TEXT, content TEXT, UNIQUE(product_id, review_id))""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS reviews_product_date ON reviews(product_id, review_date)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS reviews_date ON reviews(review_date)")
+        # 본문은 reviews 테이블에 있으므로 FTS에는 조각만 두는 contentless 테이블을 쓴다 (rowid = reviews.id)
+        self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS review_fts USING fts5(grams, content='', tokenize='unicode61')")
+        self.conn.commit()
+
+    def add_reviews(self, product_id: str, reviews: list) -> int:
+        """원본 리뷰 목록을 색인하고 새로 들어간 리뷰 수를 반환합니다."""
+        added = 0
+        with self.lock:
+            with self.conn:
+                for review in reviews:
+                    content = review_text(review)
+                    review_date = parse_review_date(review)
+                    cursor = self.conn.execute(
+                        "INSERT OR IGNORE INTO reviews (product_id, review_id, rating, review_date, nickname, option, content) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (product_id, review_key(review), review_flags(review)['평점'], review_date.isoformat() if review_date else None,
+                         review.get('mbrNickNm', '') or review.get('mbrId', ''), review.get('itemNm', ''), content))
+                    if cursor.rowcount:
+                        self.conn.execute("INSERT INTO review_fts (rowid, grams) VALUES (?, ?)", (cursor.lastrowid, to_bigrams(content)))
+                        added += 1
+        return added
+
+    def write(self, product_id: str, reviews: list, df=None) -> None:
+        """ResultPipeline sink 인터페이스."""
+        added = self.add_reviews(product_id, reviews)
+        logging.info(f"검색 색인 반영: 상품 {product_id} 새 리뷰 {added}개")
+
+    def search(self, query: str = '', product_ids: list[str] | None = None, min_rating: float | None = None, max_rating: float | None = None,
+               date_from: str | None = None, date_to: str | None = None, limit: int = DEFAULT_LIMIT, order: str = ORDER_LATEST,
+               offset: int = 0) -> list[dict]:
+        """검색어와 상품/평점/기간 조건에 맞는 리뷰 목록. 검색어가 비어 있으면 조건만으로 찾는다.
+
+        offset개를 건너뛴 뒤 limit개를 돌려준다(페이지 나누기). 검색어가 없으면 relevance는 latest와 같다.
+        """
+        match = build_match_query(query)
+        if query.strip() and match is None:
+            return []
+        clauses, params = [], []
+        if match:
+            clauses.append("r.id IN (SELECT rowid FROM review_fts WHERE review_fts MATCH ?)")
+            params.append(match)
+        if product_ids:
+            clauses.append(f"r.product_id IN ({', '.join('?' * len(product_ids))})")
+            params.extend(product_ids)
+        if min_rating is not None:
+            clauses.append("r.rating >= ?")
+            params.append(min_rating)
+        if max_rating is not None:
+            clauses.append("r.rating <= ?")
+            params.append(max_rating)
+        if date_from:
+            clauses.append("r.review_date >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("r.review_date <= ?")
+            params.append(date_to)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+        if match and order == ORDER_RELEVANCE:
+            sql = (f"SELECT r.* FROM review_fts f JOIN reviews r ON r.id = f.rowid "
+                   f"{where.replace('WHERE', 'WHERE review_fts MATCH ? AND', 1)} ORDER BY f.rank LIMIT ? OFFSET ?")
+            params = [match] + params
+        else:
+            sql = f"SELECT r.* FROM reviews r {where} ORDER BY {ORDER_BY.get(order, ORDER_BY[ORDER_LATEST])} LIMIT ? OFFSET ?"
+        with self.lock:
+            rows = self.conn.execute(sql, params + [limit, offset]).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+
+    def ingest_files(self, paths: list[str], log_callback=None) -> int:
+        """이미 저장된 원본 리뷰 JSON을 색인에 채웁니다 (처음 색인을 만들 때)."""
+        added = 0
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                reviews = json.load(f)
+            added += self.add_reviews(product_id_from_result_file(path), reviews)
+            if log_callback:
+                log_callback(f"색인: {os.path.basename(path)} ({len(reviews)}개)")
+        return added
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OliveYoung review crawler - full-text search over all collected reviews")
+    parser.add_argument('query', nargs='?', default='', help='keywords (all must match), "quoted phrase", -excluded')
+    parser.add_argument('--index', required=True, help=f'search index file (e.g. <out_dir>/{SEARCH_INDEX_FILENAME})')
+    parser.add_argument('--ingest', nargs='*', default=None, help='raw review JSON files or folders to add to the index first')
+    parser.add_argument('--product', nargs='*', default=None, help='restrict to these product IDs')
+    parser.add_argument('--min_rating', type=float, default=None)
+    parser.add_argument('--max_rating', type=float, default=None)
+    parser.add_argument('--from', dest='date_from', default=None, help='YYYY-MM-DD')
+    parser.add_argument('--to', dest='date_to', default=None, help='YYYY-MM-DD')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--order', default=ORDER_LATEST, choices=[*ORDER_BY, ORDER_RELEVANCE])
+    parser.add_argument('--json', action='store_true', help='print results as JSON lines')
+    args = parser.parse_args()
+
+    index = ReviewSearchIndex(args.index)
+    try:
+        if args.ingest is not None:
+            started = time.monotonic()
+            added = index.ingest_files(find_raw_result_files(args.ingest), log_callback=logging.info)
+            logging.info(f"색인 완료: 새 리뷰 {added}개, 전체 {index.count()}개 ({time.monotonic() - started:.1f}초)")
+        if not args.query and args.ingest is not None:
+            return
+        started = time.perf_counter()
+        results = index.search(args.query, product_ids=args.product, min_rating=args.min_rating, max_rating=args.max_rating,
+                               date_from=args.date_from, date_to=args.date_to, limit=args.limit, order=args.order)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for row in results:
+            if args.json:
+                print(json.dumps(row, ensure_ascii=False))
+            else:
+                content = row['content'].replace('\n', ' ')
+                print(f"[{row['product_id']} {row['review_date'] or '-'} {row['rating']}점] {content[:120]}")
+        logging.info(f"검색 결과 {len(results)}개 ({elapsed_ms:.1f}ms)")
+    finally:
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
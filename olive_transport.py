@@ -0,0 +1,8 @@
+"""이전 경로 호환용 모듈. 리뷰 API 전송 계층은 olive_engine.transport로 옮겨졌다."""
+from olive_engine.transport import (DEFAULT_BACKEND, TRANSPORT_BACKENDS, AsyncHttpxTransport, CurlCffiTransport, HttpxTransport,
+                                    RequestsTransport, ReviewTransport, make_transport)
+
+__all__ = [
+    'DEFAULT_BACKEND', 'TRANSPORT_BACKENDS', 'AsyncHttpxTransport', 'CurlCffiTransport', 'HttpxTransport', 'RequestsTransport',
+    'ReviewTransport', 'make_transport',
+]